@@ -3,10 +3,10 @@ K9 GSD Kennel Management System - Main Flask Application
 FIXED VERSION with proper CORS and file handling
 """
 
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory, redirect, make_response
 from flask_cors import CORS
 from config import Config
-from database import db, init_db
+from database import db, init_db, configure_replicas
 import os
 import logging
 
@@ -23,14 +23,54 @@ def create_app(config_class=Config):
     # ============================================
     CORS(app, 
          resources={r"/api/*": {"origins": "*"}},
-         allow_headers=["Content-Type", "Authorization"],
-         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+         allow_headers=["Content-Type", "Authorization",
+                        # Resumable uploads (tus protocol)
+                        "Tus-Resumable", "Upload-Length", "Upload-Offset",
+                        "Upload-Metadata", "Upload-Checksum"],
+         expose_headers=["Location", "Tus-Resumable", "Tus-Version", "Tus-Extension",
+                         "Tus-Max-Size", "Tus-Checksum-Algorithm", "Upload-Offset",
+                         "Upload-Length", "Upload-Expires", "Upload-Gallery-Item"],
+         methods=["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
          supports_credentials=True
     )
     
-    # Initialize database
+    # Initialize database (replica binds must be registered first)
+    configure_replicas(app)
     db.init_app(app)
     
+    from services.pool_service import init_pool_instrumentation
+    init_pool_instrumentation(app, db)
+    
+    # Cross-worker event bus, catalog cache and live notifications
+    from services.event_bus import init_event_bus
+    from services.cache_service import init_cache
+    from services.notification_service import init_notifications
+    event_bus = init_event_bus(app, db)
+    init_cache(app, event_bus)
+    init_notifications(app, event_bus)
+    
+    # Targeted CDN purges of the public API (surrogate keys)
+    from services.cdn_purge_service import init_cdn_purge
+    init_cdn_purge(app)
+    
+    # Change-sequence stamping for the delta sync feed
+    import services.sync_service  # noqa: F401 (registers flush listeners)
+    
+    # Where uploads are stored (local folder or S3-compatible bucket)
+    from services.storage_service import init_storage, get_storage
+    init_storage(app)
+    
+    # Public media URLs (CDN hosts, ?v= cache busting)
+    from services.media_url_service import init_media_urls
+    init_media_urls(app)
+    
+    # Upload-folder file operations applied on commit / undone on rollback
+    import services.file_ops_service  # noqa: F401 (registers session listeners)
+    
+    # Static catalog snapshots served by the front proxy
+    from services.snapshot_service import init_snapshots
+    init_snapshots(app)
+    
     # ============================================
     # Create upload directories
     # ============================================
@@ -40,14 +80,70 @@ def create_app(config_class=Config):
         os.makedirs(folder_path, exist_ok=True)
         print(f"✅ Upload folder ready: {folder_path}")
     
+    # Multipart uploads stream straight into their upload folder
+    from services.ingest_service import init_ingest
+    init_ingest(app)
+    
+    # Resumable uploads are assembled outside the public uploads tree
+    from services.resumable_upload_service import init_resumable_uploads
+    init_resumable_uploads(app)
+    
+    # Uploads straight from the browser to storage (presigned PUT)
+    from services.direct_upload_service import init_direct_uploads
+    init_direct_uploads(app)
+    
+    # Upload metadata recorded at ingest (flask backfill-media-assets)
+    from services.media_asset_service import init_media_assets
+    init_media_assets(app)
+    
+    # Video posters and metadata (flask media-worker)
+    from services.media_job_service import init_media_jobs
+    init_media_jobs(app)
+    from services.hls_service import init_hls
+    init_hls(app)
+    
+    # Orphan media garbage collection (flask media-gc)
+    from services.media_gc_service import init_media_gc
+    init_media_gc(app)
+    
     # ============================================
     # SERVE UPLOADED FILES - CRITICAL
     # ============================================
+    from services.image_service import init_image_transforms, wants_transform, transform_response
+    init_image_transforms(app)
+    
     @app.route('/uploads/<path:filename>')
     def serve_upload(filename):
-        """Serve uploaded images/videos"""
-        upload_folder = os.path.abspath(app.config['UPLOAD_FOLDER'])
-        return send_from_directory(upload_folder, filename)
+        """
+        Serve uploaded images/videos
+        Images accept ?w=&h=&fit=contain|cover|fill&fmt=auto|avif|webp|jpeg|png&q=
+        and are served as resized variants from the image cache (w/h/q snapped
+        to IMAGE_TRANSFORM_SIZES/IMAGE_TRANSFORM_QUALITIES)
+        """
+        # Never serve in-flight files (.incoming/ parts, .tmp- files)
+        if any(part.startswith('.') for part in filename.split('/')):
+            return jsonify({'error': 'File not found'}), 404
+        
+        storage = get_storage()
+        if wants_transform(request.args):
+            # Rendered from this node's copy, fetched first when stored remotely
+            if storage.remote and storage.localize(filename) is None:
+                return jsonify({'error': 'File not found'}), 404
+            response = make_response(transform_response(filename, request.args, request.accept_mimetypes))
+        elif storage.remote:
+            # Served by the bucket (or its CDN); this node may not have a copy
+            return redirect(storage.url(filename))
+        else:
+            upload_folder = os.path.abspath(app.config['UPLOAD_FOLDER'])
+            response = send_from_directory(upload_folder, filename)
+        
+        # ?v= URLs change whenever the file does, so caches may keep them forever
+        if 'v' in request.args and response.status_code == 200:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = app.config.get('MEDIA_IMMUTABLE_MAX_AGE', 31536000)
+            response.cache_control.immutable = True
+        return response
     
     # ============================================
     # Register blueprints
@@ -57,12 +153,24 @@ def create_app(config_class=Config):
     from routes.puppy_routes import puppy_bp
     from routes.gallery_routes import gallery_bp
     from routes.booking_routes import booking_bp
+    from routes.system_routes import system_bp
+    from routes.sync_routes import sync_bp
+    from routes.v2_routes import v2_bp
+    from routes.graphql_routes import graphql_bp
+    from routes.batch_routes import batch_bp
+    from routes.upload_routes import upload_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(dog_bp, url_prefix='/api/dogs')
     app.register_blueprint(puppy_bp, url_prefix='/api/puppies')
     app.register_blueprint(gallery_bp, url_prefix='/api/gallery')
     app.register_blueprint(booking_bp, url_prefix='/api/bookings')
+    app.register_blueprint(system_bp, url_prefix='/api/system')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    app.register_blueprint(v2_bp, url_prefix='/api/v2')
+    app.register_blueprint(graphql_bp, url_prefix='/api/graphql')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    app.register_blueprint(upload_bp, url_prefix='/api/uploads')
     
     # ============================================
     # Health check endpoint
@@ -86,7 +194,13 @@ def create_app(config_class=Config):
                 'dogs': '/api/dogs',
                 'puppies': '/api/puppies',
                 'gallery': '/api/gallery',
-                'bookings': '/api/bookings'
+                'bookings': '/api/bookings',
+                'system': '/api/system',
+                'sync': '/api/sync',
+                'v2': '/api/v2',
+                'graphql': '/api/graphql',
+                'batch': '/api/batch',
+                'uploads': '/api/uploads'
             }
         }), 200
     
@@ -104,7 +218,11 @@ def create_app(config_class=Config):
     
     @app.errorhandler(413)
     def request_entity_too_large(error):
-        return jsonify({'error': 'File too large. Maximum size is 16MB'}), 413
+        # The limit that applied: some upload routes raise or lower MAX_CONTENT_LENGTH
+        limit = request.max_content_length
+        if not limit:
+            return jsonify({'error': 'File too large'}), 413
+        return jsonify({'error': f'File too large. Maximum size is {limit / (1024 * 1024):g}MB'}), 413
     
     return app
 
@@ -0,0 +1,161 @@
+"""
+Image Optimization Benchmark
+Compares the original optimize_image() with the memory-bounded decode
+path on large phone-style photos. Each run happens in a fresh
+subprocess with the same imports, so peak RSS is measured per image and
+per implementation ('image' is the peak growth while optimizing,
+excluding imports).
+
+JPEGs are decoded at a reduced scale; PNG, WebP and GIF have no reduced
+decode, so their full bitmap is always decoded and the only bound on
+them is IMAGE_MAX_DECODE_BYTES (checked before decoding).
+
+Usage:
+    python benchmark_images.py              # 24 MP JPEG, 12 MP PNG
+    python benchmark_images.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (size, format, EXIF orientation)
+SAMPLES = {
+    'jpeg_24mp': ((6000, 4000), 'JPEG', 6),
+    'jpeg_12mp': ((4000, 3000), 'JPEG', 1),
+    'png_rgba_12mp': ((4000, 3000), 'PNG', None),
+}
+
+
+def legacy_optimize_image(file_path, max_width=1920, quality=85):
+    """optimize_image() as it was before the bounded decode path"""
+    from PIL import Image
+
+    with Image.open(file_path) as img:
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+            img = background
+
+        if img.width > max_width:
+            ratio = max_width / img.width
+            new_height = int(img.height * ratio)
+            img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+
+        img.save(file_path, optimize=True, quality=quality)
+
+
+def make_sample(path, size, image_format, orientation):
+    """Write a synthetic photo: smooth gradients plus noise, like real camera output"""
+    from PIL import Image
+
+    width, height = size
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 40)
+    img = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+    if image_format == 'PNG':
+        img.putalpha(gradient)
+        img.save(path, format='PNG')
+        return
+
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    img.save(path, format='JPEG', quality=92, exif=exif.tobytes())
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    # VmHWM starts fresh at exec; ru_maxrss can carry over the parent's peak
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(implementation, path):
+    """Optimize one file in this process and report time and peak RSS"""
+    sys.path.insert(0, BACKEND_DIR)
+    from PIL import Image
+    from flask import Flask
+    from services.file_service import optimize_image
+    from config import Config
+
+    # Same imports and app for both, so peak RSS compares like with like
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.app_context().push()
+    optimize = legacy_optimize_image if implementation == 'legacy' else optimize_image
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    optimize(path)
+    elapsed = time.perf_counter() - start
+
+    with Image.open(path) as result:
+        size = result.size
+
+    print(json.dumps({
+        'seconds': elapsed,
+        'peak_rss_mb': peak_rss_mb(),
+        'image_mb': peak_rss_mb() - baseline,
+        'size': size,
+    }))
+
+
+def measure(implementation, sample_path, workdir):
+    path = os.path.join(workdir, f'{implementation}{os.path.splitext(sample_path)[1]}')
+    shutil.copyfile(sample_path, path)
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', implementation, path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--child', nargs=2, metavar=('IMPLEMENTATION', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='k9-image-bench-')
+    try:
+        print(f"{'sample':<16}{'impl':<10}{'time (s)':>10}{'peak RSS (MB)':>16}{'image (MB)':>13}  output")
+        for name, (size, image_format, orientation) in SAMPLES.items():
+            sample_path = os.path.join(workdir, f"{name}.{image_format.lower()}")
+            make_sample(sample_path, size, image_format, orientation)
+
+            for implementation in ('legacy', 'bounded'):
+                results = [measure(implementation, sample_path, workdir) for _ in range(args.runs)]
+                seconds = min(r['seconds'] for r in results)
+                peak = max(r['peak_rss_mb'] for r in results)
+                image_mb = max(r['image_mb'] for r in results)
+                output_size = 'x'.join(str(v) for v in results[0]['size'])
+                print(f"{name:<16}{implementation:<10}{seconds:>10.3f}{peak:>16.1f}{image_mb:>13.1f}  {output_size}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,45 @@ Loads environment variables from .env file
 import os
 from datetime import timedelta
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+def build_engine_options(database_uri, pool_size=5, max_overflow=10, pool_timeout=30,
+                         pool_recycle=1800, pgbouncer=False):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for a PostgreSQL connection pool
+    
+    Args:
+        database_uri: Database URI the options are for
+        pool_size: Connections kept open per worker
+        max_overflow: Extra connections allowed under burst load
+        pool_timeout: Seconds to wait for a free connection
+        pool_recycle: Seconds before a connection is replaced
+        pgbouncer: Connect through PgBouncer in transaction pooling mode
+        
+    Returns:
+        dict: Engine options
+    """
+    if pgbouncer:
+        # PgBouncer owns pooling: hand every connection straight back to it and
+        # never rely on server-side prepared statements or session state
+        options = {'poolclass': NullPool}
+        if database_uri.startswith('postgresql+psycopg:'):
+            options['connect_args'] = {'prepare_threshold': None}
+        return options
+    
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'pool_recycle': pool_recycle,  # Replace connections before server/firewall timeouts
+        'pool_pre_ping': True,  # Survive database restarts without failing requests
+    }
+
+
 class Config:
     """Base configuration"""
     
@@ -27,6 +62,55 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False  # Keep it clean
     
+    # Connection pool settings
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'False') == 'True'
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(
+        SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+        DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_PGBOUNCER
+    )
+    
+    # Read replicas for public catalog reads (comma-separated URLs)
+    SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.getenv('DB_REPLICA_URLS', '').split(',') if uri.strip()]
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))  # Fall back to primary above this
+    REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', 10))
+    
+    # Catalog response cache (invalidated across workers on commit)
+    CATALOG_CACHE_ENABLED = os.getenv('CATALOG_CACHE_ENABLED', 'True') == 'True'
+    CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', 300))  # Seconds, safety net only
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', 512))
+    
+    # CDN caching of the public API: surrogate keys + purge on commit (docs/cdn-purge.md)
+    SURROGATE_KEY_HEADER = os.getenv('SURROGATE_KEY_HEADER', 'Surrogate-Key')  # 'xkey' for Varnish
+    SURROGATE_CONTROL_MAX_AGE = int(os.getenv('SURROGATE_CONTROL_MAX_AGE', 86400))  # CDN lifetime, only sent with a purge backend
+    CDN_PURGE_BACKEND = os.getenv('CDN_PURGE_BACKEND', 'none')  # none, log, http
+    CDN_PURGE_URLS = os.getenv('CDN_PURGE_URLS', '')  # Comma-separated, every URL gets each purge
+    CDN_PURGE_METHOD = os.getenv('CDN_PURGE_METHOD', 'PURGE')  # POST for the Fastly API
+    CDN_PURGE_KEY_HEADER = os.getenv('CDN_PURGE_KEY_HEADER', 'Surrogate-Key')  # 'xkey-purge' for Varnish
+    CDN_PURGE_TOKEN_HEADER = os.getenv('CDN_PURGE_TOKEN_HEADER', 'Fastly-Key')
+    CDN_PURGE_TOKEN = os.getenv('CDN_PURGE_TOKEN', '')
+    CDN_PURGE_DELAY_SECONDS = float(os.getenv('CDN_PURGE_DELAY_SECONDS', 0.5))  # Coalescing window
+    CDN_PURGE_BATCH_SIZE = int(os.getenv('CDN_PURGE_BATCH_SIZE', 256))  # Keys per request (Fastly's limit)
+    # Keys are purged again after this long, once replicas and other workers' caches have caught up
+    CDN_PURGE_REPEAT_SECONDS = float(os.getenv('CDN_PURGE_REPEAT_SECONDS', REPLICA_MAX_LAG_SECONDS + 1))
+    CDN_PURGE_RETRY_SECONDS = 30
+    CDN_PURGE_TIMEOUT_SECONDS = 5
+    
+    # Cross-worker event bus (cache invalidation, live notifications)
+    EVENT_BUS_BACKEND = os.getenv('EVENT_BUS_BACKEND', 'auto')  # auto, postgres, local
+    EVENT_BUS_CHANNEL = os.getenv('EVENT_BUS_CHANNEL', 'k9_events')
+    # LISTEN needs a session-pooled connection: point this past PgBouncer when DB_PGBOUNCER is on
+    EVENT_BUS_DATABASE_URL = os.getenv('EVENT_BUS_DATABASE_URL', '')
+    
+    # Live admin notifications (Server-Sent Events)
+    SSE_REPLAY_BUFFER = int(os.getenv('SSE_REPLAY_BUFFER', 500))  # Events kept for Last-Event-ID resume
+    SSE_CLIENT_BUFFER = int(os.getenv('SSE_CLIENT_BUFFER', 100))  # Undelivered events per connection
+    SSE_HEARTBEAT_SECONDS = int(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+    SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', 300))  # Client reconnects and resumes
+    
     # JWT settings
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
@@ -37,6 +121,72 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'mov', 'avi', 'webm'}
+    MEDIA_BASE_URL = os.getenv('MEDIA_BASE_URL', 'http://localhost:5002/uploads/')  # v2 payloads send relative keys
+    MEDIA_CDN_HOSTS = os.getenv('MEDIA_CDN_HOSTS', '')  # Comma-separated base URLs, each path always on the same host
+    MEDIA_URL_VERSIONING = os.getenv('MEDIA_URL_VERSIONING', 'True') == 'True'  # ?v=<content version> on media URLs
+    MEDIA_IMMUTABLE_MAX_AGE = 31536000  # Seconds versioned /uploads responses may be cached
+    
+    # On-demand image variants (/uploads/<path>?w=&h=&fit=&fmt=)
+    IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 40_000_000))  # Decompression bomb guard
+    IMAGE_MAX_DECODE_BYTES = int(os.getenv('IMAGE_MAX_DECODE_BYTES', 160 * 1024 * 1024))  # Per decoded bitmap; the only bound for PNG/WebP/GIF
+    # w/h round up to the next allowed size and q to the nearest allowed quality,
+    # so arbitrary query strings can't fill the cache with near-duplicate variants
+    IMAGE_TRANSFORM_SIZES = [int(size) for size in os.getenv('IMAGE_TRANSFORM_SIZES', '160,320,480,640,800,1024,1280,1600,1920,2560').split(',')]
+    IMAGE_TRANSFORM_QUALITIES = [int(quality) for quality in os.getenv('IMAGE_TRANSFORM_QUALITIES', '50,65,80,90').split(',')]
+    IMAGE_TRANSFORM_QUALITY = 80
+    IMAGE_TRANSFORM_MAX_AGE = 86400  # Seconds browsers may cache a variant
+    IMAGE_CACHE_FOLDER = os.getenv('IMAGE_CACHE_FOLDER', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache'))
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    
+    # Gallery bulk upload (validation, hashing and optimization in a process pool)
+    BULK_UPLOAD_WORKERS = int(os.getenv('BULK_UPLOAD_WORKERS', 0))  # 0 = one per CPU
+    BULK_UPLOAD_MAX_CONTENT_LENGTH = int(os.getenv('BULK_UPLOAD_MAX_CONTENT_LENGTH', 1024 * 1024 * 1024))
+    
+    # Near-duplicate gallery images (perceptual hash, services/duplicate_service.py)
+    GALLERY_DUPLICATE_MODE = os.getenv('GALLERY_DUPLICATE_MODE', 'flag')  # flag / skip / allow
+    GALLERY_DUPLICATE_MAX_DISTANCE = int(os.getenv('GALLERY_DUPLICATE_MAX_DISTANCE', 6))  # Differing bits of 64
+    
+    # Upload-folder deletes run after commit on a background thread (services/file_ops_service.py)
+    FILE_OPS_ASYNC = os.getenv('FILE_OPS_ASYNC', 'True') == 'True'
+    
+    # Video posters and metadata, run in the background (services/media_job_service.py)
+    FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+    FFPROBE_BINARY = os.getenv('FFPROBE_BINARY', 'ffprobe')
+    MEDIA_JOBS_INLINE_WORKER = os.getenv('MEDIA_JOBS_INLINE_WORKER', 'True') == 'True'  # False: run flask media-worker
+    MEDIA_JOB_TIMEOUT_SECONDS = int(os.getenv('MEDIA_JOB_TIMEOUT_SECONDS', 3600))  # Per ffmpeg run; HLS transcodes of long videos take a while
+    MEDIA_JOB_MAX_ATTEMPTS = int(os.getenv('MEDIA_JOB_MAX_ATTEMPTS', 3))
+    MEDIA_JOB_POLL_SECONDS = int(os.getenv('MEDIA_JOB_POLL_SECONDS', 30))
+    
+    # Adaptive streaming (HLS) renditions of gallery videos (services/hls_service.py)
+    GALLERY_HLS_ENABLED = os.getenv('GALLERY_HLS_ENABLED', 'False') == 'True'  # Transcode every new video
+    GALLERY_HLS_LADDER = os.getenv('GALLERY_HLS_LADDER', '360:800,720:2800,1080:5000')  # <short side>:<video kbps>
+    GALLERY_HLS_SEGMENT_SECONDS = int(os.getenv('GALLERY_HLS_SEGMENT_SECONDS', 6))
+    
+    # Orphan media collection (flask media-gc)
+    MEDIA_GC_GRACE_SECONDS = int(os.getenv('MEDIA_GC_GRACE_SECONDS', 24 * 3600))  # Younger files may still be mid-upload
+    MEDIA_GC_QUARANTINE_SECONDS = int(os.getenv('MEDIA_GC_QUARANTINE_SECONDS', 7 * 24 * 3600))
+    
+    # Resumable (tus) uploads for large videos, see docs/resumable-uploads.md
+    RESUMABLE_UPLOAD_FOLDER = os.getenv('RESUMABLE_UPLOAD_FOLDER', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resumable_uploads'))
+    RESUMABLE_UPLOAD_MAX_SIZE = int(os.getenv('RESUMABLE_UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))
+    RESUMABLE_UPLOAD_CHUNK_MAX_BYTES = int(os.getenv('RESUMABLE_UPLOAD_CHUNK_MAX_BYTES', 64 * 1024 * 1024))
+    RESUMABLE_UPLOAD_EXPIRY_SECONDS = int(os.getenv('RESUMABLE_UPLOAD_EXPIRY_SECONDS', 24 * 3600))  # Abandoned uploads are deleted after this
+    
+    # Upload storage (services/storage_service.py): local, or s3 for any S3-compatible store (needs boto3)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local')
+    S3_BUCKET = os.getenv('S3_BUCKET', '')
+    S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL', '')  # e.g. http://localhost:9000 for MinIO; empty for AWS
+    S3_REGION = os.getenv('S3_REGION', '')
+    S3_ACCESS_KEY_ID = os.getenv('S3_ACCESS_KEY_ID', '')
+    S3_SECRET_ACCESS_KEY = os.getenv('S3_SECRET_ACCESS_KEY', '')
+    S3_ADDRESSING_STYLE = os.getenv('S3_ADDRESSING_STYLE', 'auto')  # path for MinIO
+    S3_KEY_PREFIX = os.getenv('S3_KEY_PREFIX', '')
+    S3_PUBLIC_URL = os.getenv('S3_PUBLIC_URL', '')  # Public bucket/CDN base URL; empty: presigned GET URLs
+    S3_URL_EXPIRY_SECONDS = int(os.getenv('S3_URL_EXPIRY_SECONDS', 3600))
+    
+    # Browser uploads straight to storage, see docs/direct-uploads.md
+    DIRECT_UPLOAD_MAX_SIZE = int(os.getenv('DIRECT_UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))
+    DIRECT_UPLOAD_EXPIRY_SECONDS = int(os.getenv('DIRECT_UPLOAD_EXPIRY_SECONDS', 3600))
     
     # CORS settings
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173').split(',')
@@ -52,11 +202,39 @@ class Config:
     
     # Pagination
     ITEMS_PER_PAGE = 12
+    
+    # Delta sync feed
+    SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', 500))
+    SYNC_MAX_PAGE_SIZE = 2000
+    
+    # GraphQL read endpoint
+    GRAPHQL_MAX_DEPTH = int(os.getenv('GRAPHQL_MAX_DEPTH', 6))
+    GRAPHQL_MAX_COMPLEXITY = int(os.getenv('GRAPHQL_MAX_COMPLEXITY', 5000))
+    GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', 256))
+    
+    # Build /api/puppies and /api/gallery documents in SQL on PostgreSQL
+    SQL_JSON_RENDERING = os.getenv('SQL_JSON_RENDERING', 'True') == 'True'
+    
+    # Static catalog snapshots (served by the front proxy, see docs/static-snapshots.md)
+    SNAPSHOT_ENABLED = os.getenv('SNAPSHOT_ENABLED', 'False') == 'True'
+    SNAPSHOT_FOLDER = os.getenv('SNAPSHOT_FOLDER', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots'))
+    SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv('SNAPSHOT_DEBOUNCE_SECONDS', 2))
+    
+    # Batch endpoint
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 900))
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(
+        Config.SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+        Config.DB_POOL_TIMEOUT, DB_POOL_RECYCLE, Config.DB_PGBOUNCER
+    )
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -67,6 +245,12 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_REPLICA_URIS = []
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # SQLite in-memory uses a static single-connection pool
+    EVENT_BUS_BACKEND = 'local'
+    FILE_OPS_ASYNC = False  # Apply file deletes inline so tests see them immediately
+    CDN_PURGE_DELAY_SECONDS = 0  # Purge inline as well
+    MEDIA_JOBS_INLINE_WORKER = False  # Tests run jobs explicitly with run_pending_jobs()
 
 # Configuration dictionary
 config = {
@@ -1,21 +1,199 @@
 """
 Database initialization and configuration - FIXED VERSION
 SQLAlchemy setup for PostgreSQL
+Supports routing public catalog reads to read replicas
 """
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.dml import UpdateBase
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bind keys used for replica engines in SQLALCHEMY_BINDS
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Reports 0 on a primary or a fully caught-up standby, otherwise the seconds
+# since the last replayed transaction
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
 class Base(DeclarativeBase):
     """Base class for all models"""
     pass
 
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica when the current request opted in
+    via @read_replica. Flushes, INSERT/UPDATE/DELETE statements and anything
+    after the session has written stay on the primary (read-your-writes).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._can_use_replica(clause):
+            router = current_app.extensions.get('replica_router')
+            engine = router.choose() if router else None
+            if engine is not None:
+                return engine
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _can_use_replica(self, clause):
+        if self.info.get('route') != 'replica' or self.info.get('wrote'):
+            return False
+        if self._flushing or isinstance(clause, UpdateBase):
+            return False
+        return True
+
+
 # Initialize SQLAlchemy with custom base
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
+
+
+class ReplicaRouter:
+    """
+    Round-robins reads across the configured replica engines and skips any
+    replica whose replication lag exceeds REPLICA_MAX_LAG_SECONDS.
+    Lag is re-checked at most once per REPLICA_LAG_CHECK_INTERVAL per replica.
+    """
+
+    def __init__(self, app, bind_keys):
+        self.app = app
+        self.bind_keys = bind_keys
+        self.max_lag = app.config.get('REPLICA_MAX_LAG_SECONDS', 5)
+        self.check_interval = app.config.get('REPLICA_LAG_CHECK_INTERVAL', 10)
+        self._lag = {}  # bind key -> (lag seconds or None if unreachable, checked_at)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def _engines(self):
+        engines = db.engines
+        return [(key, engines[key]) for key in self.bind_keys]
+
+    def _measure_lag(self, engine):
+        if engine.dialect.name != 'postgresql':
+            return 0.0
+        with engine.connect() as conn:
+            return float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+
+    def lag_for(self, key, engine):
+        """Return cached lag for a replica, refreshing it when stale"""
+        now = time.monotonic()
+        lag, checked_at = self._lag.get(key, (None, None))
+
+        if checked_at is None or now - checked_at >= self.check_interval:
+            try:
+                lag = self._measure_lag(engine)
+            except Exception as e:
+                logger.warning(f"Replica '{key}' lag check failed: {str(e)}")
+                lag = None
+            self._lag[key] = (lag, now)
+
+        return lag
+
+    def choose(self):
+        """Pick a healthy replica engine, or None to fall back to the primary"""
+        engines = self._engines()
+        if not engines:
+            return None
+
+        with self._lock:
+            self._counter += 1
+            start = self._counter
+
+        for offset in range(len(engines)):
+            key, engine = engines[(start + offset) % len(engines)]
+            lag = self.lag_for(key, engine)
+            if lag is not None and lag <= self.max_lag:
+                return engine
+
+        return None
+
+    def status(self):
+        """Replica health snapshot for diagnostics"""
+        replicas = []
+        for key, engine in self._engines():
+            lag = self.lag_for(key, engine)
+            replicas.append({
+                'bind_key': key,
+                'lag_seconds': lag,
+                'healthy': lag is not None and lag <= self.max_lag,
+            })
+        return replicas
+
+
+def configure_replicas(app):
+    """
+    Register SQLALCHEMY_REPLICA_URIS as extra binds. Must run before
+    db.init_app(app) so Flask-SQLAlchemy creates the replica engines with
+    the same engine options as the primary.
+    """
+    replica_uris = [uri for uri in app.config.get('SQLALCHEMY_REPLICA_URIS', []) if uri]
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    bind_keys = []
+
+    for index, uri in enumerate(replica_uris):
+        key = f'{REPLICA_BIND_PREFIX}{index}'
+        binds[key] = uri
+        bind_keys.append(key)
+
+    app.config['SQLALCHEMY_BINDS'] = binds
+    app.extensions['replica_router'] = ReplicaRouter(app, bind_keys)
+
+    if bind_keys:
+        logger.info(f"📚 Read replicas configured: {len(bind_keys)}")
+
+
+def read_replica(f):
+    """
+    Decorator for public GET endpoints whose queries may be served by a replica.
+    Routes without it (admin flows, writes) always use the primary.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        session_info = db.session.info
+        previous = session_info.get('route')
+        # Inside read_primary() (e.g. a cache fill) reads stay on the primary
+        if previous != 'primary':
+            session_info['route'] = 'replica'
+        try:
+            return f(*args, **kwargs)
+        finally:
+            session_info['route'] = previous
+
+    return decorated
+
+
+@contextmanager
+def read_primary():
+    """
+    Keep reads on the primary, even in @read_replica endpoints: for
+    results that outlive the request (cached responses), where a lagging
+    replica would store pre-commit data
+    """
+    session_info = db.session.info
+    previous = session_info.get('route')
+    session_info['route'] = 'primary'
+    try:
+        yield
+    finally:
+        session_info['route'] = previous
 
 def init_db(app):
     """
@@ -29,6 +207,7 @@ def init_db(app):
         from models.puppy import Puppy, PuppyImage
         from models.gallery import Gallery
         from models.booking import Booking
+        from models.sync import SyncCounter, SyncTombstone
         
         try:
             # Create all tables if they don't exist
@@ -83,6 +262,18 @@ def init_db(app):
             traceback.print_exc()
             raise e
 
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_wrote(session, flush_context):
+    """Pin the rest of the session to the primary once it has written"""
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_session_wrote(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('wrote', None)
+
+
 def get_db_session():
     """Get database session for manual operations"""
     return db.session
\ No newline at end of file
@@ -0,0 +1,15 @@
+"""
+Gunicorn configuration
+Threaded workers so long-lived Server-Sent Event streams
+(/api/bookings/admin/stream) occupy one thread instead of a whole worker
+
+Run with: gunicorn "app:create_app()"
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5002')
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+timeout = 60
@@ -0,0 +1,74 @@
+-- Migration 002: Delta sync change sequence
+-- Created: October 2026
+-- Description: Monotonic change_seq on catalog tables, tombstones for deletes,
+--              and the counter that hands out sequence numbers (see services/sync_service.py)
+
+BEGIN;
+
+-- ============================================
+-- COLUMNS: change_seq on catalog tables
+-- ============================================
+ALTER TABLE dogs ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE dog_images ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE puppies ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE puppy_images ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+ALTER TABLE gallery ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+
+-- ============================================
+-- TABLE: sync_counters
+-- ============================================
+CREATE TABLE IF NOT EXISTS sync_counters (
+    name VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+-- ============================================
+-- TABLE: sync_tombstones
+-- ============================================
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id SERIAL PRIMARY KEY,
+    entity VARCHAR(30) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    change_seq BIGINT NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================
+-- BACKFILL: number existing rows 1..N
+-- ============================================
+CREATE TEMP TABLE sync_backfill AS
+SELECT entity, id,
+       ROW_NUMBER() OVER (ORDER BY created, entity, id)
+       + COALESCE((SELECT value FROM sync_counters WHERE name = 'catalog'), 0) AS seq
+FROM (
+    SELECT 'dog' AS entity, id, created_at AS created FROM dogs WHERE change_seq IS NULL
+    UNION ALL SELECT 'dog_image', id, uploaded_at FROM dog_images WHERE change_seq IS NULL
+    UNION ALL SELECT 'puppy', id, created_at FROM puppies WHERE change_seq IS NULL
+    UNION ALL SELECT 'puppy_image', id, uploaded_at FROM puppy_images WHERE change_seq IS NULL
+    UNION ALL SELECT 'gallery', id, uploaded_at FROM gallery WHERE change_seq IS NULL
+) AS rows_to_number;
+
+UPDATE dogs t SET change_seq = b.seq FROM sync_backfill b WHERE b.entity = 'dog' AND b.id = t.id;
+UPDATE dog_images t SET change_seq = b.seq FROM sync_backfill b WHERE b.entity = 'dog_image' AND b.id = t.id;
+UPDATE puppies t SET change_seq = b.seq FROM sync_backfill b WHERE b.entity = 'puppy' AND b.id = t.id;
+UPDATE puppy_images t SET change_seq = b.seq FROM sync_backfill b WHERE b.entity = 'puppy_image' AND b.id = t.id;
+UPDATE gallery t SET change_seq = b.seq FROM sync_backfill b WHERE b.entity = 'gallery' AND b.id = t.id;
+
+INSERT INTO sync_counters (name, value)
+VALUES ('catalog', COALESCE((SELECT MAX(seq) FROM sync_backfill), 0))
+ON CONFLICT (name) DO UPDATE
+SET value = GREATEST(sync_counters.value, EXCLUDED.value);
+
+DROP TABLE sync_backfill;
+
+-- ============================================
+-- INDEXES
+-- ============================================
+CREATE INDEX IF NOT EXISTS idx_dogs_change_seq ON dogs(change_seq);
+CREATE INDEX IF NOT EXISTS idx_dog_images_change_seq ON dog_images(change_seq);
+CREATE INDEX IF NOT EXISTS idx_puppies_change_seq ON puppies(change_seq);
+CREATE INDEX IF NOT EXISTS idx_puppy_images_change_seq ON puppy_images(change_seq);
+CREATE INDEX IF NOT EXISTS idx_gallery_change_seq ON gallery(change_seq);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_change_seq ON sync_tombstones(change_seq);
+
+COMMIT;
@@ -0,0 +1,55 @@
+-- Migration 003: Media assets
+-- Created: October 2026
+-- Description: Metadata of stored uploads (size, dimensions, checksum, placeholder) recorded
+--              once at ingest and referenced from every media column
+--              (see services/media_asset_service.py)
+--
+-- Existing rows are linked afterwards by reading their files:
+--     flask --app app backfill-media-assets
+
+BEGIN;
+
+-- ============================================
+-- TABLE: media_assets
+-- ============================================
+CREATE TABLE IF NOT EXISTS media_assets (
+    id SERIAL PRIMARY KEY,
+    file_path VARCHAR(255) NOT NULL UNIQUE,
+    mime_type VARCHAR(100),
+    bytes BIGINT,
+    width INTEGER,
+    height INTEGER,
+    duration_seconds DOUBLE PRECISION,
+    sha256 CHAR(64),
+    blurhash VARCHAR(100),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Databases created before the checksum was recorded
+ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS sha256 CHAR(64);
+
+-- ============================================
+-- COLUMNS: asset references
+-- ============================================
+ALTER TABLE dogs ADD COLUMN IF NOT EXISTS primary_image_asset_id INTEGER
+    REFERENCES media_assets(id) ON DELETE SET NULL;
+ALTER TABLE dog_images ADD COLUMN IF NOT EXISTS asset_id INTEGER
+    REFERENCES media_assets(id) ON DELETE SET NULL;
+ALTER TABLE puppies ADD COLUMN IF NOT EXISTS primary_image_asset_id INTEGER
+    REFERENCES media_assets(id) ON DELETE SET NULL;
+ALTER TABLE puppy_images ADD COLUMN IF NOT EXISTS asset_id INTEGER
+    REFERENCES media_assets(id) ON DELETE SET NULL;
+ALTER TABLE gallery ADD COLUMN IF NOT EXISTS asset_id INTEGER
+    REFERENCES media_assets(id) ON DELETE SET NULL;
+
+-- ============================================
+-- INDEXES
+-- ============================================
+-- Back the ON DELETE SET NULL lookups and the backfill's "asset_id IS NULL" scans
+CREATE INDEX IF NOT EXISTS idx_dogs_primary_image_asset ON dogs(primary_image_asset_id);
+CREATE INDEX IF NOT EXISTS idx_dog_images_asset ON dog_images(asset_id);
+CREATE INDEX IF NOT EXISTS idx_puppies_primary_image_asset ON puppies(primary_image_asset_id);
+CREATE INDEX IF NOT EXISTS idx_puppy_images_asset ON puppy_images(asset_id);
+CREATE INDEX IF NOT EXISTS idx_gallery_asset ON gallery(asset_id);
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- Migration 004: Perceptual hashes
+-- Created: October 2026
+-- Description: 64-bit dHash of image assets for near-duplicate detection in the
+--              gallery (see services/duplicate_service.py)
+--
+-- Existing image assets are hashed afterwards:
+--     flask --app app backfill-phash
+
+BEGIN;
+
+-- ============================================
+-- COLUMNS: media_assets.phash
+-- ============================================
+ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS phash BIGINT;
+
+COMMIT;
@@ -0,0 +1,42 @@
+-- Migration 005: Media jobs
+-- Created: October 2026
+-- Description: Background jobs for gallery media (video poster frames and
+--              stream metadata via ffmpeg), the poster of each video and the
+--              codec of video assets (see services/media_job_service.py)
+--
+-- Videos uploaded before this migration are queued afterwards:
+--     flask --app app enqueue-video-jobs
+
+BEGIN;
+
+-- ============================================
+-- TABLE: media_jobs
+-- ============================================
+CREATE TABLE IF NOT EXISTS media_jobs (
+    id SERIAL PRIMARY KEY,
+    gallery_id INTEGER NOT NULL REFERENCES gallery(id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    CONSTRAINT media_job_status_check CHECK (status IN ('queued', 'running', 'done', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS ix_media_jobs_gallery_id ON media_jobs(gallery_id);
+CREATE INDEX IF NOT EXISTS idx_media_jobs_status_run_after ON media_jobs(status, run_after);
+
+-- ============================================
+-- COLUMNS: video metadata and posters
+-- ============================================
+ALTER TABLE media_assets ADD COLUMN IF NOT EXISTS codec VARCHAR(50);
+
+ALTER TABLE gallery ADD COLUMN IF NOT EXISTS poster_asset_id INTEGER
+    REFERENCES media_assets(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_gallery_poster_asset ON gallery(poster_asset_id);
+
+COMMIT;
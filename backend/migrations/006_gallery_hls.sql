@@ -0,0 +1,17 @@
+-- Migration 006: HLS renditions
+-- Created: October 2026
+-- Description: Adaptive streaming ladder of gallery videos and the progress of
+--              its transcode (see services/hls_service.py)
+--
+-- Existing videos are transcoded on request:
+--     flask --app app enqueue-video-jobs --kind hls
+
+BEGIN;
+
+-- ============================================
+-- COLUMNS: gallery.hls_path, gallery.hls_status
+-- ============================================
+ALTER TABLE gallery ADD COLUMN IF NOT EXISTS hls_path VARCHAR(255);
+ALTER TABLE gallery ADD COLUMN IF NOT EXISTS hls_status VARCHAR(20);
+
+COMMIT;
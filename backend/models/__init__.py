@@ -8,6 +8,9 @@ from models.dog import Dog, DogImage
 from models.puppy import Puppy, PuppyImage
 from models.gallery import Gallery
 from models.booking import Booking
+from models.sync import SyncCounter, SyncTombstone
+from models.media_asset import MediaAsset
+from models.media_job import MediaJob
 
 __all__ = [
     'Admin',
@@ -16,5 +19,9 @@ __all__ = [
     'Puppy',
     'PuppyImage',
     'Gallery',
-    'Booking'
+    'Booking',
+    'SyncCounter',
+    'SyncTombstone',
+    'MediaAsset',
+    'MediaJob'
 ]
\ No newline at end of file
@@ -6,12 +6,13 @@ Fixed to return full image URLs like the working Puppy model
 
 from datetime import datetime
 from database import db
+from services.media_url_service import MediaUrlMixin
 
 
 # =========================
 # Dog Model
 # =========================
-class Dog(db.Model):
+class Dog(MediaUrlMixin, db.Model):
     __tablename__ = "dogs"
 
     # Primary Key
@@ -34,10 +35,17 @@ class Dog(db.Model):
 
     # Media
     primary_image = db.Column(db.String(255))
+    primary_image_asset_id = db.Column(
+        db.Integer,
+        db.ForeignKey("media_assets.id", ondelete="SET NULL"),
+    )
 
     # Status
     is_active = db.Column(db.Boolean, default=True, nullable=False)
 
+    # Sync feed position (see services/sync_service.py)
+    change_seq = db.Column(db.BigInteger, index=True)
+
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
@@ -48,6 +56,8 @@ class Dog(db.Model):
     )
 
     # Relationships
+    primary_image_asset = db.relationship("MediaAsset", lazy="joined")
+
     images = db.relationship(
         "DogImage",
         backref="dog",
@@ -81,31 +91,6 @@ class Dog(db.Model):
         ),
     )
 
-    # -------------------------
-    # FIXED: Image URL Helper (Instance Method)
-    # -------------------------
-    def get_image_url(self, image_path):
-        """
-        Convert relative image path to full URL
-        CRITICAL: Frontend needs full URL to display images
-        Matches the working Puppy model implementation
-        """
-        if not image_path:
-            return None
-        
-        # If already a full URL, return as-is
-        if image_path.startswith('http'):
-            return image_path
-        
-        # Build full URL: http://localhost:5002/uploads/dogs/image.jpg
-        # In production, use your domain
-        base_url = 'http://localhost:5002'  # Change in production
-        
-        # Ensure path doesn't start with /
-        clean_path = image_path.lstrip('/')
-        
-        return f"{base_url}/uploads/{clean_path}"
-
     # -------------------------
     # Serialization - FIXED
     # -------------------------
@@ -125,7 +110,10 @@ class Dog(db.Model):
             "health_clearances": self.health_clearances,
             "achievements": self.achievements,
             # CRITICAL: Return full URL for primary image using instance method
-            "primary_image": self.get_image_url(self.primary_image),
+            "primary_image": self.get_image_url(self.primary_image, self.primary_image_asset),
+            "primary_image_meta": self.primary_image_asset.to_dict()
+            if self.primary_image_asset
+            else None,
             "is_active": self.is_active,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
@@ -143,7 +131,7 @@ class Dog(db.Model):
 # =========================
 # DogImage Model - FIXED
 # =========================
-class DogImage(db.Model):
+class DogImage(MediaUrlMixin, db.Model):
     __tablename__ = "dog_images"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -155,26 +143,23 @@ class DogImage(db.Model):
     )
 
     image_path = db.Column(db.String(255), nullable=False)
+    asset_id = db.Column(
+        db.Integer,
+        db.ForeignKey("media_assets.id", ondelete="SET NULL"),
+    )
     caption = db.Column(db.Text)
     display_order = db.Column(db.Integer, default=0)
 
+    # Sync feed position
+    change_seq = db.Column(db.BigInteger, index=True)
+
     uploaded_at = db.Column(
         db.DateTime,
         default=datetime.utcnow,
         nullable=False,
     )
 
-    def get_image_url(self, image_path):
-        """Convert relative path to full URL - matches Puppy implementation"""
-        if not image_path:
-            return None
-        
-        if image_path.startswith('http'):
-            return image_path
-        
-        base_url = 'http://localhost:5002'
-        clean_path = image_path.lstrip('/')
-        return f"{base_url}/uploads/{clean_path}"
+    asset = db.relationship("MediaAsset", lazy="joined")
 
     def to_dict(self) -> dict:
         """Convert model to dictionary for JSON responses"""
@@ -182,7 +167,8 @@ class DogImage(db.Model):
             "id": self.id,
             "dog_id": self.dog_id,
             # CRITICAL: Return full URL using instance method
-            "image_path": self.get_image_url(self.image_path),
+            "image_path": self.get_image_url(self.image_path, self.asset),
+            "image_meta": self.asset.to_dict() if self.asset else None,
             "caption": self.caption,
             "display_order": self.display_order,
             "uploaded_at": self.uploaded_at.isoformat(),
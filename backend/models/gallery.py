@@ -4,10 +4,11 @@ Represents photos and videos in the kennel gallery
 Properly returns full URLs matching Flask's /uploads/<path:filename> route
 """
 from database import db
+from services.media_url_service import MediaUrlMixin
 from datetime import datetime
 
 
-class Gallery(db.Model):
+class Gallery(MediaUrlMixin, db.Model):
     __tablename__ = 'gallery'
     
     # Primary Key
@@ -18,6 +19,14 @@ class Gallery(db.Model):
     description = db.Column(db.Text)
     media_type = db.Column(db.String(20), nullable=False)  # Image, Video
     file_path = db.Column(db.String(255), nullable=False)
+    asset_id = db.Column(db.Integer, db.ForeignKey('media_assets.id', ondelete='SET NULL'))
+    
+    # Videos: poster frame extracted in the background (services/media_job_service.py)
+    poster_asset_id = db.Column(db.Integer, db.ForeignKey('media_assets.id', ondelete='SET NULL'))
+    
+    # Videos: HLS master playlist, set once a transcode completes (services/hls_service.py)
+    hls_path = db.Column(db.String(255))
+    hls_status = db.Column(db.String(20))  # queued, running, ready, failed
     
     # Organization
     category = db.Column(db.String(50), default='General')
@@ -26,40 +35,32 @@ class Gallery(db.Model):
     # Status
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     
+    # Sync feed position (see services/sync_service.py)
+    change_seq = db.Column(db.BigInteger, index=True)
+    
     # Timestamp
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
+    # Relationships
+    asset = db.relationship('MediaAsset', foreign_keys=[asset_id], lazy='joined')
+    poster_asset = db.relationship('MediaAsset', foreign_keys=[poster_asset_id], lazy='joined')
+    
     # Constraints
     __table_args__ = (
         db.CheckConstraint(media_type.in_(['Image', 'Video']), name='gallery_media_type_check'),
     )
     
-    def get_media_url(self, file_path):
-        """
-        Convert relative file path to full URL
-        CRITICAL: Must match Flask's route: /uploads/<path:filename>
-        
-        Examples of what's stored in DB and what should be returned:
-        - DB stores: "gallery/image_123.jpg"
-        - Method returns: "http://localhost:5002/uploads/gallery/image_123.jpg"
-        
-        This matches the Dog and Puppy models exactly.
-        """
-        if not file_path:
-            return None
-        
-        # If already a full URL, return as-is
-        if file_path.startswith('http'):
-            return file_path
-        
-        # Build full URL to match Flask's /uploads/<path:filename> route
-        base_url = 'http://localhost:5002'  # Change in production
-        
-        # Clean path: remove leading slash if present
-        clean_path = file_path.lstrip('/')
-        
-        # Construct URL: base + /uploads/ + path
-        return f"{base_url}/uploads/{clean_path}"
+    def video_dict(self):
+        """Poster frame and stream metadata of a video item"""
+        return {
+            'duration_seconds': self.asset.duration_seconds if self.asset else None,
+            'codec': self.asset.codec if self.asset else None,
+            'poster_url': self.get_media_url(self.poster_asset.file_path, self.poster_asset) if self.poster_asset else None,
+            'poster_meta': self.poster_asset.to_dict() if self.poster_asset else None,
+            # Adaptive stream; media_url keeps serving the original until it's ready
+            'hls_url': self.get_media_url(self.hls_path),
+            'hls_status': self.hls_status
+        }
     
     def to_dict(self):
         """
@@ -73,9 +74,13 @@ class Gallery(db.Model):
             # Normalize to lowercase for frontend consistency
             'media_type': self.media_type.lower() if self.media_type else 'image',
             # CRITICAL: Return full URL for frontend to display
-            'media_url': self.get_media_url(self.file_path),
+            'media_url': self.get_media_url(self.file_path, self.asset),
             # Keep relative path for admin/backend use
             'file_path': self.file_path,
+            # Width/height/bytes/blurhash so the frontend can reserve layout space
+            'media_meta': self.asset.to_dict() if self.asset else None,
+            # Videos: poster and stream info, so grids never load video bytes
+            'video': self.video_dict() if self.media_type == 'Video' else None,
             'category': self.category,
             'display_order': self.display_order,
             'is_active': self.is_active,
@@ -0,0 +1,50 @@
+"""
+Media Asset Model
+Metadata of a stored upload (dimensions, size, ...) read once at ingest,
+so responses never have to open or stat the file
+"""
+
+from database import db
+from datetime import datetime
+
+
+class MediaAsset(db.Model):
+    __tablename__ = 'media_assets'
+
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Stored file, relative to UPLOAD_FOLDER (same value as the owning column)
+    file_path = db.Column(db.String(255), unique=True, nullable=False)
+
+    # File Information
+    mime_type = db.Column(db.String(100))
+    bytes = db.Column(db.BigInteger)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    duration_seconds = db.Column(db.Float)
+    codec = db.Column(db.String(50))  # Videos: codec of the first video stream
+
+    # Hex SHA-256 of the stored bytes (after image optimization); the ?v= of media URLs
+    sha256 = db.Column(db.String(64))
+
+    # Placeholder shown while the media loads
+    blurhash = db.Column(db.String(100))
+
+    # Perceptual hash (64-bit dHash, signed) for near-duplicate detection
+    phash = db.Column(db.BigInteger)
+
+    # Timestamp
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        """Layout metadata embedded in the owning row's to_dict()"""
+        return {
+            'width': self.width,
+            'height': self.height,
+            'bytes': self.bytes,
+            'blurhash': self.blurhash
+        }
+
+    def __repr__(self):
+        return f'<MediaAsset {self.file_path} ({self.width}x{self.height})>'
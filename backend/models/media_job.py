@@ -0,0 +1,60 @@
+"""
+Media Job Model
+Background processing of gallery media (video poster frames, ...),
+queued in the database so jobs survive restarts and are shared by all
+worker processes
+"""
+
+from database import db
+from datetime import datetime
+
+
+class MediaJob(db.Model):
+    __tablename__ = 'media_jobs'
+
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Target
+    gallery_id = db.Column(db.Integer, db.ForeignKey('gallery.id', ondelete='CASCADE'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # poster, ...
+
+    # Progress
+    status = db.Column(db.String(20), default='queued', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Retry backoff
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # Relationships
+    gallery = db.relationship(
+        'Gallery',
+        backref=db.backref('media_jobs', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    )
+
+    # Constraints
+    __table_args__ = (
+        db.CheckConstraint(status.in_(['queued', 'running', 'done', 'failed']), name='media_job_status_check'),
+        db.Index('idx_media_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def to_dict(self):
+        """Convert model to dictionary for JSON responses"""
+        return {
+            'id': self.id,
+            'gallery_id': self.gallery_id,
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<MediaJob {self.kind} for Gallery {self.gallery_id} ({self.status})>'
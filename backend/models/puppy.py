@@ -5,10 +5,11 @@ Fixed to return full image URLs
 """
 
 from database import db
+from services.media_url_service import MediaUrlMixin
 from datetime import datetime
 from flask import current_app
 
-class Puppy(db.Model):
+class Puppy(MediaUrlMixin, db.Model):
     __tablename__ = 'puppies'
     
     # Primary Key
@@ -37,16 +38,21 @@ class Puppy(db.Model):
     
     # Media
     primary_image = db.Column(db.String(255))
+    primary_image_asset_id = db.Column(db.Integer, db.ForeignKey('media_assets.id', ondelete='SET NULL'))
     
     # Display Settings
     is_featured = db.Column(db.Boolean, default=False, nullable=False)
     
+    # Sync feed position (see services/sync_service.py)
+    change_seq = db.Column(db.BigInteger, index=True)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     sold_at = db.Column(db.DateTime)
     
     # Relationships
+    primary_image_asset = db.relationship('MediaAsset', lazy='joined')
     images = db.relationship('PuppyImage', backref='puppy', lazy=True, cascade='all, delete-orphan')
     bookings = db.relationship('Booking', backref='puppy', lazy=True)
     
@@ -56,27 +62,6 @@ class Puppy(db.Model):
         db.CheckConstraint(status.in_(['Available', 'Reserved', 'Sold']), name='puppy_status_check'),
     )
     
-    def get_image_url(self, image_path):
-        """
-        Convert relative image path to full URL
-        CRITICAL: Frontend needs full URL to display images
-        """
-        if not image_path:
-            return None
-        
-        # If already a full URL, return as-is
-        if image_path.startswith('http'):
-            return image_path
-        
-        # Build full URL: http://localhost:5002/uploads/puppies/image.jpg
-        # In production, use your domain
-        base_url = 'http://localhost:5002'  # Change in production
-        
-        # Ensure path doesn't start with /
-        clean_path = image_path.lstrip('/')
-        
-        return f"{base_url}/uploads/{clean_path}"
-    
     def to_dict(self, include_images=False, include_parents=False):
         """Convert model to dictionary for JSON responses"""
         data = {
@@ -93,7 +78,8 @@ class Puppy(db.Model):
             'personality_traits': self.personality_traits,
             'health_notes': self.health_notes,
             # CRITICAL: Return full URL for primary image
-            'primary_image': self.get_image_url(self.primary_image),
+            'primary_image': self.get_image_url(self.primary_image, self.primary_image_asset),
+            'primary_image_meta': self.primary_image_asset.to_dict() if self.primary_image_asset else None,
             'is_featured': self.is_featured,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
@@ -119,7 +105,7 @@ class Puppy(db.Model):
         return f'<Puppy {self.name or "Unnamed"} ({self.gender}, {self.status})>'
 
 
-class PuppyImage(db.Model):
+class PuppyImage(MediaUrlMixin, db.Model):
     __tablename__ = 'puppy_images'
     
     # Primary Key
@@ -130,30 +116,26 @@ class PuppyImage(db.Model):
     
     # Image Information
     image_path = db.Column(db.String(255), nullable=False)
+    asset_id = db.Column(db.Integer, db.ForeignKey('media_assets.id', ondelete='SET NULL'))
     caption = db.Column(db.Text)
     display_order = db.Column(db.Integer, default=0)
     
+    # Sync feed position
+    change_seq = db.Column(db.BigInteger, index=True)
+    
     # Timestamp
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
-    def get_image_url(self, image_path):
-        """Convert relative path to full URL"""
-        if not image_path:
-            return None
-        
-        if image_path.startswith('http'):
-            return image_path
-        
-        base_url = 'http://localhost:5002'
-        clean_path = image_path.lstrip('/')
-        return f"{base_url}/uploads/{clean_path}"
+    # Relationships
+    asset = db.relationship('MediaAsset', lazy='joined')
     
     def to_dict(self):
         """Convert model to dictionary for JSON responses"""
         return {
             'id': self.id,
             'puppy_id': self.puppy_id,
-            'image_path': self.get_image_url(self.image_path),  # Return full URL
+            'image_path': self.get_image_url(self.image_path, self.asset),  # Return full URL
+            'image_meta': self.asset.to_dict() if self.asset else None,
             'caption': self.caption,
             'display_order': self.display_order,
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None
@@ -0,0 +1,45 @@
+"""
+Sync Models
+Change-sequence bookkeeping for the incremental catalog sync feed
+"""
+
+from database import db
+from datetime import datetime
+
+
+class SyncCounter(db.Model):
+    __tablename__ = 'sync_counters'
+    
+    # One row per sequence; 'catalog' stamps Dog, Puppy, images and Gallery
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<SyncCounter {self.name}={self.value}>'
+
+
+class SyncTombstone(db.Model):
+    __tablename__ = 'sync_tombstones'
+    
+    # Primary Key
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # Deleted row
+    entity = db.Column(db.String(30), nullable=False)  # dog, dog_image, puppy, puppy_image, gallery
+    entity_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False, index=True)
+    
+    # Timestamp
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        """Convert model to dictionary for JSON responses"""
+        return {
+            'entity': self.entity,
+            'id': self.entity_id,
+            'change_seq': self.change_seq,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None
+        }
+    
+    def __repr__(self):
+        return f'<SyncTombstone {self.entity} {self.entity_id} @{self.change_seq}>'
@@ -0,0 +1,148 @@
+"""
+Batch Routes
+Run several API calls in one round trip. Sub-requests are dispatched
+in-process inside the batch's app context, so they share one database
+session and identity map.
+"""
+
+import logging
+from urllib.parse import urlsplit
+from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import HTTPException
+from database import db
+from utils.jwt_helper import get_request_admin
+
+logger = logging.getLogger(__name__)
+
+batch_bp = Blueprint('batch', __name__)
+
+MAX_REDIRECTS = 2
+
+
+def _run_subrequest(spec, auth_header):
+    """
+    Dispatch one sub-request through the app
+
+    Args:
+        spec: {'method', 'path', 'body' (JSON) or 'form'} of the sub-request
+        auth_header: Authorization header to forward (admin batches only)
+
+    Returns:
+        tuple: (status code, body)
+    """
+    method = spec.get('method') or 'GET'
+    path = spec.get('path') or ''
+    if not isinstance(method, str) or not isinstance(path, str):
+        return 400, {'error': 'method and path must be strings'}
+    method = method.upper()
+
+    if not path.startswith('/api/') or path.startswith('/api/batch'):
+        return 400, {'error': 'path must be an /api/ endpoint other than /api/batch'}
+
+    if method != 'GET' and not auth_header:
+        return 403, {'error': 'Only GET sub-requests are allowed without admin authentication'}
+
+    headers = {'Authorization': auth_header} if auth_header else {}
+    options = {'method': method, 'headers': headers, 'base_url': request.host_url}
+    if spec.get('body') is not None:
+        options['json'] = spec['body']
+    elif spec.get('form') is not None:
+        options['data'] = spec['form']
+
+    # Follow the app's own trailing-slash redirects (/api/dogs -> /api/dogs/)
+    for _ in range(MAX_REDIRECTS + 1):
+        status, body, location = _dispatch(path, options)
+        if status not in (301, 308) or not location:
+            return status, body
+        path = urlsplit(location)._replace(scheme='', netloc='').geturl()
+
+    return 400, {'error': 'Too many redirects'}
+
+
+def _is_event_stream(path, method):
+    """Whether path resolves to a streaming view (marked by admin_stream_required)"""
+    adapter = current_app.url_map.bind(request.host)
+    try:
+        endpoint, _ = adapter.match(urlsplit(path).path, method)
+    except HTTPException:
+        # 404/405/redirects: dispatched normally, and checked again after a redirect
+        return False
+    return getattr(current_app.view_functions.get(endpoint), 'event_stream', False)
+
+
+def _dispatch(path, options):
+    # Rejected before the view runs: it subscribes to the broker and
+    # releases the shared session before returning its stream
+    if _is_event_stream(path, options['method']):
+        return 400, {'error': 'Streaming endpoints cannot be batched'}, None
+
+    # The app context is already active, so this only pushes a request
+    # context: db.session (scoped to the app context) is shared
+    with current_app.test_request_context(path, **options):
+        try:
+            response = current_app.full_dispatch_request()
+        except Exception as e:
+            logger.error(f"Batch sub-request {options['method']} {path} failed: {str(e)}")
+            db.session.rollback()
+            return 500, {'error': 'Internal server error'}, None
+
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+        response.close()
+        return response.status_code, body, response.headers.get('Location')
+
+
+@batch_bp.route('', methods=['POST'])
+@batch_bp.route('/', methods=['POST'])
+def run_batch():
+    """
+    Execute multiple API requests in one call
+
+    Expected JSON:
+    {
+        "requests": [
+            {"id": "dogs", "method": "GET", "path": "/api/dogs?role=Stud"},
+            {"id": "featured", "path": "/api/puppies?featured=true"},
+            {"id": "categories", "path": "/api/gallery/categories"},
+            {"method": "PUT", "path": "/api/bookings/admin/7", "body": {...}},
+            {"method": "PUT", "path": "/api/dogs/admin/3", "form": {...}}
+        ]
+    }
+
+    Anonymous callers may only batch GET requests. With an admin Bearer
+    token, any method is allowed and the token is checked once for the
+    whole batch.
+
+    Returns:
+        {"responses": [{"id", "status", "body"}, ...]} in request order
+    """
+    data = request.get_json(silent=True)
+    specs = data.get('requests') if isinstance(data, dict) else data
+
+    if not isinstance(specs, list) or not specs:
+        return jsonify({'error': 'requests must be a non-empty list'}), 400
+
+    max_requests = current_app.config.get('BATCH_MAX_REQUESTS', 20)
+    if len(specs) > max_requests:
+        return jsonify({'error': f'At most {max_requests} requests per batch'}), 400
+
+    if any(not isinstance(spec, dict) for spec in specs):
+        return jsonify({'error': 'Each request must be an object'}), 400
+
+    auth_header = None
+    if request.headers.get('Authorization'):
+        if get_request_admin() is None:
+            return jsonify({'error': 'Invalid or expired token'}), 401
+        auth_header = request.headers['Authorization']
+
+    responses = []
+    for index, spec in enumerate(specs):
+        status, body = _run_subrequest(spec, auth_header)
+        responses.append({
+            'id': spec.get('id', index),
+            'status': status,
+            'body': body
+        })
+
+    return jsonify({'responses': responses}), 200
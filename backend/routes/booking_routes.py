@@ -4,10 +4,12 @@ API endpoints for customer inquiries and booking management
 Full email integration will be added in Phase 5
 """
 
-from flask import Blueprint, request, jsonify
+import time
+from flask import Blueprint, request, jsonify, Response, current_app
 from models.booking import Booking
 from database import db
-from utils.jwt_helper import admin_required
+from utils.jwt_helper import admin_required, admin_stream_required
+from services.notification_service import get_broker, format_sse
 from utils.validators import validate_email, validate_phone, validate_status
 
 booking_bp = Blueprint('bookings', __name__)
@@ -215,6 +217,51 @@ def get_booking_stats(current_user):
     }), 200
 
 
+@booking_bp.route('/admin/stream', methods=['GET'])
+@admin_stream_required
+def stream_notifications(current_user):
+    """
+    Live admin notifications as Server-Sent Events (admin only)
+    Events: booking.created, booking.updated, puppy.status_changed
+    
+    Auth: Authorization header or ?token= (EventSource cannot set headers)
+    Resume: the browser resends the Last-Event-ID header on reconnect;
+    ?last_event_id= is accepted as well
+    """
+    broker = get_broker()
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+    max_duration = current_app.config.get('SSE_MAX_STREAM_SECONDS', 300)
+    subscriber = broker.subscribe(last_event_id)
+    
+    # The stream never touches the database: give the connection back now
+    db.session.remove()
+    
+    def generate():
+        deadline = time.monotonic() + max_duration
+        try:
+            yield 'retry: 3000\n\n'
+            while time.monotonic() < deadline and not subscriber.overflowed:
+                event = subscriber.next_event(timeout=heartbeat)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield format_sse(event)
+        finally:
+            broker.unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Disable nginx response buffering
+    })
+
+
 @booking_bp.route('/admin/test-email', methods=['POST'])
 @admin_required
 def test_email(current_user):
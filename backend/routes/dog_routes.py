@@ -7,10 +7,13 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 
 from models import Dog, DogImage
-from database import db
+from database import db, read_replica
 from utils.jwt_helper import admin_required
+from services.cache_service import cached_response
+from services.cdn_purge_service import surrogate_keys
 from utils.validators import validate_gender, validate_date_format
-from services.file_service import save_uploaded_file, delete_file
+from services.file_service import save_uploaded_file
+from services.file_ops_service import register_new_file, schedule_file_delete
 
 dog_bp = Blueprint("dogs", __name__)
 
@@ -20,6 +23,9 @@ dog_bp = Blueprint("dogs", __name__)
 # =====================================================
 
 @dog_bp.route("/", methods=["GET"])
+@surrogate_keys("collection:dogs")
+@cached_response("dogs")
+@read_replica
 def get_dogs():
     """
     Get all active parent dogs (public)
@@ -47,6 +53,9 @@ def get_dogs():
 
 
 @dog_bp.route("/<int:dog_id>", methods=["GET"])
+@surrogate_keys("dog:{dog_id}")
+@cached_response("dogs")
+@read_replica
 def get_dog(dog_id):
     """Get single active dog (public)"""
     dog = Dog.query.get(dog_id)
@@ -97,6 +106,7 @@ def create_dog(current_user):
         if not success:
             return jsonify({"error": result}), 400
         primary_image = result
+        register_new_file(db.session, result)
 
     try:
         dog = Dog(
@@ -171,8 +181,9 @@ def update_dog(current_user, dog_id):
             success, result = save_uploaded_file(file, "dogs")
             if not success:
                 return jsonify({"error": result}), 400
+            register_new_file(db.session, result)
             if dog.primary_image:
-                delete_file(dog.primary_image)
+                schedule_file_delete(db.session, dog.primary_image)
             dog.primary_image = result
 
         db.session.commit()
@@ -196,10 +207,10 @@ def delete_dog(current_user, dog_id):
 
     try:
         if dog.primary_image:
-            delete_file(dog.primary_image)
+            schedule_file_delete(db.session, dog.primary_image)
 
         for img in dog.images:
-            delete_file(img.image_path)
+            schedule_file_delete(db.session, img.image_path)
 
         db.session.delete(dog)
         db.session.commit()
@@ -231,6 +242,7 @@ def add_dog_images(current_user, dog_id):
         for file in files:
             success, result = save_uploaded_file(file, "dogs")
             if success:
+                register_new_file(db.session, result)
                 img = DogImage(
                     dog_id=dog_id,
                     image_path=result,
@@ -259,7 +271,7 @@ def delete_dog_image(current_user, image_id):
         return jsonify({"error": "Image not found"}), 404
 
     try:
-        delete_file(image.image_path)
+        schedule_file_delete(db.session, image.image_path)
         db.session.delete(image)
         db.session.commit()
         return jsonify({"message": "Image deleted"}), 200
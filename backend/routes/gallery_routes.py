@@ -3,11 +3,22 @@ Gallery Routes
 API endpoints for kennel gallery management (public + admin)
 """
 
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from models.gallery import Gallery
-from database import db
+from database import db, read_replica
 from utils.jwt_helper import admin_required
+from services.cache_service import cached_response
+from services.cdn_purge_service import surrogate_keys, gallery_list_keys
+from services.sql_json_service import sql_json_enabled, render_gallery, json_body_response
 from services.file_service import save_uploaded_file, delete_file
+from services.file_ops_service import schedule_file_delete
+from services.bulk_upload_service import bulk_upload_gallery
+from services.gallery_service import media_type_for, add_gallery_item
+from services.media_asset_service import probe_path
+from services.duplicate_service import duplicate_mode, find_duplicates, duplicate_clusters
+from services.media_job_service import enqueue_job
+from services.hls_service import hls_files
 
 gallery_bp = Blueprint('gallery', __name__)
 
@@ -17,6 +28,9 @@ gallery_bp = Blueprint('gallery', __name__)
 # ============================================
 
 @gallery_bp.route('/', methods=['GET'])
+@surrogate_keys(gallery_list_keys)
+@cached_response('gallery')
+@read_replica
 def get_gallery_items():
     """
     Get all active gallery items (public)
@@ -37,6 +51,10 @@ def get_gallery_items():
     if media_type_filter and media_type_filter in ['Image', 'Video']:
         query = query.filter_by(media_type=media_type_filter)
     
+    # On PostgreSQL the whole document is built in SQL (same output, no ORM hydration)
+    if sql_json_enabled():
+        return json_body_response(render_gallery(query))
+    
     # Order by display_order, then upload date
     query = query.order_by(Gallery.display_order, Gallery.uploaded_at.desc())
     
@@ -49,6 +67,9 @@ def get_gallery_items():
 
 
 @gallery_bp.route('/categories', methods=['GET'])
+@surrogate_keys('collection:gallery')
+@cached_response('gallery')
+@read_replica
 def get_categories():
     """
     Get all distinct categories (public)
@@ -93,6 +114,9 @@ def create_gallery_item(current_user):
         - category: String (default: General)
         - display_order: Integer (default: 0)
         - is_active: Boolean (default: true)
+        - duplicates: flag / skip / allow (default: GALLERY_DUPLICATE_MODE)
+          What to do when the image looks like an existing item: 'flag'
+          lists them in the response, 'skip' rejects the upload with 409
     """
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
@@ -101,47 +125,46 @@ def create_gallery_item(current_user):
     data = request.form
     
     # Determine media type based on file extension
-    file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
-    
-    if file_ext in ['png', 'jpg', 'jpeg', 'gif', 'webp']:
-        media_type = 'Image'
-        folder = 'gallery'
-    elif file_ext in ['mp4', 'mov', 'avi', 'webm']:
-        media_type = 'Video'
-        folder = 'gallery'
-    else:
+    media_type = media_type_for(file.filename)
+    
+    if media_type is None:
         return jsonify({'error': 'Invalid file type. Must be image or video'}), 400
     
+    mode = duplicate_mode(data.get('duplicates'))
+    if mode is None:
+        return jsonify({'error': 'duplicates must be flag, skip or allow'}), 400
+    
     # Upload file
-    success, result = save_uploaded_file(file, folder)
+    success, result = save_uploaded_file(file, 'gallery')
     
     if not success:
         return jsonify({'error': f'File upload failed: {result}'}), 400
     
+    # Decoded once: the perceptual hash and the asset metadata come from one probe
+    meta = probe_path(result)
+    
+    # Near-duplicates of existing items (perceptual hash)
+    duplicates = []
+    if media_type == 'Image' and mode != 'allow':
+        duplicates = find_duplicates(meta['phash'] if meta else None)
+        if duplicates and mode == 'skip':
+            delete_file(result)
+            return jsonify({
+                'error': 'Image is a near-duplicate of an existing gallery item',
+                'duplicates': duplicates
+            }), 409
+    
     # Create gallery item
     try:
-        gallery_item = Gallery(
-            title=data.get('title'),
-            description=data.get('description'),
-            media_type=media_type,
-            file_path=result,
-            category=data.get('category', 'General'),
-            display_order=int(data.get('display_order', 0)),
-            is_active=data.get('is_active', 'true').lower() == 'true'
-        )
-        
-        db.session.add(gallery_item)
-        db.session.commit()
+        gallery_item = add_gallery_item(result, media_type, data, meta)
         
         return jsonify({
             'message': 'Gallery item uploaded successfully',
-            'item': gallery_item.to_dict()
+            'item': gallery_item.to_dict(),
+            'duplicates': duplicates
         }), 201
     
     except Exception as e:
-        db.session.rollback()
-        # Delete uploaded file if DB insert fails
-        delete_file(result)
         return jsonify({'error': f'Error creating gallery item: {str(e)}'}), 500
 
 
@@ -199,8 +222,12 @@ def delete_gallery_item(current_user, item_id):
         return jsonify({'error': 'Gallery item not found'}), 404
     
     try:
-        # Delete file
-        delete_file(item.file_path)
+        # Delete file (once the delete is committed)
+        schedule_file_delete(db.session, item.file_path)
+        if item.poster_asset:
+            schedule_file_delete(db.session, item.poster_asset.file_path)
+        for path in hls_files(item.hls_path):
+            schedule_file_delete(db.session, path)
         
         # Delete DB record
         db.session.delete(item)
@@ -213,66 +240,123 @@ def delete_gallery_item(current_user, item_id):
         return jsonify({'error': f'Error deleting gallery item: {str(e)}'}), 500
 
 
+@gallery_bp.route('/admin/<int:item_id>/hls', methods=['POST'])
+@admin_required
+def transcode_gallery_item(current_user, item_id):
+    """
+    Queue an HLS transcode of a gallery video (admin only)
+    The item keeps serving its current media until the job completes
+    """
+    item = Gallery.query.get(item_id)
+    
+    if not item:
+        return jsonify({'error': 'Gallery item not found'}), 404
+    
+    if item.media_type != 'Video':
+        return jsonify({'error': 'Only videos can be transcoded'}), 400
+    
+    if item.hls_status in ('queued', 'running'):
+        return jsonify({'error': 'A transcode is already in progress'}), 409
+    
+    try:
+        job = enqueue_job(db.session, item, 'hls')
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Transcode queued',
+            'job': job.to_dict()
+        }), 202
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Error queuing transcode: {str(e)}'}), 500
+
+
 @gallery_bp.route('/admin/bulk-upload', methods=['POST'])
 @admin_required
 def bulk_upload(current_user):
     """
     Bulk upload multiple gallery items (admin only)
     Useful for uploading multiple photos at once
+    
+    Files are validated, hashed and optimized in parallel worker processes
+    and inserted with a single INSERT (see services/bulk_upload_service.py)
+    
+    Form data (multipart/form-data):
+        - files: File (repeated)
+        - category: String (default: General)
+        - duplicates: flag / skip / allow (default: GALLERY_DUPLICATE_MODE)
+          Near-duplicates of existing items or of earlier files in the
+          batch are listed per result ('flag') or not stored ('skip')
+    Query params:
+        - stream=ndjson: Report progress as newline-delimited JSON, one
+          line per finished file and a final 'done' line with all results
+          (also selected by Accept: application/x-ndjson)
     """
+    # Event albums are far larger than the single-file limit
+    request.max_content_length = current_app.config.get('BULK_UPLOAD_MAX_CONTENT_LENGTH')
+    
     if 'files' not in request.files:
         return jsonify({'error': 'No files provided'}), 400
     
-    files = request.files.getlist('files')
-    data = request.form
+    mode = duplicate_mode(request.form.get('duplicates'))
+    if mode is None:
+        return jsonify({'error': 'duplicates must be flag, skip or allow'}), 400
     
-    category = data.get('category', 'General')
-    uploaded_items = []
-    errors = []
+    files = request.files.getlist('files')
+    category = request.form.get('category', 'General')
+    events = bulk_upload_gallery(files, category, duplicates=mode)
     
-    for file in files:
-        # Determine media type
-        file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
-        
-        if file_ext in ['png', 'jpg', 'jpeg', 'gif', 'webp']:
-            media_type = 'Image'
-        elif file_ext in ['mp4', 'mov', 'avi', 'webm']:
-            media_type = 'Video'
-        else:
-            errors.append(f'Skipped {file.filename}: Invalid file type')
-            continue
+    if request.args.get('stream') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        def generate():
+            try:
+                for event in events:
+                    yield json.dumps(event) + '\n'
+            except Exception as e:
+                yield json.dumps({'event': 'error', 'error': f'Error saving gallery items: {str(e)}'}) + '\n'
         
-        # Upload file
-        success, result = save_uploaded_file(file, 'gallery')
-        
-        if not success:
-            errors.append(f'Failed to upload {file.filename}: {result}')
-            continue
-        
-        try:
-            gallery_item = Gallery(
-                title=file.filename,
-                media_type=media_type,
-                file_path=result,
-                category=category
-            )
-            
-            db.session.add(gallery_item)
-            uploaded_items.append(file.filename)
-        
-        except Exception as e:
-            errors.append(f'Error creating record for {file.filename}: {str(e)}')
-            delete_file(result)
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable nginx response buffering
+        })
     
     try:
-        db.session.commit()
-        
-        return jsonify({
-            'message': f'Uploaded {len(uploaded_items)} items',
-            'uploaded': uploaded_items,
-            'errors': errors
-        }), 201 if len(uploaded_items) > 0 else 400
-    
+        summary = list(events)[-1]
     except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': f'Error saving gallery items: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Error saving gallery items: {str(e)}'}), 500
+    
+    results = summary['results']
+    uploaded_items = [result['filename'] for result in results if result['status'] == 'uploaded']
+    errors = [
+        f"Failed to upload {result['filename']}: {result['error']}"
+        for result in results if result['status'] == 'failed'
+    ]
+    
+    return jsonify({
+        'message': f'Uploaded {len(uploaded_items)} items',
+        'uploaded': uploaded_items,
+        'errors': errors,
+        'results': results
+    }), 201 if len(uploaded_items) > 0 else 400
+
+
+
+@gallery_bp.route('/admin/duplicates', methods=['GET'])
+@admin_required
+def get_duplicate_clusters(current_user):
+    """
+    List groups of near-duplicate images across the gallery (admin only)
+    Query params:
+        - distance: Differing bits (of 64) still counted as a duplicate,
+          at most GALLERY_DUPLICATE_MAX_DISTANCE (default: that maximum)
+    """
+    distance = request.args.get('distance', type=int)
+    if distance is not None and distance < 0:
+        return jsonify({'error': 'distance must be a non-negative integer'}), 400
+    
+    clusters = duplicate_clusters(distance)
+    
+    return jsonify({
+        'clusters': clusters,
+        'count': len(clusters)
+    }), 200
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+GraphQL Routes
+Read-only GraphQL endpoint over the catalog (and bookings, for admins)
+  - POST {query, variables, operationName, extensions} or GET ?query=
+  - Persisted queries: send extensions.persistedQuery.sha256Hash without
+    the query once the hash has been registered
+"""
+
+import json
+from flask import Blueprint, request, jsonify, current_app
+from database import read_replica
+from services.graphql_service import DocumentCache, prepare_document, execute_query, hash_query, PERSISTED_QUERY_NOT_FOUND
+from utils.jwt_helper import get_request_admin
+
+graphql_bp = Blueprint('graphql', __name__)
+
+
+def _document_cache():
+    cache = current_app.extensions.get('graphql_documents')
+    if cache is None:
+        cache = DocumentCache(current_app.config.get('GRAPHQL_DOCUMENT_CACHE_SIZE', 256))
+        current_app.extensions['graphql_documents'] = cache
+    return cache
+
+
+def _read_params():
+    """Collect query, variables, operationName and extensions from the request"""
+    if request.method == 'POST':
+        params = request.get_json(silent=True) or {}
+    else:
+        params = {key: request.args.get(key) for key in ('query', 'variables', 'operationName', 'extensions')}
+        for key in ('variables', 'extensions'):
+            if params[key]:
+                params[key] = json.loads(params[key])
+    return params
+
+
+def _errors(messages, status=400):
+    return jsonify({'errors': [{'message': message} for message in messages]}), status
+
+
+@graphql_bp.route('', methods=['GET', 'POST'])
+@graphql_bp.route('/', methods=['GET', 'POST'])
+def graphql_endpoint():
+    """
+    Execute a GraphQL query
+
+    Booking fields require an admin Bearer token; everything else is public
+    and served from a read replica.
+    """
+    try:
+        params = _read_params()
+    except ValueError:
+        return _errors(['variables and extensions must be JSON'])
+
+    query = params.get('query')
+    persisted = (params.get('extensions') or {}).get('persistedQuery') or {}
+    query_hash = persisted.get('sha256Hash')
+
+    if query_hash:
+        if query and hash_query(query) != query_hash:
+            return _errors(['provided sha does not match query'])
+    elif not query:
+        return _errors(['Query is required'])
+    else:
+        query_hash = hash_query(query)
+
+    document, errors = prepare_document(
+        query or None,
+        query_hash,
+        _document_cache(),
+        current_app.config.get('GRAPHQL_MAX_DEPTH', 6),
+        current_app.config.get('GRAPHQL_MAX_COMPLEXITY', 5000)
+    )
+    if errors == [PERSISTED_QUERY_NOT_FOUND]:
+        # Checked on the same lookup that would have returned the document,
+        # so an eviction in between can't reach the parser
+        return jsonify({'errors': [{
+            'message': PERSISTED_QUERY_NOT_FOUND,
+            'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'},
+        }]}), 200
+    if errors:
+        return _errors(errors)
+
+    is_admin = get_request_admin() is not None
+    run = execute_query if is_admin else read_replica(execute_query)
+
+    result = run(
+        document,
+        variables=params.get('variables'),
+        operation_name=params.get('operationName'),
+        is_admin=is_admin
+    )
+    return jsonify(result), 200
@@ -6,10 +6,14 @@ Handles React FormData 'image' fields
 
 from flask import Blueprint, request, jsonify
 from models.puppy import Puppy, PuppyImage
-from database import db
+from database import db, read_replica
 from utils.jwt_helper import admin_required
+from services.cache_service import cached_response
+from services.cdn_purge_service import surrogate_keys
+from services.sql_json_service import sql_json_enabled, render_puppies, json_body_response
 from utils.validators import validate_gender, validate_status, validate_date_format
-from services.file_service import save_uploaded_file, delete_file
+from services.file_service import save_uploaded_file
+from services.file_ops_service import register_new_file, schedule_file_delete
 from datetime import datetime
 
 puppy_bp = Blueprint('puppies', __name__)
@@ -20,6 +24,9 @@ puppy_bp = Blueprint('puppies', __name__)
 
 @puppy_bp.route('', methods=['GET'])
 @puppy_bp.route('/', methods=['GET'])
+@surrogate_keys('collection:puppies')
+@cached_response('puppies')
+@read_replica
 def get_puppies():
     """
     Get puppies (public)
@@ -42,6 +49,10 @@ def get_puppies():
     if featured_filter and featured_filter.lower() == 'true':
         query = query.filter_by(is_featured=True)
     
+    # On PostgreSQL the whole document is built in SQL (same output, no ORM hydration)
+    if sql_json_enabled():
+        return json_body_response(render_puppies(query))
+    
     # Sort by creation date so newest arrivals appear first
     query = query.order_by(Puppy.created_at.desc())
     
@@ -78,6 +89,7 @@ def create_puppy(current_user):
         success, result = save_uploaded_file(file, 'puppies')
         if success:
             primary_image_path = result
+            register_new_file(db.session, result)
         else:
             return jsonify({'error': f'Image upload failed: {result}'}), 400
     
@@ -174,9 +186,10 @@ def update_puppy(current_user, puppy_id):
             print(f"📸 Processing new image: {file.filename}")
             success, result = save_uploaded_file(file, 'puppies')
             if success:
-                # Delete old image if exists
+                register_new_file(db.session, result)
+                # Delete old image (once the update is committed)
                 if puppy.primary_image:
-                    delete_file(puppy.primary_image)
+                    schedule_file_delete(db.session, puppy.primary_image)
                 puppy.primary_image = result
                 print(f"✅ Image updated: {result}")
         
@@ -207,13 +220,13 @@ def delete_puppy(current_user, puppy_id):
         return jsonify({'error': 'Puppy not found'}), 404
     
     try:
-        # Delete primary image
+        # Delete primary image (once the delete is committed)
         if puppy.primary_image:
-            delete_file(puppy.primary_image)
+            schedule_file_delete(db.session, puppy.primary_image)
         
         # Delete all puppy images
         for img in puppy.images:
-            delete_file(img.image_path)
+            schedule_file_delete(db.session, img.image_path)
         
         # Delete puppy (cascade will delete images from DB)
         db.session.delete(puppy)
@@ -252,6 +265,7 @@ def add_puppy_images(current_user, puppy_id):
         for file in files:
             success, result = save_uploaded_file(file, 'puppies')
             if success:
+                register_new_file(db.session, result)
                 puppy_image = PuppyImage(
                     puppy_id=puppy_id,
                     image_path=result,
@@ -282,7 +296,7 @@ def delete_puppy_image(current_user, image_id):
         return jsonify({'error': 'Image not found'}), 404
     
     try:
-        delete_file(image.image_path)
+        schedule_file_delete(db.session, image.image_path)
         db.session.delete(image)
         db.session.commit()
         
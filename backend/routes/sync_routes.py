@@ -0,0 +1,42 @@
+"""
+Sync Routes
+Incremental delta-sync feed for catalog clients (mobile app, partner sites)
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from database import read_replica
+from services.sync_service import build_sync_feed
+
+sync_bp = Blueprint('sync', __name__)
+
+
+# ============================================
+# PUBLIC ENDPOINTS
+# ============================================
+
+@sync_bp.route('', methods=['GET'])
+@sync_bp.route('/', methods=['GET'])
+@read_replica
+def get_sync_feed():
+    """
+    Get catalog changes since a sync token (public)
+    Query params:
+        - since: Token from a previous response's next_token (default: 0 = full sync)
+        - limit: Maximum changes per page (default: SYNC_PAGE_SIZE)
+    
+    Returns Dog, DogImage, Puppy, PuppyImage and Gallery rows created or
+    updated since the token, plus tombstones for deleted rows. Keep calling
+    with next_token while has_more is true.
+    """
+    try:
+        since = int(request.args.get('since', 0))
+        limit = int(request.args.get('limit', current_app.config['SYNC_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    
+    if since < 0:
+        return jsonify({'error': 'Invalid sync token'}), 400
+    
+    limit = max(1, min(limit, current_app.config['SYNC_MAX_PAGE_SIZE']))
+    
+    return jsonify(build_sync_feed(since, limit)), 200
@@ -0,0 +1,49 @@
+"""
+System Routes
+Operational endpoints for monitoring the API (admin only)
+"""
+
+from flask import Blueprint, jsonify, current_app
+from utils.jwt_helper import admin_required
+from services.pool_service import get_pool_stats
+from services.image_service import get_image_cache
+
+system_bp = Blueprint('system', __name__)
+
+
+# ============================================
+# ADMIN ENDPOINTS
+# ============================================
+
+@system_bp.route('/admin/pool', methods=['GET'])
+@admin_required
+def get_pool_status(current_user):
+    """
+    Get live database connection pool statistics (admin only)
+    Includes checked-out/overflow counts, checkout wait times,
+    connection ages and read replica lag
+    """
+    router = current_app.extensions.get('replica_router')
+    
+    return jsonify({
+        'pgbouncer_mode': current_app.config.get('DB_PGBOUNCER', False),
+        'engines': get_pool_stats(),
+        'replicas': router.status() if router else []
+    }), 200
+
+
+@system_bp.route('/admin/cache', methods=['GET'])
+@admin_required
+def get_cache_status(current_user):
+    """
+    Get catalog cache and image variant cache statistics (admin only)
+    """
+    cache = current_app.extensions.get('catalog_cache')
+    image_cache = get_image_cache()
+    
+    catalog = dict(cache.stats(), enabled=True) if cache else {'enabled': False}
+    
+    return jsonify(dict(
+        catalog,
+        image_variants=image_cache.stats() if image_cache else None
+    )), 200
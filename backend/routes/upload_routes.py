@@ -0,0 +1,264 @@
+"""
+Upload Routes
+Resumable (tus 1.0) uploads for large gallery videos (admin only)
+
+    OPTIONS /api/uploads/          server capabilities
+    POST    /api/uploads/          create: Upload-Length + Upload-Metadata
+    HEAD    /api/uploads/<id>      current Upload-Offset (resume point)
+    PATCH   /api/uploads/<id>      append a chunk at Upload-Offset
+    DELETE  /api/uploads/<id>      abort
+    GET     /api/uploads/<id>      JSON status, including the gallery item once finished
+
+Direct-to-storage uploads (docs/direct-uploads.md):
+
+    POST    /api/uploads/direct            presigned PUT URL + token (admin only)
+    PUT     /api/uploads/direct/<token>    upload target for local storage
+    POST    /api/uploads/direct/confirm    create the gallery item (admin only)
+"""
+
+from email.utils import formatdate
+from flask import Blueprint, request, jsonify, current_app, url_for
+from models.gallery import Gallery
+from utils.jwt_helper import admin_required
+from services.resumable_upload_service import (
+    TUS_VERSION, TUS_EXTENSIONS, CHECKSUM_ALGORITHMS, UploadError,
+    parse_metadata, parse_checksum, create_upload, get_upload,
+    append_chunk, terminate_upload
+)
+from services.direct_upload_service import create_direct_upload, receive_direct_upload, confirm_direct_upload
+
+upload_bp = Blueprint('uploads', __name__)
+
+
+@upload_bp.after_request
+def add_tus_headers(response):
+    response.headers['Tus-Resumable'] = TUS_VERSION
+    if request.method == 'OPTIONS':
+        response.headers['Tus-Version'] = TUS_VERSION
+        response.headers['Tus-Extension'] = ','.join(TUS_EXTENSIONS)
+        response.headers['Tus-Checksum-Algorithm'] = ','.join(CHECKSUM_ALGORITHMS)
+        max_size = current_app.config.get('RESUMABLE_UPLOAD_MAX_SIZE')
+        if max_size:
+            response.headers['Tus-Max-Size'] = str(max_size)
+    return response
+
+
+def _error(e):
+    return jsonify({'error': str(e)}), e.status
+
+
+def _check_version():
+    """Clients must speak the protocol version we do (412 otherwise)"""
+    if request.headers.get('Tus-Resumable') != TUS_VERSION:
+        response = jsonify({'error': f'Unsupported Tus-Resumable version, expected {TUS_VERSION}'})
+        response.status_code = 412
+        response.headers['Tus-Version'] = TUS_VERSION
+        return response
+    return None
+
+
+def _upload_headers(state):
+    return {
+        'Upload-Offset': str(state['offset']),
+        'Upload-Length': str(state['length']),
+        'Upload-Expires': formatdate(state['expires_at'], usegmt=True),
+        'Cache-Control': 'no-store',
+    }
+
+
+@upload_bp.route('/', methods=['OPTIONS'])
+def upload_options():
+    """Capability discovery (tus headers are added by add_tus_headers)"""
+    return '', 204
+
+
+@upload_bp.route('/', methods=['POST'])
+@admin_required
+def create(current_user):
+    """
+    Create a resumable gallery upload (admin only)
+
+    Headers:
+        - Upload-Length: Total size in bytes (required)
+        - Upload-Metadata: base64 pairs; filename (required), title,
+          description, category, display_order, is_active
+    """
+    version_error = _check_version()
+    if version_error:
+        return version_error
+
+    try:
+        length = int(request.headers.get('Upload-Length', ''))
+    except ValueError:
+        return jsonify({'error': 'Upload-Length header is required'}), 400
+
+    try:
+        state = create_upload(length, parse_metadata(request.headers.get('Upload-Metadata')))
+    except UploadError as e:
+        return _error(e)
+
+    headers = _upload_headers(state)
+    headers['Location'] = url_for('uploads.upload_status', upload_id=state['id'], _external=True)
+    return '', 201, headers
+
+
+@upload_bp.route('/<upload_id>', methods=['GET', 'HEAD'])
+@admin_required
+def upload_status(current_user, upload_id):
+    """
+    HEAD: resume point for tus clients
+    GET: upload progress as JSON, with the gallery item once finished (admin only)
+    """
+    try:
+        state = get_upload(upload_id)
+    except UploadError as e:
+        if request.method == 'HEAD':
+            return '', e.status, {'Cache-Control': 'no-store'}
+        return _error(e)
+
+    if request.method == 'HEAD':
+        return '', 200, _upload_headers(state)
+
+    item = Gallery.query.get(state['gallery_id']) if state['gallery_id'] else None
+    return jsonify({
+        'id': state['id'],
+        'offset': state['offset'],
+        'length': state['length'],
+        'filename': state['metadata'].get('filename'),
+        'complete': state['gallery_id'] is not None,
+        'item': item.to_dict() if item else None
+    }), 200, {'Cache-Control': 'no-store'}
+
+
+@upload_bp.route('/<upload_id>', methods=['PATCH'])
+@admin_required
+def upload_chunk(current_user, upload_id):
+    """
+    Append a chunk (admin only)
+
+    Headers:
+        - Content-Type: application/offset+octet-stream
+        - Upload-Offset: Byte offset the chunk starts at (must match HEAD)
+        - Upload-Checksum: Optional "<sha1|sha256|md5> <base64 digest>"
+
+    The response to the final chunk carries the new gallery item id in
+    Upload-Gallery-Item
+    """
+    version_error = _check_version()
+    if version_error:
+        return version_error
+
+    if request.mimetype != 'application/offset+octet-stream':
+        return jsonify({'error': 'Content-Type must be application/offset+octet-stream'}), 415
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return jsonify({'error': 'Upload-Offset header is required'}), 400
+
+    max_chunk = current_app.config.get('RESUMABLE_UPLOAD_CHUNK_MAX_BYTES')
+    if request.content_length is not None and max_chunk and request.content_length > max_chunk:
+        return jsonify({'error': f'Chunks may be at most {max_chunk} bytes'}), 413
+    request.max_content_length = max_chunk
+
+    try:
+        state = append_chunk(
+            upload_id,
+            offset,
+            request.stream,
+            parse_checksum(request.headers.get('Upload-Checksum'))
+        )
+    except UploadError as e:
+        return _error(e)
+
+    headers = _upload_headers(state)
+    if state['gallery_id'] is not None:
+        headers['Upload-Gallery-Item'] = str(state['gallery_id'])
+    return '', 204, headers
+
+
+@upload_bp.route('/<upload_id>', methods=['DELETE'])
+@admin_required
+def terminate(current_user, upload_id):
+    """
+    Abort an upload and delete the received bytes (admin only)
+    """
+    version_error = _check_version()
+    if version_error:
+        return version_error
+
+    try:
+        terminate_upload(upload_id)
+    except UploadError as e:
+        return _error(e)
+
+    return '', 204
+
+
+@upload_bp.route('/direct', methods=['POST'])
+@admin_required
+def create_direct(current_user):
+    """
+    Authorize a gallery upload straight to storage (admin only)
+
+    JSON body:
+        - filename: Original file name (required)
+        - size: Exact size in bytes (required)
+        - content_type: Content-Type the PUT will carry
+        - title, description, category, display_order, is_active: gallery fields
+
+    The client PUTs the file to upload_url with the returned headers,
+    then confirms with the token
+    """
+    data = request.get_json(silent=True) or {}
+
+    if not data.get('filename'):
+        return jsonify({'error': 'filename is required'}), 400
+
+    try:
+        upload = create_direct_upload(data['filename'], data.get('size'), data.get('content_type'), data)
+    except UploadError as e:
+        return _error(e)
+
+    return jsonify(upload), 201, {'Cache-Control': 'no-store'}
+
+
+@upload_bp.route('/direct/<token>', methods=['PUT'])
+def direct_put(token):
+    """
+    Receive a direct upload when storage is local
+    The signed token in the URL is the credential, as with a presigned URL
+    """
+    request.max_content_length = current_app.config.get('DIRECT_UPLOAD_MAX_SIZE')
+
+    try:
+        receive_direct_upload(token, request.stream, request.content_length)
+    except UploadError as e:
+        return _error(e)
+
+    return '', 204
+
+
+@upload_bp.route('/direct/confirm', methods=['POST'])
+@admin_required
+def confirm_direct(current_user):
+    """
+    Create the gallery item for a finished direct upload (admin only)
+
+    JSON body:
+        - token: Token returned when the upload was created
+    """
+    data = request.get_json(silent=True) or {}
+
+    if not data.get('token'):
+        return jsonify({'error': 'token is required'}), 400
+
+    try:
+        item = confirm_direct_upload(data['token'])
+    except UploadError as e:
+        return _error(e)
+
+    return jsonify({
+        'message': 'Gallery item uploaded successfully',
+        'item': item.to_dict()
+    }), 201
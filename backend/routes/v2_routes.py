@@ -0,0 +1,137 @@
+"""
+API v2 Routes
+Compact public catalog payloads:
+  - fields= / fields[<type>]= select columns (loaded with load_only in SQL)
+  - include= embeds relations; sire/dam are returned once in 'included'
+  - media fields are relative keys, resolved against meta.media_base_url
+"""
+
+from flask import Blueprint, request, jsonify
+from models.dog import Dog
+from models.puppy import Puppy
+from models.gallery import Gallery
+from database import read_replica
+from services.cache_service import cached_response
+from services.cdn_purge_service import surrogate_keys, gallery_list_keys
+from services.serializer_service import (
+    ProjectionError,
+    parse_projection,
+    primary_query_options,
+    build_document
+)
+from utils.validators import validate_gender
+
+v2_bp = Blueprint('v2', __name__)
+
+
+def _projection(resource):
+    """Parse projection params, returning (fields, includes, error response)"""
+    try:
+        fields, includes = parse_projection(resource, request.args)
+        return fields, includes, None
+    except ProjectionError as e:
+        return None, None, (jsonify({'error': str(e)}), 400)
+
+
+# ============================================
+# PUBLIC ENDPOINTS
+# ============================================
+
+@v2_bp.route('/puppies', methods=['GET'])
+@surrogate_keys('collection:puppies')
+@cached_response('puppies')
+@read_replica
+def get_puppies_v2():
+    """
+    Get puppies (public, v2)
+    Query params:
+        - status, gender, featured: Same filters as /api/puppies
+        - fields: Comma-separated puppy fields
+        - fields[dogs]: Fields of included parents
+        - include: sire, dam, images
+    """
+    fields, includes, error = _projection('puppies')
+    if error:
+        return error
+    
+    status_filter = request.args.get('status')
+    gender_filter = request.args.get('gender')
+    featured_filter = request.args.get('featured')
+    
+    query = Puppy.query.options(primary_query_options('puppies', fields, includes))
+    
+    if status_filter and status_filter.lower() != 'all':
+        query = query.filter_by(status=status_filter)
+    
+    if gender_filter and validate_gender(gender_filter):
+        query = query.filter_by(gender=gender_filter)
+    
+    if featured_filter and featured_filter.lower() == 'true':
+        query = query.filter_by(is_featured=True)
+    
+    puppies = query.order_by(Puppy.created_at.desc()).all()
+    
+    return jsonify(build_document('puppies', puppies, fields, includes)), 200
+
+
+@v2_bp.route('/dogs', methods=['GET'])
+@surrogate_keys('collection:dogs')
+@cached_response('dogs')
+@read_replica
+def get_dogs_v2():
+    """
+    Get active parent dogs (public, v2)
+    Query params:
+        - role, gender: Same filters as /api/dogs
+        - fields: Comma-separated dog fields
+        - include: images
+    """
+    fields, includes, error = _projection('dogs')
+    if error:
+        return error
+    
+    role = request.args.get('role')
+    gender = request.args.get('gender')
+    
+    query = Dog.query.options(primary_query_options('dogs', fields, includes)).filter_by(is_active=True)
+    
+    if role in {'Stud', 'Dam', 'Both'}:
+        query = query.filter_by(role=role)
+    
+    if gender and validate_gender(gender):
+        query = query.filter_by(gender=gender)
+    
+    dogs = query.order_by(Dog.name).all()
+    
+    return jsonify(build_document('dogs', dogs, fields, includes)), 200
+
+
+@v2_bp.route('/gallery', methods=['GET'])
+@surrogate_keys(gallery_list_keys)
+@cached_response('gallery')
+@read_replica
+def get_gallery_v2():
+    """
+    Get active gallery items (public, v2)
+    Query params:
+        - category, media_type: Same filters as /api/gallery
+        - fields: Comma-separated gallery fields
+    """
+    fields, includes, error = _projection('gallery')
+    if error:
+        return error
+    
+    category_filter = request.args.get('category')
+    media_type_filter = request.args.get('media_type')
+    
+    query = Gallery.query.options(primary_query_options('gallery', fields, includes)).filter_by(is_active=True)
+    
+    if category_filter:
+        query = query.filter_by(category=category_filter)
+    
+    if media_type_filter and media_type_filter in ['Image', 'Video']:
+        query = query.filter_by(media_type=media_type_filter)
+    
+    items = query.order_by(Gallery.display_order, Gallery.uploaded_at.desc()).all()
+    
+    return jsonify(build_document('gallery', items, fields, includes)), 200
@@ -0,0 +1,288 @@
+"""
+Bulk Upload Service
+Parallel pipeline behind POST /api/gallery/admin/bulk-upload
+
+- The request thread only checks each upload's sniffed type and moves
+  it to its final name (names are reserved up front, so same-second
+  duplicates can't collide)
+- Validation, SHA-256 hashing and image optimization run in the app's
+  process pool (services/process_pool_service.py), results are reported
+  as files finish
+- All gallery rows (and their media assets) go in with one INSERT ...
+  RETURNING each; sync sequence numbers and change events are recorded
+  by hand since a Core insert bypasses the ORM flush hooks
+"""
+
+import logging
+import os
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from sqlalchemy import insert, delete
+from PIL import Image
+from database import db
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from services.change_service import record_change
+from services.sync_service import allocate_change_seqs
+from services.file_service import optimize_image_file, ImageTooLargeError, check_upload_content, write_upload, compute_sha256
+from services.file_ops_service import register_new_file
+from services.storage_service import publish_file
+from services.gallery_service import media_type_for
+from services.media_asset_service import probe_media
+from services.process_pool_service import get_process_pool, reset_process_pool
+from services.duplicate_service import get_duplicate_index, hamming
+from services.media_job_service import enqueue_jobs
+from utils.validators import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+GALLERY_FOLDER = 'gallery'
+
+
+# ============================================
+# WORKER (runs in the process pool)
+# ============================================
+
+def process_file(file_path, media_type, limits, sha256=None):
+    """
+    Validate, hash and optimize one saved upload. The file is removed
+    when it is rejected.
+
+    Args:
+        file_path: Absolute path of the saved upload
+        media_type: 'Image' or 'Video'
+        limits: {'max_pixels', 'max_decode_bytes'}
+        sha256: Hash computed while the upload streamed in, if any
+
+    Returns:
+        dict: {'ok': True, 'sha256', 'bytes', 'meta'} or {'ok': False, 'error'}
+            where meta is probe_media() of the stored file
+    """
+    try:
+        if os.path.getsize(file_path) == 0:
+            raise ValueError('File is empty')
+
+        # Hash the bytes the client sent, before optimization rewrites them
+        sha256 = sha256 or compute_sha256(file_path)
+
+        if media_type == 'Image':
+            try:
+                with Image.open(file_path) as img:
+                    img.verify()
+            except Image.DecompressionBombError as e:
+                raise ImageTooLargeError(str(e))
+            except Exception:
+                raise ValueError('Not a valid image')
+
+            optimize_image_file(file_path, limits['max_pixels'], limits['max_decode_bytes'])
+
+        # Optimization rewrote images: only videos still hold the bytes hashed above
+        meta = probe_media(file_path, sha256 if media_type == 'Video' else None)
+        return {'ok': True, 'sha256': sha256, 'bytes': meta['bytes'], 'meta': meta}
+
+    except Exception as e:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return {'ok': False, 'error': str(e)}
+
+
+# ============================================
+# PIPELINE
+# ============================================
+
+def _reserve_name(folder_path, filename, taken):
+    """sanitize_filename() plus a counter when the name is already used"""
+    name = sanitize_filename(filename)
+    base, dot, ext = name.rpartition('.')
+    if not dot:
+        base, ext = name, ''
+    candidate, counter = name, 1
+    while candidate in taken or os.path.exists(os.path.join(folder_path, candidate)):
+        counter += 1
+        candidate = f"{base}_{counter}.{ext}" if ext else f"{base}_{counter}"
+    taken.add(candidate)
+    return candidate
+
+
+def _insert_assets(results, metas):
+    """Insert the media assets probed by the workers; returns their ids"""
+    paths = [result['file_path'] for result in results]
+    # Leftovers of deleted rows whose file name is being reused
+    db.session.execute(delete(MediaAsset).where(MediaAsset.file_path.in_(paths)))
+
+    rows = [dict(meta, file_path=path) for path, meta in zip(paths, metas)]
+    stmt = insert(MediaAsset).returning(MediaAsset.id, sort_by_parameter_order=True)
+    return db.session.execute(stmt, rows).scalars().all()
+
+
+def _insert_rows(results, metas, category):
+    """Insert a gallery row per processed file with one INSERT ... RETURNING"""
+    asset_ids = _insert_assets(results, metas)
+    first_seq = allocate_change_seqs(db.session, len(results))
+    rows = [
+        {
+            'title': result['filename'],
+            'media_type': result['media_type'],
+            'file_path': result['file_path'],
+            'asset_id': asset_id,
+            'category': category,
+            'change_seq': first_seq + offset,
+        }
+        for offset, (result, asset_id) in enumerate(zip(results, asset_ids))
+    ]
+    stmt = insert(Gallery).returning(Gallery.id, sort_by_parameter_order=True)
+    ids = db.session.execute(stmt, rows).scalars().all()
+
+    for result, item_id in zip(results, ids):
+        result['id'] = item_id
+        record_change(db.session, 'gallery', item_id, 'created', {'category': category})
+    enqueue_jobs(db.session, [
+        item_id for result, item_id in zip(results, ids) if result['media_type'] == 'Video'
+    ])
+
+
+def _batch_duplicates(index, batch_hashes, phash):
+    """Near-duplicates of phash in the library and among the batch's earlier files"""
+    matches = [{'id': item_id, 'distance': distance} for item_id, distance in index.lookup(phash)]
+    matches += [
+        {'index': other, 'distance': distance}
+        for other, other_hash in batch_hashes
+        if (distance := hamming(phash, other_hash)) <= index.max_distance
+    ]
+    return matches
+
+
+def bulk_upload_gallery(files, category='General', duplicates='flag'):
+    """
+    Process and store a batch of gallery uploads
+
+    Yields one event per file as it finishes, then a final summary:
+        {'event': 'file', 'index', 'filename', 'status': 'processed'|'failed', ...}
+        {'event': 'done', 'results': [...], 'uploaded': n, 'failed': n}
+    Each result is {'index', 'filename', 'status', 'id', 'file_path',
+    'media_type', 'sha256', 'bytes', 'duplicates'} or {'index', 'filename',
+    'status', 'error'}. 'duplicates' lists near-duplicate gallery items
+    ({'id', 'distance'}) and earlier files of the batch ({'index', 'distance'}).
+
+    Args:
+        files: List of FileStorage objects
+        category: Gallery category for all items
+        duplicates: 'flag' near-duplicates, 'skip' them (the file fails)
+            or 'allow' them without checking
+
+    Every saved file is registered with the session's file journal: a
+    rollback, or closing the session without the INSERT committing (the
+    ndjson stream dropped, a worker pool failure), removes them.
+
+    Raises:
+        Exception: When the INSERT fails (the processed files are removed)
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    folder_path = os.path.join(upload_folder, GALLERY_FOLDER)
+    os.makedirs(folder_path, exist_ok=True)
+
+    limits = {
+        'max_pixels': current_app.config.get('IMAGE_MAX_PIXELS'),
+        'max_decode_bytes': current_app.config.get('IMAGE_MAX_DECODE_BYTES'),
+    }
+    results = [{'index': index, 'filename': file.filename} for index, file in enumerate(files)]
+    meta_by_index = {}
+
+    # Write each upload to its final name; everything else happens in the pool
+    pending = []
+    taken = set()
+    for result, file in zip(results, files):
+        media_type = media_type_for(file.filename)
+        if media_type is None:
+            result.update(status='failed', error='Invalid file type')
+            yield {'event': 'file', **result}
+            continue
+
+        content_error = check_upload_content(file)
+        if content_error:
+            result.update(status='failed', error=content_error)
+            yield {'event': 'file', **result}
+            continue
+
+        name = _reserve_name(folder_path, file.filename, taken)
+        try:
+            sha256 = write_upload(file, os.path.join(folder_path, name))
+        except Exception as e:
+            result.update(status='failed', error=f'Error saving file: {str(e)}')
+            yield {'event': 'file', **result}
+            continue
+
+        # From here on the file journal removes it unless the INSERT commits,
+        # also when the client drops the stream or the pool breaks mid-batch
+        result.update(media_type=media_type, file_path=os.path.join(GALLERY_FOLDER, name))
+        register_new_file(db.session, result['file_path'])
+        pending.append((result, sha256))
+
+    if pending:
+        index = get_duplicate_index() if duplicates != 'allow' else None
+        batch_hashes = []
+        pool = get_process_pool()
+        futures = {
+            pool.submit(process_file, os.path.join(upload_folder, result['file_path']),
+                        result['media_type'], limits, sha256): result
+            for result, sha256 in pending
+        }
+        try:
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    outcome = {'ok': False, 'error': str(e)}
+
+                phash = outcome['meta']['phash'] if outcome['ok'] else None
+                if index is not None and phash is not None:
+                    matches = _batch_duplicates(index, batch_hashes, phash)
+                    result['duplicates'] = matches
+                    if matches and duplicates == 'skip':
+                        os.remove(os.path.join(upload_folder, result['file_path']))
+                        outcome = {'ok': False, 'error': 'Near-duplicate of an existing image'}
+                    else:
+                        batch_hashes.append((result['index'], phash))
+
+                if outcome['ok']:
+                    result.update(status='processed', sha256=outcome['sha256'], bytes=outcome['bytes'])
+                    meta_by_index[result['index']] = outcome['meta']
+                else:
+                    result.update(status='failed', error=outcome['error'])
+                    result.pop('file_path', None)
+                yield {'event': 'file', **result}
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): fail what's left, start fresh next time
+            logger.error("Bulk upload worker pool broke; failing unfinished files")
+            reset_process_pool()
+            for result, _ in pending:
+                if 'status' not in result:
+                    result.update(status='failed', error='Processing was interrupted')
+                    path = os.path.join(upload_folder, result.pop('file_path'))
+                    if os.path.exists(path):
+                        os.remove(path)
+                    yield {'event': 'file', **result}
+
+    processed = [result for result in results if result['status'] == 'processed']
+    if processed:
+        for result in processed:
+            publish_file(result['file_path'])
+        try:
+            _insert_rows(processed, [meta_by_index[result['index']] for result in processed], category)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for result in processed:
+            result['status'] = 'uploaded'
+
+    yield {
+        'event': 'done',
+        'results': results,
+        'uploaded': len(processed),
+        'failed': len(results) - len(processed),
+    }
@@ -0,0 +1,178 @@
+"""
+Catalog Cache Service
+In-process response cache for public catalog endpoints, kept consistent
+across gunicorn workers by publishing commit changes on the event bus
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, current_app, make_response, Response
+from database import read_primary
+from services.change_service import register_commit_listener
+
+# Entity changed -> cache tags whose responses embed that entity
+ENTITY_TAGS = {
+    'dog': ('dogs', 'puppies'),  # Puppies embed their sire/dam
+    'dog_image': ('dogs',),
+    'puppy': ('puppies',),
+    'puppy_image': ('puppies',),
+    'gallery': ('gallery',),
+}
+
+
+class CatalogCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and per-tag versions.
+    Keys embed the current version of each tag, so bumping a tag's version
+    makes every entry built from older data unreachable, including entries
+    stored by requests that were still running when the change arrived.
+    """
+
+    def __init__(self, ttl=300, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version_key(self, tags):
+        with self._lock:
+            return tuple((tag, self._versions.get(tag, 0)) for tag in sorted(tags))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_tags(self, tags):
+        """Bump tag versions and drop entries that depended on them"""
+        tags = set(tags)
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+            stale = [
+                key for key in self._entries
+                if any(tag in tags for tag, _ in key[1])
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            for tag in list(self._versions):
+                self._versions[tag] += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'versions': dict(self._versions),
+            }
+
+
+# ============================================
+# APP INTEGRATION
+# ============================================
+
+def get_cache():
+    """Get the catalog cache of the current app (None when disabled)"""
+    return current_app.extensions.get('catalog_cache')
+
+
+def tags_for_changes(changes):
+    """Map change records to the cache tags they invalidate"""
+    tags = set()
+    for change in changes:
+        tags.update(ENTITY_TAGS.get(change['entity'], ()))
+    return tags
+
+
+def init_cache(app, bus):
+    """
+    Create the catalog cache for the app
+
+    Args:
+        app: Flask application
+        bus: Event bus carrying invalidations between workers
+    """
+    if not app.config.get('CATALOG_CACHE_ENABLED', True):
+        return
+
+    cache = CatalogCache(
+        ttl=app.config.get('CATALOG_CACHE_TTL', 300),
+        max_entries=app.config.get('CATALOG_CACHE_MAX_ENTRIES', 512)
+    )
+
+    def evict(event):
+        tags = tags_for_changes(event.get('changes', []))
+        if tags:
+            cache.invalidate_tags(tags)
+
+    def publish_changes(changes):
+        if tags_for_changes(changes):
+            bus.publish({'changes': changes, 'version': time.time_ns()})
+
+    bus.subscribe(evict, on_reconnect=cache.clear)
+    register_commit_listener(app, publish_changes)
+
+    app.extensions['catalog_cache'] = cache
+
+
+def cached_response(*tags):
+    """
+    Decorator caching successful GET responses of a public endpoint.
+    The cache key covers the endpoint, view args, query string and the
+    current version of each tag. Misses are rendered from the primary.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            cache = get_cache()
+            if cache is None or request.method != 'GET':
+                return f(*args, **kwargs)
+
+            key = (
+                (request.endpoint, tuple(sorted(kwargs.items())),
+                 tuple(sorted(request.args.items(multi=True)))),
+                cache.version_key(tags),
+            )
+
+            cached = cache.get(key)
+            if cached is not None:
+                body, status, mimetype = cached
+                response = Response(body, status=status, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            # Filled from the primary: a replica may still lag behind the commit that
+            # bumped the tag version, and its answer would be cached under the new version
+            with read_primary():
+                response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                cache.set(key, (response.get_data(), response.status_code, response.mimetype))
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return decorated
+    return decorator
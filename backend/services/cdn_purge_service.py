@@ -0,0 +1,352 @@
+"""
+CDN Purge Service
+Lets a CDN or caching proxy (Fastly, Varnish with xkey, ...) keep the
+public API until the data actually changes:
+
+  - surrogate_keys(): decorator tagging public responses with the keys of
+    what they contain (Surrogate-Key: collection:puppies dog:7
+    gallery:category:Litters) and, when a purge backend is configured, a
+    long CDN-only lifetime (Surrogate-Control)
+  - after every commit the keys of the changed rows are queued on a
+    PurgeDispatcher. Keys arriving within CDN_PURGE_DELAY_SECONDS are
+    coalesced and purged CDN_PURGE_BATCH_SIZE at a time, so a bulk edit
+    costs a few purge requests instead of one per row.
+  - each key is purged a second time CDN_PURGE_REPEAT_SECONDS later: the
+    first purge can be refilled from a replica (or another worker's cache)
+    that hasn't seen the commit yet; by the second one every read path
+    has caught up
+
+Backends (CDN_PURGE_BACKEND): none, log, http; more with
+register_purge_backend(). See docs/cdn-purge.md.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import urllib.request
+from functools import wraps
+from string import Formatter
+from urllib.parse import quote
+from flask import current_app, request, make_response
+from services.change_service import register_commit_listener
+
+logger = logging.getLogger(__name__)
+
+# Entity changed -> collection keys of the responses embedding it
+COLLECTION_KEYS = {
+    'dog': ('collection:dogs', 'collection:puppies'),  # Puppies embed their sire/dam
+    'dog_image': ('collection:dogs',),
+    'puppy': ('collection:puppies',),
+    'puppy_image': ('collection:puppies',),
+    'gallery': ('collection:gallery',),
+}
+
+# Entity changed -> (item key prefix, change attribute holding the item id)
+ITEM_KEYS = {
+    'dog': ('dog', 'id'),
+    'dog_image': ('dog', 'dog_id'),
+    'puppy': ('puppy', 'id'),
+    'puppy_image': ('puppy', 'puppy_id'),
+    'gallery': ('gallery', 'id'),
+}
+
+
+def surrogate_key(*parts):
+    """Join key parts, escaping what can't appear in a space-separated header"""
+    return ':'.join(quote(str(part), safe='') for part in parts)
+
+
+def keys_for_changes(changes):
+    """Map change records (see change_service) to the surrogate keys they purge"""
+    keys = set()
+    for change in changes:
+        entity = change['entity']
+        if entity not in COLLECTION_KEYS:
+            continue
+        keys.update(COLLECTION_KEYS[entity])
+
+        prefix, attr = ITEM_KEYS[entity]
+        item_id = change['id'] if attr == 'id' else change.get('values', {}).get(attr)
+        if item_id is not None:
+            keys.add(surrogate_key(prefix, item_id))
+
+        if entity == 'gallery':
+            # The item leaves its old category's lists as well
+            categories = {change.get('values', {}).get('category'), change.get('previous', {}).get('category')}
+            keys.update(surrogate_key('gallery', 'category', category) for category in categories if category)
+    return keys
+
+
+# ============================================
+# BACKENDS
+# ============================================
+
+class LogPurgeBackend:
+    """Logs purges instead of sending them (development)"""
+
+    def purge(self, keys):
+        logger.info(f"CDN purge: {' '.join(keys)}")
+
+
+class HttpPurgeBackend:
+    """
+    Varnish/Fastly-style purge: one request per batch to each URL, with
+    the keys space-separated in a header
+    """
+
+    def __init__(self, urls, method='PURGE', key_header='Surrogate-Key', headers=None, timeout=5):
+        self.urls = urls
+        self.method = method
+        self.key_header = key_header
+        self.headers = headers or {}
+        self.timeout = timeout
+
+    def purge(self, keys):
+        for url in self.urls:
+            headers = dict(self.headers, **{self.key_header: ' '.join(keys)})
+            req = urllib.request.Request(url, method=self.method, headers=headers)
+            # Error statuses raise HTTPError: the dispatcher retries the batch
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                response.read()
+
+
+def _http_backend(app):
+    urls = [url.strip() for url in app.config.get('CDN_PURGE_URLS', '').split(',') if url.strip()]
+    if not urls:
+        raise ValueError('CDN_PURGE_BACKEND=http requires CDN_PURGE_URLS')
+    headers = {}
+    if app.config.get('CDN_PURGE_TOKEN'):
+        headers[app.config.get('CDN_PURGE_TOKEN_HEADER', 'Fastly-Key')] = app.config['CDN_PURGE_TOKEN']
+    return HttpPurgeBackend(
+        urls,
+        method=app.config.get('CDN_PURGE_METHOD', 'PURGE'),
+        key_header=app.config.get('CDN_PURGE_KEY_HEADER', 'Surrogate-Key'),
+        headers=headers,
+        timeout=app.config.get('CDN_PURGE_TIMEOUT_SECONDS', 5),
+    )
+
+
+# CDN_PURGE_BACKEND -> factory(app) returning an object with purge(keys), or None
+_backends = {
+    'none': lambda app: None,
+    'log': lambda app: LogPurgeBackend(),
+    'http': _http_backend,
+}
+
+
+def register_purge_backend(name, factory):
+    """
+    Make a purge backend selectable with CDN_PURGE_BACKEND
+
+    Args:
+        name: Backend name
+        factory: Callable taking the app and returning an object with a
+            purge(keys) method (called with at most CDN_PURGE_BATCH_SIZE keys)
+    """
+    _backends[name] = factory
+
+
+# ============================================
+# DISPATCHER
+# ============================================
+
+class PurgeDispatcher:
+    """Background thread purging queued keys in coalesced batches"""
+
+    def __init__(self, backend, delay=0.5, batch_size=256, retry_seconds=30, repeat_seconds=0):
+        self.backend = backend
+        self.delay = delay
+        self.batch_size = batch_size
+        self.retry_seconds = retry_seconds
+        self.repeat_seconds = repeat_seconds
+        self._pending = set()
+        self._repeats = []  # (due monotonic time, keys) of second purges
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # A forked worker process inherits the object but not the thread
+        with self._condition:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pending = set()
+                self._repeats = []
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='cdn-purge', daemon=True)
+                self._thread.start()
+
+    def submit(self, keys):
+        """
+        Queue keys for purging, and for a second purge repeat_seconds later
+        (purged once, at once, when the delay is 0)
+        """
+        if not keys:
+            return
+        if self.delay <= 0:
+            self.purge(keys)
+            return
+        self._ensure_started()
+        with self._condition:
+            self._pending.update(keys)
+            if self.repeat_seconds > 0:
+                self._repeats.append((time.monotonic() + self.delay + self.repeat_seconds, set(keys)))
+            self._condition.notify()
+
+    def _take(self, everything=False):
+        """Pending keys plus the second purges that are due"""
+        now = time.monotonic()
+        with self._condition:
+            keys, self._pending = self._pending, set()
+            repeats = []
+            for due, repeat_keys in self._repeats:
+                if everything or due <= now:
+                    keys |= repeat_keys
+                else:
+                    repeats.append((due, repeat_keys))
+            self._repeats = repeats
+        return keys
+
+    def _wait(self):
+        with self._condition:
+            while not self._pending:
+                now = time.monotonic()
+                next_due = min((due for due, _ in self._repeats), default=None)
+                if next_due is not None and next_due <= now:
+                    return
+                self._condition.wait(None if next_due is None else next_due - now)
+        # Let the rest of a bulk edit arrive before purging
+        time.sleep(self.delay)
+
+    def _run(self):
+        while True:
+            self._wait()
+            keys = self._take()
+            if keys and not self.purge(keys):
+                with self._condition:
+                    self._pending.update(keys)
+                time.sleep(self.retry_seconds)
+
+    def purge(self, keys):
+        """
+        Purge keys now, in batches
+
+        Returns:
+            bool: False when a batch failed (logged)
+        """
+        keys = sorted(keys)
+        try:
+            for start in range(0, len(keys), self.batch_size):
+                self.backend.purge(keys[start:start + self.batch_size])
+            return True
+        except Exception as e:
+            # Never fails a committed request; cached copies expire with Surrogate-Control
+            logger.error(f"CDN purge of {len(keys)} keys failed: {str(e)}")
+            return False
+
+    def drain(self):
+        """Purge whatever is still queued (at exit)"""
+        if self._pid == os.getpid():
+            keys = self._take(everything=True)
+            if keys:
+                self.purge(keys)
+
+
+# ============================================
+# APP INTEGRATION
+# ============================================
+
+def get_purge_dispatcher():
+    """Get the purge dispatcher of the current app (None when purging is off)"""
+    return current_app.extensions.get('cdn_purge')
+
+
+def init_cdn_purge(app):
+    """
+    Create the purge dispatcher of the app and purge the keys of every
+    committed change
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    backend_name = app.config.get('CDN_PURGE_BACKEND', 'none')
+    if backend_name not in _backends:
+        raise ValueError(f'Unknown CDN_PURGE_BACKEND: {backend_name}')
+    backend = _backends[backend_name](app)
+
+    dispatcher = None
+    if backend is not None:
+        dispatcher = PurgeDispatcher(
+            backend,
+            delay=app.config.get('CDN_PURGE_DELAY_SECONDS', 0.5),
+            batch_size=app.config.get('CDN_PURGE_BATCH_SIZE', 256),
+            retry_seconds=app.config.get('CDN_PURGE_RETRY_SECONDS', 30),
+            repeat_seconds=app.config.get('CDN_PURGE_REPEAT_SECONDS', 6),
+        )
+        atexit.register(dispatcher.drain)
+
+        def purge_changes(changes):
+            dispatcher.submit(keys_for_changes(changes))
+
+        register_commit_listener(app, purge_changes)
+        app.extensions['cdn_purge'] = dispatcher
+
+    @app.cli.command('cdn-purge')
+    @click.argument('keys', nargs=-1, required=True)
+    def cdn_purge_command(keys):
+        """Purge surrogate keys from the CDN now (e.g. collection:puppies)"""
+        if dispatcher is None:
+            print("❌ CDN_PURGE_BACKEND is none")
+            return
+        if dispatcher.purge(keys):
+            print(f"✅ Purged {len(keys)} keys")
+        else:
+            print("❌ Purge failed, see the log")
+
+
+def surrogate_keys(*templates):
+    """
+    Decorator tagging successful GET responses of a public endpoint with
+    surrogate keys, for targeted CDN purges. Place it above
+    @cached_response, so cache hits are tagged too.
+
+    Args:
+        templates: Keys, filled from the view args and query string
+            ('dog:{dog_id}', 'gallery:category:{category}'). A template
+            whose field the request doesn't have is skipped. Callables
+            taking those parameters and returning templates pick keys
+            per request.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            response = make_response(f(*args, **kwargs))
+            if request.method != 'GET' or response.status_code != 200:
+                return response
+
+            params = dict(request.args.items(), **kwargs)
+            keys = []
+            for template in templates:
+                for key_template in (template(params) if callable(template) else [template]):
+                    fields = [name for _, name, _, _ in Formatter().parse(key_template) if name]
+                    if all(params.get(name) not in (None, '') for name in fields):
+                        keys.append(key_template.format(**{name: quote(str(params[name]), safe='') for name in fields}))
+
+            response.headers[current_app.config.get('SURROGATE_KEY_HEADER', 'Surrogate-Key')] = ' '.join(keys)
+            max_age = current_app.config.get('SURROGATE_CONTROL_MAX_AGE')
+            # Without purges a long CDN lifetime would only serve stale data
+            if max_age and get_purge_dispatcher() is not None:
+                # Honoured (and stripped) by the CDN; browsers keep Cache-Control
+                response.headers['Surrogate-Control'] = f'max-age={max_age}'
+            return response
+
+        return decorated
+    return decorator
+
+
+def gallery_list_keys(params):
+    """Keys of a gallery list: a category's list is only purged by edits in that category"""
+    return ['gallery:category:{category}'] if params.get('category') else ['collection:gallery']
@@ -0,0 +1,168 @@
+"""
+Change Tracking Service
+Collects created/updated/deleted catalog and booking rows during a
+transaction and hands them to registered listeners once it commits
+"""
+
+import logging
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from database import RoutingSession
+
+logger = logging.getLogger(__name__)
+
+# Table name -> entity name used in change events
+ENTITY_NAMES = {
+    'dogs': 'dog',
+    'dog_images': 'dog_image',
+    'puppies': 'puppy',
+    'puppy_images': 'puppy_image',
+    'gallery': 'gallery',
+    'bookings': 'booking',
+}
+
+# Attributes whose values travel with change events (must be JSON-safe)
+TRACKED_ATTRIBUTES = {
+    'dog_image': ('dog_id',),
+    'puppy': ('name', 'status'),
+    'puppy_image': ('puppy_id',),
+    'gallery': ('category',),
+    'booking': ('customer_name', 'puppy_id', 'status'),
+}
+
+
+def register_commit_listener(app, listener):
+    """
+    Register a function called after each commit of the app that changed
+    tracked rows
+
+    Args:
+        app: Flask application whose commits the listener receives
+        listener: Callable taking (changes) - a list of change dicts
+            {'entity': 'puppy', 'id': 42, 'op': 'created'|'updated'|'deleted',
+             'values': {...}, 'changed': [...], 'previous': {...}}
+            'values' holds the TRACKED_ATTRIBUTES of the entity,
+            'changed' lists the tracked attributes an update modified and
+            'previous' their values before the transaction
+    """
+    listeners = app.extensions.setdefault('commit_listeners', [])
+    if listener not in listeners:
+        listeners.append(listener)
+
+
+def record_change(session, entity, entity_id, op, values=None, changed=None, previous_values=None):
+    """
+    Record a change by hand, for writes that bypass the ORM unit of work
+    (e.g. bulk INSERT statements)
+
+    Args:
+        session: SQLAlchemy session the write happened in
+        entity: Entity name ('dog', 'puppy', 'gallery', ...)
+        entity_id: Primary key of the row
+        op: 'created', 'updated' or 'deleted'
+        values: Current values of the entity's tracked attributes
+        changed: Tracked attributes modified by an update
+        previous_values: Values of the changed attributes before the update
+    """
+    pending = session.info.setdefault('pending_changes', {})
+    key = (entity, entity_id)
+    previous = pending.get(key)
+    values = values or {}
+    changed = list(changed or [])
+    previous_values = previous_values or {}
+
+    # created + updated is still a create; anything followed by delete is a delete
+    if previous and previous['op'] == 'created' and op == 'deleted':
+        pending.pop(key)
+        return
+    if previous and op == 'updated':
+        previous['values'].update(values)
+        previous['changed'] = sorted(set(previous['changed']) | set(changed))
+        # Keep the value from before the first update of the transaction
+        for attr, value in previous_values.items():
+            previous['previous'].setdefault(attr, value)
+        return
+
+    pending[key] = {
+        'entity': entity,
+        'id': entity_id,
+        'op': op,
+        'values': values,
+        'changed': changed,
+        'previous': previous_values,
+    }
+
+
+def _entity_for(obj):
+    table = getattr(obj, '__tablename__', None)
+    return ENTITY_NAMES.get(table)
+
+
+def _tracked_values(entity, obj):
+    # Read loaded state only: lazy loading a deleted row would fail mid-flush
+    loaded = inspect(obj).dict
+    return {attr: loaded.get(attr) for attr in TRACKED_ATTRIBUTES.get(entity, ())}
+
+
+def _previous_values(entity, obj):
+    state = inspect(obj)
+    values = {}
+    for attr in TRACKED_ATTRIBUTES.get(entity, ()):
+        history = state.attrs[attr].history
+        if history.has_changes() and history.deleted:
+            values[attr] = history.deleted[0]
+    return values
+
+
+def _changed_attributes(entity, obj):
+    state = inspect(obj)
+    return [
+        attr for attr in TRACKED_ATTRIBUTES.get(entity, ())
+        if state.attrs[attr].history.has_changes()
+    ]
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_changes(session, flush_context):
+    for obj in session.new:
+        entity = _entity_for(obj)
+        if entity:
+            record_change(session, entity, obj.id, 'created', _tracked_values(entity, obj))
+
+    for obj in session.dirty:
+        entity = _entity_for(obj)
+        if entity and session.is_modified(obj, include_collections=False):
+            record_change(
+                session, entity, obj.id, 'updated',
+                _tracked_values(entity, obj), _changed_attributes(entity, obj),
+                _previous_values(entity, obj)
+            )
+
+    for obj in session.deleted:
+        entity = _entity_for(obj)
+        if entity:
+            record_change(
+                session, entity, inspect(obj).identity[0], 'deleted',
+                _tracked_values(entity, obj)
+            )
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _dispatch_changes(session):
+    pending = session.info.pop('pending_changes', None)
+    if not pending or not has_app_context():
+        return
+
+    changes = list(pending.values())
+    # Only the committing app's listeners: each create_app() registers its own
+    for listener in list(current_app.extensions.get('commit_listeners', ())):
+        try:
+            listener(changes)
+        except Exception as e:
+            # Listeners must never turn a committed write into a failed request
+            logger.error(f"Commit listener {listener.__name__} failed: {str(e)}")
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('pending_changes', None)
@@ -0,0 +1,193 @@
+"""
+Direct Upload Service
+Gallery uploads that go from the browser straight to storage, so the
+bytes never pass through a Flask worker. See docs/direct-uploads.md.
+
+    1. create_direct_upload(): a presigned PUT URL for a staging key
+       (.direct/<id>.<ext>) plus a signed token describing the upload
+    2. the client PUTs the file to that URL (the bucket for S3 storage,
+       PUT /api/uploads/direct/<token> for local storage)
+    3. confirm_direct_upload(): checks what arrived, moves it through the
+       normal gallery creation path and deletes the staging object
+
+Tokens are signed with SECRET_KEY and expire with the URL; no upload
+state is kept on the server. Local staging files that are never
+confirmed are removed by `flask cleanup-direct-uploads`; on S3, add a
+lifecycle rule expiring the .direct/ prefix.
+"""
+
+import os
+import time
+import uuid
+from flask import current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from utils.validators import allowed_file
+from services.file_service import store_local_file
+from services.gallery_service import media_type_for, add_gallery_item
+from services.resumable_upload_service import UploadError, GALLERY_METADATA
+from services.storage_service import get_storage
+
+DIRECT_UPLOAD_FOLDER = '.direct'
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='direct-upload')
+
+
+def _expiry():
+    return current_app.config.get('DIRECT_UPLOAD_EXPIRY_SECONDS', 3600)
+
+
+def load_token(token):
+    """
+    Decode a direct upload token
+
+    Returns:
+        dict: {'key', 'filename', 'size', 'content_type', 'metadata'}
+
+    Raises:
+        UploadError: Expired (410) or forged (403) token
+    """
+    try:
+        return _serializer().loads(token, max_age=_expiry())
+    except SignatureExpired:
+        raise UploadError('Upload URL has expired', 410)
+    except BadSignature:
+        raise UploadError('Invalid upload token', 403)
+
+
+def create_direct_upload(filename, size, content_type, metadata):
+    """
+    Authorize one gallery upload straight to storage
+
+    Args:
+        filename: Original file name (decides image/video handling)
+        size: Exact size in bytes the client will send
+        content_type: Content-Type the client will send
+        metadata: Optional gallery fields (title, description, category,
+            display_order, is_active)
+
+    Returns:
+        dict: {'token', 'upload_url', 'method', 'headers', 'expires_in'}
+    """
+    media_type = media_type_for(filename)
+    if media_type is None or not allowed_file(filename, media_type.lower()):
+        raise UploadError('File type not allowed', 400)
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError('size must be a positive integer', 400)
+    max_size = current_app.config.get('DIRECT_UPLOAD_MAX_SIZE')
+    if max_size and size > max_size:
+        raise UploadError(f'File exceeds the maximum size of {max_size} bytes', 413)
+
+    content_type = content_type or 'application/octet-stream'
+    ext = filename.rsplit('.', 1)[1].lower()
+    key = f'{DIRECT_UPLOAD_FOLDER}/{uuid.uuid4().hex}.{ext}'
+    token = _serializer().dumps({
+        'key': key,
+        'filename': filename,
+        'size': size,
+        'content_type': content_type,
+        'metadata': {name: str(metadata[name]) for name in GALLERY_METADATA if metadata.get(name) is not None},
+    })
+
+    return {
+        'token': token,
+        'upload_url': get_storage().presign_put(key, content_type, size, _expiry(), token),
+        'method': 'PUT',
+        'headers': {'Content-Type': content_type},
+        'expires_in': _expiry(),
+    }
+
+
+def receive_direct_upload(token, stream, content_length):
+    """
+    Store the body of a PUT to a local presigned URL
+
+    Args:
+        token: Token from the URL
+        stream: Request body stream
+        content_length: Content-Length header (must equal the announced size)
+    """
+    storage = get_storage()
+    if storage.remote:
+        raise UploadError('Upload to the storage URL instead', 404)
+
+    upload = load_token(token)
+    if content_length != upload['size']:
+        raise UploadError(f"Content-Length must be {upload['size']}", 400)
+
+    written = storage.write(upload['key'], stream, upload['size'])
+    if written != upload['size']:
+        storage.delete(upload['key'])
+        raise UploadError(f"Expected {upload['size']} bytes, received {written}", 400)
+
+
+def confirm_direct_upload(token):
+    """
+    Turn a finished direct upload into a gallery item
+
+    Returns:
+        Gallery: The committed item
+
+    Raises:
+        UploadError: Nothing (or the wrong amount) was uploaded, or the
+            content failed validation
+    """
+    upload = load_token(token)
+    storage = get_storage()
+    key = upload['key']
+
+    size = storage.size(key)
+    if size is None:
+        raise UploadError('No file has been uploaded for this token (or it was already confirmed)', 409)
+    if size != upload['size']:
+        storage.delete(key)
+        raise UploadError(f"Uploaded file is {size} bytes, expected {upload['size']}", 400)
+
+    local_path = storage.localize(key)
+    try:
+        # Validated, optimized and published like any other upload
+        success, result = store_local_file(local_path, upload['filename'], 'gallery')
+    finally:
+        storage.delete(key)
+    if not success:
+        raise UploadError(f'File upload failed: {result}', 400)
+
+    try:
+        return add_gallery_item(result, media_type_for(upload['filename']), upload['metadata'])
+    except Exception as e:
+        raise UploadError(f'Error creating gallery item: {str(e)}', 500)
+
+
+def cleanup_direct_uploads():
+    """
+    Delete local staging files older than DIRECT_UPLOAD_EXPIRY_SECONDS
+
+    Returns:
+        int: Number of files removed
+    """
+    folder = get_storage().path(DIRECT_UPLOAD_FOLDER)
+    if not os.path.isdir(folder):
+        return 0
+
+    cutoff = time.time() - _expiry()
+    removed = 0
+    for entry in os.scandir(folder):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+def init_direct_uploads(app):
+    """
+    Register the staging cleanup command
+
+    Args:
+        app: Flask application
+    """
+    @app.cli.command('cleanup-direct-uploads')
+    def cleanup_direct_uploads_command():
+        """Delete unconfirmed direct uploads from the local staging folder"""
+        removed = cleanup_direct_uploads()
+        print(f"✅ Removed {removed} unconfirmed direct uploads")
@@ -0,0 +1,218 @@
+"""
+Duplicate Detection Service
+Finds near-duplicate gallery images by the Hamming distance of their
+perceptual hashes (64-bit dHash, media_assets.phash).
+
+The hashes live in an in-memory multi-index: the 64 bits are split into
+max_distance + 1 segments, and by the pigeonhole principle two hashes
+within max_distance bits of each other agree exactly on at least one
+segment. A lookup only compares the hashes sharing a segment value with
+the query - a few dict probes instead of a scan of the library.
+
+Each process keeps its own index and catches up with other processes'
+writes through the sync change sequence: rows with a newer change_seq
+are re-read and gallery tombstones are removed before every lookup.
+"""
+
+import threading
+from flask import current_app
+from sqlalchemy import select
+from database import db
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from models.sync import SyncCounter, SyncTombstone
+from services.sync_service import CATALOG_SEQUENCE
+
+DUPLICATE_MODES = ('flag', 'skip', 'allow')
+
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+
+
+def hamming(a, b):
+    """Number of differing bits between two (signed or unsigned) 64-bit hashes"""
+    return ((a ^ b) & HASH_MASK).bit_count()
+
+
+class DuplicateIndex:
+    """Multi-index Hamming lookup over the perceptual hashes of gallery items"""
+
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        count = max_distance + 1
+        bounds = [round(i * HASH_BITS / count) for i in range(count + 1)]
+        self._segments = [(start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])]
+        self._tables = [{} for _ in self._segments]
+        self._hashes = {}
+        self._seq = None
+        self._lock = threading.RLock()
+
+    def _keys(self, value):
+        return [(value >> shift) & mask for shift, mask in self._segments]
+
+    def _add(self, item_id, value):
+        self._remove(item_id)
+        value &= HASH_MASK
+        self._hashes[item_id] = value
+        for table, key in zip(self._tables, self._keys(value)):
+            table.setdefault(key, set()).add(item_id)
+
+    def _remove(self, item_id):
+        value = self._hashes.pop(item_id, None)
+        if value is None:
+            return
+        for table, key in zip(self._tables, self._keys(value)):
+            bucket = table[key]
+            bucket.discard(item_id)
+            if not bucket:
+                del table[key]
+
+    def refresh(self):
+        """Apply gallery rows and deletions committed since the last refresh"""
+        with self._lock:
+            # Everything up to the counter's committed value is visible
+            # (see services/sync_service.py); newer rows are re-read next time
+            current = db.session.execute(
+                select(SyncCounter.value).where(SyncCounter.name == CATALOG_SEQUENCE)
+            ).scalar() or 0
+            if current == self._seq:
+                return
+
+            rows = select(Gallery.id, MediaAsset.phash).outerjoin(MediaAsset, MediaAsset.id == Gallery.asset_id)
+            if self._seq is not None:
+                rows = rows.where(Gallery.change_seq > self._seq)
+                deleted = db.session.execute(
+                    select(SyncTombstone.entity_id)
+                    .where(SyncTombstone.entity == 'gallery', SyncTombstone.change_seq > self._seq)
+                ).scalars()
+                for item_id in deleted:
+                    self._remove(item_id)
+
+            for item_id, phash in db.session.execute(rows):
+                if phash is None:
+                    self._remove(item_id)
+                else:
+                    self._add(item_id, phash)
+            self._seq = current
+
+    def lookup(self, phash, max_distance=None, exclude=None):
+        """
+        Items whose hash is within max_distance bits of phash
+
+        Returns:
+            list: [(item id, distance)] closest first
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        value = phash & HASH_MASK
+        matches = []
+        with self._lock:
+            candidates = set()
+            for table, key in zip(self._tables, self._keys(value)):
+                candidates.update(table.get(key, ()))
+            candidates.discard(exclude)
+
+            for item_id in candidates:
+                distance = (self._hashes[item_id] ^ value).bit_count()
+                if distance <= max_distance:
+                    matches.append((item_id, distance))
+        return sorted(matches, key=lambda match: (match[1], match[0]))
+
+    def clusters(self, max_distance=None):
+        """
+        Groups of items connected by near-duplicate pairs (union-find)
+
+        Returns:
+            list: Lists of item ids, largest group first
+        """
+        parent = {}
+
+        def find(item_id):
+            root = item_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while item_id != root:
+                parent[item_id], item_id = root, parent[item_id]
+            return root
+
+        with self._lock:
+            for item_id, value in self._hashes.items():
+                for other_id, _ in self.lookup(value, max_distance, exclude=item_id):
+                    root, other_root = find(item_id), find(other_id)
+                    if root != other_root:
+                        parent[max(root, other_root)] = min(root, other_root)
+
+        groups = {}
+        for item_id in parent:
+            groups.setdefault(find(item_id), set()).add(item_id)
+        for root in groups:
+            groups[root].add(root)
+        return sorted((sorted(group) for group in groups.values()), key=lambda group: (-len(group), group[0]))
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+def get_duplicate_index():
+    """The current app's index, brought up to date with the database"""
+    app = current_app._get_current_object()
+    index = app.extensions.get('duplicate_index')
+    if index is None:
+        index = app.extensions.setdefault(
+            'duplicate_index', DuplicateIndex(app.config.get('GALLERY_DUPLICATE_MAX_DISTANCE', 6))
+        )
+    index.refresh()
+    return index
+
+
+def duplicate_mode(value):
+    """
+    Validate a 'duplicates' request parameter
+
+    Args:
+        value: 'flag', 'skip', 'allow' or None for GALLERY_DUPLICATE_MODE
+
+    Returns:
+        str: The mode, or None when the value is invalid
+    """
+    mode = value or current_app.config.get('GALLERY_DUPLICATE_MODE', 'flag')
+    return mode if mode in DUPLICATE_MODES else None
+
+
+def find_duplicates(phash, exclude=None):
+    """
+    Gallery items that look like the image with this perceptual hash
+
+    Args:
+        phash: 64-bit dHash (see file_service.compute_dhash)
+        exclude: Gallery id to leave out (the item itself)
+
+    Returns:
+        list: [{'id', 'distance'}] closest first
+    """
+    if phash is None:
+        return []
+    matches = get_duplicate_index().lookup(phash, exclude=exclude)
+    return [{'id': item_id, 'distance': distance} for item_id, distance in matches]
+
+
+def duplicate_clusters(max_distance=None):
+    """
+    Every group of near-duplicate gallery items in the library
+
+    Args:
+        max_distance: Bits that may differ (capped at GALLERY_DUPLICATE_MAX_DISTANCE)
+
+    Returns:
+        list: [{'items': [Gallery.to_dict(), ...], 'size'}] largest group first
+    """
+    groups = get_duplicate_index().clusters(max_distance)
+    ids = [item_id for group in groups for item_id in group]
+    items = {
+        item.id: item
+        for item in Gallery.query.filter(Gallery.id.in_(ids)).all()
+    } if ids else {}
+
+    return [
+        {'items': [items[item_id].to_dict() for item_id in group if item_id in items], 'size': len(group)}
+        for group in groups
+    ]
@@ -0,0 +1,207 @@
+"""
+Event Bus Service
+Fans out commit-time events to every gunicorn worker:
+  - PostgresEventBus: pg_notify() on publish, one LISTEN thread per worker
+  - LocalEventBus: in-memory stand-in for SQLite and tests
+Used for catalog cache invalidation and live admin notifications
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+import time
+from flask import current_app
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay below PostgreSQL's 8000 byte limit
+MAX_NOTIFY_PAYLOAD = 7000
+
+
+class LocalEventBus:
+    """In-memory bus: delivers events synchronously inside this process"""
+
+    def __init__(self):
+        self._subscribers = []
+        self._reconnect_callbacks = []
+
+    def subscribe(self, callback, on_reconnect=None):
+        """
+        Subscribe to events
+
+        Args:
+            callback: Called with each event dict
+            on_reconnect: Called after the bus reconnects and may have
+                missed events (e.g. to flush a cache)
+        """
+        self._subscribers.append(callback)
+        if on_reconnect:
+            self._reconnect_callbacks.append(on_reconnect)
+
+    def publish(self, event):
+        self.deliver(event)
+
+    def deliver(self, event):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Event bus subscriber failed: {str(e)}")
+
+    def ensure_listening(self):
+        pass
+
+
+class PostgresEventBus(LocalEventBus):
+    """
+    Publishes events with pg_notify() and runs one LISTEN thread per worker
+    process. Events are also delivered locally at publish time so the
+    publishing worker sees its own events immediately.
+    """
+
+    def __init__(self, publish_engine, listen_url, channel):
+        super().__init__()
+        self.publish_engine = publish_engine
+        self.listen_url = listen_url
+        self.channel = channel
+        self.origin = None
+        self._pid = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        event = dict(event, origin=self.origin or f'{os.getpid()}')
+        self.deliver(event)
+
+        for payload in self._payloads(event):
+            try:
+                with self.publish_engine.connect() as conn:
+                    conn.execute(
+                        text('SELECT pg_notify(:channel, :payload)'),
+                        {'channel': self.channel, 'payload': payload}
+                    )
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"Event bus NOTIFY failed: {str(e)}")
+
+    def _payloads(self, event):
+        """Split large list payloads so each NOTIFY fits the size limit"""
+        payload = json.dumps(event, default=str)
+        if len(payload) <= MAX_NOTIFY_PAYLOAD:
+            yield payload
+            return
+
+        for field in ('changes', 'notifications'):
+            items = event.get(field) or []
+            if len(items) > 1:
+                middle = len(items) // 2
+                yield from self._payloads(dict(event, **{field: items[:middle]}))
+                yield from self._payloads(dict(event, **{field: items[middle:]}))
+                return
+
+        logger.error("Event bus payload too large to NOTIFY, dropped")
+
+    def ensure_listening(self):
+        """Start the listener thread once per process (safe after fork)"""
+        pid = os.getpid()
+        if self._pid == pid and self._thread and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == pid and self._thread and self._thread.is_alive():
+                return
+            self._pid = pid
+            self.origin = f'{pid}-{id(self)}'
+            self._thread = threading.Thread(
+                target=self._listen_forever,
+                name='event-bus-listener',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _listen_forever(self):
+        backoff = 1
+        engine = create_engine(self.listen_url, poolclass=NullPool)
+        first_connect = True
+
+        while True:
+            try:
+                raw = engine.raw_connection()
+                try:
+                    conn = raw.driver_connection
+                    conn.autocommit = True
+                    with conn.cursor() as cursor:
+                        cursor.execute(f'LISTEN "{self.channel}"')
+
+                    # Anything published while we were disconnected is lost
+                    if not first_connect:
+                        for callback in list(self._reconnect_callbacks):
+                            callback()
+                    first_connect = False
+                    backoff = 1
+
+                    while True:
+                        if select.select([conn], [], [], 30) == ([], [], []):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            notify = conn.notifies.pop(0)
+                            self._handle(notify.payload)
+                finally:
+                    raw.close()
+            except Exception as e:
+                logger.warning(f"Event bus listener disconnected: {str(e)}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _handle(self, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        if event.get('origin') == self.origin:
+            return  # Already delivered locally when published
+        self.deliver(event)
+
+
+def init_event_bus(app, db):
+    """
+    Create the event bus for the app and start its listener lazily
+    in each worker process
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy extension
+    """
+    backend = app.config.get('EVENT_BUS_BACKEND', 'auto')
+    database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if backend == 'auto':
+        backend = 'postgres' if database_uri.startswith('postgresql') else 'local'
+
+    if backend == 'postgres':
+        with app.app_context():
+            publish_engine = db.engine
+        bus = PostgresEventBus(
+            publish_engine,
+            app.config.get('EVENT_BUS_DATABASE_URL') or database_uri,
+            app.config.get('EVENT_BUS_CHANNEL', 'k9_events')
+        )
+    else:
+        bus = LocalEventBus()
+
+    app.extensions['event_bus'] = bus
+
+    @app.before_request
+    def start_event_bus_listener():
+        bus.ensure_listening()
+
+    return bus
+
+
+def get_event_bus():
+    """Get the event bus of the current app"""
+    return current_app.extensions.get('event_bus')
@@ -0,0 +1,163 @@
+"""
+File Operations Journal
+Ties upload-folder file operations to the database transaction they
+belong to, so files and rows can't disagree:
+
+- register_new_file(): a file written for this transaction. Kept when
+  the transaction commits, removed when it rolls back (or the session
+  is closed without committing).
+- schedule_file_delete(): a file the transaction no longer references.
+  Removed only once the transaction has committed; a rollback keeps it.
+
+The deletes themselves go through the storage backend (the local file
+and, for remote backends, the stored object) in batches on a background
+thread, off the request path (FILE_OPS_ASYNC=False applies them inline,
+e.g. for scripts).
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session
+from database import RoutingSession
+from services.storage_service import get_storage
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+
+# ============================================
+# WORKER
+# ============================================
+
+class FileOpsWorker:
+    """Background thread removing files queued by committed/rolled back transactions"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # A forked worker process inherits the object but not the thread
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='file-ops', daemon=True)
+                self._thread.start()
+
+    def submit(self, storage, paths):
+        self._ensure_started()
+        for path in paths:
+            self._queue.put((storage, path))
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for storage, path in batch:
+                self.apply(storage, [path])
+            for _ in batch:
+                self._queue.task_done()
+
+    def apply(self, storage, paths):
+        for path in paths:
+            try:
+                storage.delete(path)
+            except Exception as e:
+                # Left for the orphan sweep; never fails a committed request
+                logger.error(f"Could not delete {path}: {str(e)}")
+
+    def drain(self):
+        """Wait until every queued deletion has been applied"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.join()
+
+
+_worker = FileOpsWorker()
+atexit.register(_worker.drain)
+
+
+def get_file_ops_worker():
+    """The process-wide file operations worker"""
+    return _worker
+
+
+# ============================================
+# JOURNAL
+# ============================================
+
+def _journal(session):
+    journal = session.info.setdefault('file_ops', {'async': True, 'new': [], 'delete': []})
+    journal['async'] = current_app.config.get('FILE_OPS_ASYNC', True)
+    journal['storage'] = get_storage()
+    return journal
+
+
+def register_new_file(session, filepath):
+    """
+    Record a file written as part of the session's transaction; it is
+    deleted again if the transaction doesn't commit
+
+    Args:
+        session: SQLAlchemy session (db.session)
+        filepath: Relative path below UPLOAD_FOLDER (e.g. 'dogs/rex.jpg')
+    """
+    if filepath:
+        if isinstance(session, scoped_session):
+            session = session()
+        if not session.in_transaction():
+            # Nothing has touched the database yet: begin the transaction the
+            # file belongs to, so closing the session still removes it
+            session.begin()
+        _journal(session)['new'].append(filepath)
+
+
+def schedule_file_delete(session, filepath):
+    """
+    Delete a file once the session's transaction commits
+
+    Args:
+        session: SQLAlchemy session (db.session)
+        filepath: Relative path below UPLOAD_FOLDER
+    """
+    if filepath and not filepath.startswith('http'):
+        _journal(session)['delete'].append(filepath)
+
+
+def _apply(journal, paths):
+    if not paths:
+        return
+    if journal['async']:
+        _worker.submit(journal['storage'], paths)
+    else:
+        _worker.apply(journal['storage'], paths)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _apply_committed(session):
+    journal = session.info.pop('file_ops', None)
+    if journal:
+        _apply(journal, journal['delete'])
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _compensate(session, transaction):
+    # Savepoints end inside the outer transaction: only the outermost counts
+    if transaction.parent is not None:
+        return
+    journal = session.info.pop('file_ops', None)
+    if journal:
+        # Not committed: files written for it are orphans, deletions are void
+        _apply(journal, journal['new'])
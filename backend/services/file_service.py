@@ -3,11 +3,16 @@ File Upload Service
 Handles image and video uploads with validation and storage
 """
 
+import hashlib
 import os
+import shutil
+import tempfile
 from werkzeug.utils import secure_filename
 from flask import current_app
-from utils.validators import allowed_file, sanitize_filename
-from PIL import Image
+from utils.validators import allowed_file, sanitize_filename, sniff_mime, content_matches_extension, SNIFF_BYTES
+from services.storage_service import get_storage, publish_file
+from PIL import Image, ImageOps
+import numpy as np
 
 
 def save_uploaded_file(file, folder='general'):
@@ -34,6 +39,11 @@ def save_uploaded_file(file, folder='general'):
     if not allowed_file(file.filename, file_type):
         return False, f'File type not allowed. Allowed types: {current_app.config.get(f"ALLOWED_{file_type.upper()}_EXTENSIONS")}'
     
+    # Validate the actual content, not just the extension
+    content_error = check_upload_content(file)
+    if content_error:
+        return False, content_error
+    
     # Sanitize filename
     safe_filename = sanitize_filename(file.filename)
     
@@ -48,21 +58,180 @@ def save_uploaded_file(file, folder='general'):
     file_path = os.path.join(folder_path, safe_filename)
     
     try:
-        # Save file
-        file.save(file_path)
+        # Save file (a rename when the request streamed it into this folder)
+        write_upload(file, file_path)
         
         # If image, create thumbnail (optional optimization)
         if file_type == 'image':
-            optimize_image(file_path)
+            try:
+                optimize_image(file_path)
+            except ImageTooLargeError as e:
+                os.remove(file_path)
+                return False, str(e)
         
         # Return relative path for database storage
         relative_path = os.path.join(folder, safe_filename)
+        publish_file(relative_path)
         return True, relative_path
     
     except Exception as e:
         return False, f'Error saving file: {str(e)}'
 
 
+def check_upload_content(file):
+    """
+    Check an upload's first bytes against its extension
+    
+    Args:
+        file: FileStorage object from request.files
+        
+    Returns:
+        str: Error message, or None if the content is an allowed format
+            matching the extension
+    """
+    stream = file.stream
+    
+    if getattr(stream, 'rejected', None) is not None:
+        # Streamed by services/ingest_service.py: sniffed while receiving
+        mime, ok = stream.mime, not stream.rejected
+    else:
+        head = stream.read(SNIFF_BYTES)
+        stream.seek(0)
+        mime = sniff_mime(head)
+        ok = content_matches_extension(file.filename, mime)
+    
+    if ok:
+        return None
+    if mime is None:
+        return 'File content is not a supported image or video format'
+    return f'File content ({mime}) does not match its extension'
+
+
+def write_upload(file, file_path):
+    """
+    Store an upload at file_path: moves a streamed upload into place,
+    copies anything else
+    
+    Args:
+        file: FileStorage object from request.files
+        file_path: Full destination path
+        
+    Returns:
+        str: Hex SHA-256 of the content when it was computed while
+            streaming, otherwise None
+    """
+    stream = file.stream
+    if hasattr(stream, 'commit'):
+        stream.commit(file_path)
+        return stream.sha256
+    
+    file.save(file_path)
+    return None
+
+
+def store_local_file(source_path, filename, folder='general'):
+    """
+    Move a file already on the server (e.g. an assembled resumable
+    upload) into the upload folder, with the same validation, naming and
+    image optimization as save_uploaded_file()
+
+    Args:
+        source_path: Absolute path of the file to move
+        filename: Original filename sent by the client
+        folder: Subfolder name ('dogs', 'puppies', 'gallery')
+
+    Returns:
+        tuple: (success: bool, filepath or error: str)
+    """
+    file_type = 'image' if any(filename.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp']) else 'video'
+    
+    if not allowed_file(filename, file_type):
+        return False, f'File type not allowed. Allowed types: {current_app.config.get(f"ALLOWED_{file_type.upper()}_EXTENSIONS")}'
+    
+    try:
+        with open(source_path, 'rb') as f:
+            mime = sniff_mime(f.read(SNIFF_BYTES))
+    except OSError as e:
+        return False, f'Error reading file: {str(e)}'
+    if not content_matches_extension(filename, mime):
+        return False, f'File content ({mime or "unknown"}) does not match its extension'
+    
+    safe_filename = sanitize_filename(filename)
+    folder_path = os.path.join(current_app.config['UPLOAD_FOLDER'], folder)
+    os.makedirs(folder_path, exist_ok=True)
+    file_path = os.path.join(folder_path, safe_filename)
+    
+    try:
+        # os.replace when on the same filesystem, copy + delete otherwise
+        shutil.move(source_path, file_path)
+        
+        if file_type == 'image':
+            try:
+                optimize_image(file_path)
+            except ImageTooLargeError as e:
+                os.remove(file_path)
+                return False, str(e)
+        
+        relative_path = os.path.join(folder, safe_filename)
+        publish_file(relative_path)
+        return True, relative_path
+        
+    except Exception as e:
+        return False, f'Error saving file: {str(e)}'
+
+
+class ImageTooLargeError(ValueError):
+    """Raised when an upload exceeds the pixel or decode-memory caps"""
+    pass
+
+
+# EXIF orientations that swap width and height
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _decode_bounded(file_path, max_width, max_pixels, max_decode_bytes):
+    """
+    Decode an image no larger than needed for max_width
+
+    Returns:
+        tuple: (image in stored orientation, format, EXIF orientation, target size)
+    """
+    source = Image.open(file_path)
+    try:
+        output_format = source.format
+        width, height = source.size
+        
+        if max_pixels and width * height > max_pixels:
+            raise ImageTooLargeError(f'Image is too large ({width}x{height} pixels)')
+        
+        # Target size in stored orientation, capped on the displayed width
+        orientation = source.getexif().get(0x0112)
+        display_width = height if orientation in _ROTATED_ORIENTATIONS else width
+        scale = min(1.0, max_width / display_width)
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+        
+        # JPEG: decode at the smallest DCT scale (1/2..1/8) still >= target
+        source.draft('RGB', target)
+        
+        if max_decode_bytes and source.size[0] * source.size[1] * len(source.getbands()) > max_decode_bytes:
+            raise ImageTooLargeError(f'Image is too large to process ({width}x{height} pixels)')
+        
+        # Cheap integer box reduction first, so LANCZOS only runs on a
+        # bitmap at most ~2x the target; the full-size buffer is freed early
+        factor = min(source.size[0] // target[0], source.size[1] // target[1]) // 2
+        if factor >= 2:
+            img = source.reduce(factor)
+            source.close()
+        else:
+            source.load()
+            img = source
+    except Exception:
+        source.close()
+        raise
+    
+    return img, output_format, orientation, target
+
+
 def optimize_image(file_path, max_width=1920, quality=85):
     """
     Optimize uploaded image (resize if too large, compress)
@@ -71,34 +240,273 @@ def optimize_image(file_path, max_width=1920, quality=85):
         file_path: Full path to image file
         max_width: Maximum width in pixels
         quality: JPEG quality (1-100)
+    
+    Raises:
+        ImageTooLargeError: Image exceeds IMAGE_MAX_PIXELS or IMAGE_MAX_DECODE_BYTES
+    """
+    optimize_image_file(
+        file_path,
+        current_app.config.get('IMAGE_MAX_PIXELS'),
+        current_app.config.get('IMAGE_MAX_DECODE_BYTES'),
+        max_width,
+        quality
+    )
+
+
+def optimize_image_file(file_path, max_pixels, max_decode_bytes, max_width=1920, quality=85):
+    """
+    optimize_image() with explicit limits instead of the app config, so it
+    can also run in worker processes without an application context
+    
+    Memory stays bounded for large phone photos: JPEGs decode at reduced
+    scale (draft mode), the bitmap is reduced by an integer factor before
+    alpha flattening and the LANCZOS pass, EXIF rotation runs on the small
+    image, and the result is encoded to a temp file renamed over the original.
+    PNG, WebP and GIF have no reduced decode: their full bitmap is always
+    decoded, so max_decode_bytes (checked before decoding) is their only bound.
+    
+    Args:
+        file_path: Full path to image file
+        max_pixels: Largest image (width * height) accepted
+        max_decode_bytes: Largest decoded bitmap accepted
+        max_width: Maximum width in pixels
+        quality: JPEG quality (1-100)
+    
+    Raises:
+        ImageTooLargeError: Image exceeds max_pixels or max_decode_bytes
     """
     try:
-        with Image.open(file_path) as img:
-            # Convert RGBA to RGB if needed (for JPEG)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            
-            # Resize if too large
-            if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Save optimized version
-            img.save(file_path, optimize=True, quality=quality)
+        img, output_format, orientation, target = _decode_bounded(
+            file_path,
+            max_width,
+            max_pixels,
+            max_decode_bytes
+        )
+        
+        # Convert RGBA to RGB if needed (for JPEG)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            if img.mode != 'RGBA':
+                img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        
+        if img.size != target:
+            img = img.resize(target, Image.Resampling.LANCZOS)
+        
+        # Apply EXIF orientation to the small image
+        if orientation:
+            img.getexif()[0x0112] = orientation
+            img = ImageOps.exif_transpose(img)
+        
+        # Encode next to the original, then swap it in atomically
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                img.save(f, format=output_format, optimize=True, quality=quality)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    except ImageTooLargeError:
+        raise
+    
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e))
     
     except Exception as e:
         # If optimization fails, keep original file
         print(f"Warning: Could not optimize image {file_path}: {str(e)}")
 
 
+# ============================================
+# PLACEHOLDERS (blurhash)
+# ============================================
+
+# Basis functions per axis; 4x3 gives a 28 character hash
+BLURHASH_COMPONENTS = (4, 3)
+
+# Images are downsampled to this before the transform: a blurhash only
+# keeps the lowest frequencies, more pixels change nothing visible
+BLURHASH_SAMPLE_SIZE = 32
+
+_BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def _base83(value, length):
+    return ''.join(_BASE83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _linear_to_srgb(value):
+    value = min(max(value, 0.0), 1.0)
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash_from_image(img, components=BLURHASH_COMPONENTS):
+    """
+    Encode a (small) PIL image as a blurhash string
+    
+    The DCT runs as one NumPy contraction over all pixels and components
+    instead of the reference implementation's per-pixel Python loops.
+    
+    Args:
+        img: PIL image, ideally already downsampled
+        components: (x, y) number of basis functions
+    
+    Returns:
+        str: Blurhash (https://blurha.sh)
+    """
+    components_x, components_y = components
+    pixels = np.asarray(img.convert('RGB'), dtype=np.float64) / 255.0
+    height, width, _ = pixels.shape
+    
+    # sRGB -> linear light
+    linear = np.where(pixels <= 0.04045, pixels / 12.92, ((pixels + 0.055) / 1.055) ** 2.4)
+    
+    basis_x = np.cos(np.pi * np.outer(np.arange(components_x), np.arange(width)) / width)
+    basis_y = np.cos(np.pi * np.outer(np.arange(components_y), np.arange(height)) / height)
+    normalisation = np.full((components_y, components_x), 2.0)
+    normalisation[0, 0] = 1.0
+    
+    # factors[j, i] = sum over pixels of basis_y[j] * basis_x[i] * linear
+    factors = np.einsum('jy,ix,yxc->jic', basis_y, basis_x, linear)
+    factors *= (normalisation / (width * height))[:, :, None]
+    factors = factors.reshape(-1, 3)
+    dc, ac = factors[0], factors[1:]
+    
+    result = _base83((components_x - 1) + (components_y - 1) * 9, 1)
+    
+    if len(ac):
+        quantised_max = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+        maximum = (quantised_max + 1) / 166
+    else:
+        quantised_max, maximum = 0, 1.0
+    result += _base83(quantised_max, 1)
+    
+    result += _base83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+    
+    # AC components: sign-preserving square root, quantised to 0..18 per channel
+    scaled = ac / maximum
+    quantised = np.clip(np.floor(np.sign(scaled) * np.abs(scaled) ** 0.5 * 9 + 9.5), 0, 18).astype(int)
+    for r, g, b in quantised:
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+    
+    return result
+
+
+def decode_thumbnail(file_path, size=BLURHASH_SAMPLE_SIZE):
+    """
+    Decode an image straight to a small RGB thumbnail (EXIF-rotated,
+    alpha flattened on white) for the placeholder and perceptual hashes
+    
+    Args:
+        file_path: Full path to image file
+        size: Longest side in pixels
+    
+    Returns:
+        PIL.Image: RGB image at most size x size
+    """
+    with Image.open(file_path) as img:
+        # JPEG: decode straight at 1/8 scale when that's still big enough
+        img.draft('RGB', (size * 2, size * 2))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        img = img.convert('RGB')
+        img.thumbnail((size, size), Image.Resampling.BILINEAR)
+        return img
+
+
+def compute_blurhash(file_path, components=BLURHASH_COMPONENTS):
+    """
+    Blurhash placeholder of an image file, decoded at reduced size
+    
+    Args:
+        file_path: Full path to image file
+        components: (x, y) number of basis functions
+    
+    Returns:
+        str: Blurhash, or None when the file can't be decoded
+    """
+    try:
+        return blurhash_from_image(decode_thumbnail(file_path), components)
+    except Exception as e:
+        print(f"Warning: Could not compute blurhash for {file_path}: {str(e)}")
+        return None
+
+
+# ============================================
+# PERCEPTUAL HASH (dHash)
+# ============================================
+
+DHASH_SIZE = 8
+
+
+def dhash_from_image(img):
+    """
+    64-bit difference hash: one bit per horizontally adjacent pixel pair
+    of a 9x8 grayscale version, set where brightness increases. Robust to
+    rescaling, recompression and small crops; compare with Hamming distance.
+    
+    Args:
+        img: PIL image (a thumbnail is plenty)
+    
+    Returns:
+        int: Hash as a signed 64-bit integer (fits a BIGINT column)
+    """
+    gray = img.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BOX)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = int.from_bytes(np.packbits(bits).tobytes(), 'big')
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def compute_dhash(file_path):
+    """
+    dhash_from_image() of an image file
+    
+    Returns:
+        int: Signed 64-bit hash, or None when the file can't be decoded
+    """
+    try:
+        return dhash_from_image(decode_thumbnail(file_path))
+    except Exception as e:
+        print(f"Warning: Could not compute perceptual hash for {file_path}: {str(e)}")
+        return None
+
+
+# ============================================
+# CONTENT CHECKSUM
+# ============================================
+
+def compute_sha256(file_path):
+    """
+    Hex SHA-256 of a stored file, read in 1 MB chunks
+    
+    Returns:
+        str: Checksum, or None when the file can't be read
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except OSError as e:
+        print(f"Warning: Could not compute checksum for {file_path}: {str(e)}")
+        return None
+    return digest.hexdigest()
+
+
 def delete_file(filepath):
     """
-    Delete file from filesystem
+    Delete file from storage
     
     Args:
         filepath: Relative path to file (e.g., 'puppies/image.jpg')
@@ -107,11 +515,10 @@ def delete_file(filepath):
         bool: True if deleted, False if error
     """
     try:
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        full_path = os.path.join(upload_folder, filepath)
+        storage = get_storage()
         
-        if os.path.exists(full_path):
-            os.remove(full_path)
+        if storage.exists(filepath):
+            storage.delete(filepath)
             return True
         else:
             return False
@@ -151,6 +558,5 @@ def get_file_url(filepath):
     Returns:
         str: URL to access file
     """
-    # In production, this would return CDN or cloud storage URL
-    # For now, return local development URL
-    return f"/uploads/{filepath}"
\ No newline at end of file
+    # Remote storage hands out its own URLs; local files go through /uploads
+    return get_storage().url(filepath) or f"/uploads/{filepath}"
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Gallery Service
+Gallery item creation shared by the upload endpoints (single file,
+bulk upload and resumable uploads)
+"""
+
+from flask import current_app
+from database import db
+from models.gallery import Gallery
+from services.file_ops_service import register_new_file
+from services.media_asset_service import asset_for_path, probe_path
+
+
+def media_type_for(filename):
+    """
+    Gallery media type for a file name
+
+    Args:
+        filename: Original file name
+
+    Returns:
+        str: 'Image', 'Video' or None when the extension isn't allowed
+    """
+    ext = filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+    if ext in current_app.config.get('ALLOWED_IMAGE_EXTENSIONS', ()):
+        return 'Image'
+    if ext in current_app.config.get('ALLOWED_VIDEO_EXTENSIONS', ()):
+        return 'Video'
+    return None
+
+
+def add_gallery_item(file_path, media_type, data, meta=None):
+    """
+    Create a gallery item for a stored upload
+
+    Args:
+        file_path: Relative path below UPLOAD_FOLDER
+        media_type: 'Image' or 'Video'
+        data: Mapping with optional title, description, category,
+            display_order and is_active (form values)
+        meta: probe_path() result when the caller already probed the file
+
+    Returns:
+        Gallery: The committed item
+
+    Raises:
+        Exception: When the insert fails; the file is deleted
+    """
+    # Removed again by the file journal if the insert doesn't commit
+    register_new_file(db.session, file_path)
+    
+    # Probed here rather than in the flush hook, once per upload
+    if meta is None:
+        meta = probe_path(file_path)
+    
+    try:
+        gallery_item = Gallery(
+            title=data.get('title'),
+            description=data.get('description'),
+            media_type=media_type,
+            file_path=file_path,
+            category=data.get('category', 'General'),
+            display_order=int(data.get('display_order', 0)),
+            is_active=data.get('is_active', 'true').lower() == 'true',
+            asset=asset_for_path(db.session, file_path, meta=meta)
+        )
+
+        db.session.add(gallery_item)
+        db.session.commit()
+        return gallery_item
+
+    except Exception:
+        db.session.rollback()
+        raise
@@ -0,0 +1,515 @@
+"""
+GraphQL Service
+Read-only GraphQL schema over dogs, puppies, images, gallery and bookings
+
+- Per-request batch loaders turn sire/dam/images/bookings lookups into
+  one IN query per relation instead of one query per parent row
+- Depth and complexity limits reject queries that would scan everything
+- Parsed + validated documents are cached by SHA-256, which also backs
+  Apollo-style persisted queries (extensions.persistedQuery.sha256Hash)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from graphql import (
+    GraphQLSchema, GraphQLObjectType, GraphQLField, GraphQLArgument,
+    GraphQLList, GraphQLNonNull, GraphQLString, GraphQLInt, GraphQLFloat,
+    GraphQLBoolean, GraphQLError, parse, validate, execute,
+    FieldNode, FragmentSpreadNode, InlineFragmentNode, OperationDefinitionNode,
+    FragmentDefinitionNode, get_named_type, is_list_type, get_nullable_type,
+)
+from models.dog import Dog, DogImage
+from models.puppy import Puppy, PuppyImage
+from models.gallery import Gallery
+from models.booking import Booking
+from utils.validators import validate_gender, validate_status
+
+
+# ============================================
+# BATCH LOADERS
+# ============================================
+
+class BatchLoader:
+    """
+    Synchronous batch loader. Parent resolvers announce the keys their
+    children may ask for with want(); the first load() then fetches every
+    wanted key with a single query and serves the rest from memory.
+    """
+
+    def __init__(self, fetch, many=False, on_load=None):
+        self.fetch = fetch  # keys -> list of (key, row)
+        self.many = many
+        self.on_load = on_load  # Called with loaded rows to prime child loaders
+        self._cache = {}
+        self._wanted = set()
+
+    def want(self, keys):
+        self._wanted.update(key for key in keys if key is not None and key not in self._cache)
+
+    def load(self, key):
+        if key is None:
+            return [] if self.many else None
+
+        if key not in self._cache:
+            keys = self._wanted | {key}
+            self._wanted = set()
+            found = {k: [] for k in keys} if self.many else {k: None for k in keys}
+            rows = []
+            for row_key, row in self.fetch(list(keys)):
+                rows.append(row)
+                if self.many:
+                    found[row_key].append(row)
+                else:
+                    found[row_key] = row
+            self._cache.update(found)
+            if self.on_load and rows:
+                self.on_load(rows)
+
+        return self._cache[key]
+
+
+class RequestLoaders:
+    """All batch loaders for one GraphQL request"""
+
+    def __init__(self):
+        self.dog = BatchLoader(
+            lambda ids: [(d.id, d) for d in Dog.query.filter(Dog.id.in_(ids))],
+            on_load=self.prime_dogs
+        )
+        self.puppy = BatchLoader(
+            lambda ids: [(p.id, p) for p in Puppy.query.filter(Puppy.id.in_(ids))],
+            on_load=self.prime_puppies
+        )
+        self.dog_images = BatchLoader(
+            lambda ids: [
+                (img.dog_id, img) for img in
+                DogImage.query.filter(DogImage.dog_id.in_(ids)).order_by(DogImage.display_order, DogImage.id)
+            ],
+            many=True
+        )
+        self.puppy_images = BatchLoader(
+            lambda ids: [
+                (img.puppy_id, img) for img in
+                PuppyImage.query.filter(PuppyImage.puppy_id.in_(ids)).order_by(PuppyImage.display_order, PuppyImage.id)
+            ],
+            many=True
+        )
+        self.puppy_bookings = BatchLoader(
+            lambda ids: [
+                (b.puppy_id, b) for b in
+                Booking.query.filter(Booking.puppy_id.in_(ids)).order_by(Booking.created_at.desc())
+            ],
+            many=True,
+            on_load=self.prime_bookings
+        )
+
+    def prime_dogs(self, dogs):
+        self.dog_images.want(d.id for d in dogs)
+
+    def prime_puppies(self, puppies):
+        ids = [p.id for p in puppies]
+        self.dog.want(p.sire_id for p in puppies)
+        self.dog.want(p.dam_id for p in puppies)
+        self.puppy_images.want(ids)
+        self.puppy_bookings.want(ids)
+
+    def prime_bookings(self, bookings):
+        self.puppy.want(b.puppy_id for b in bookings)
+
+
+# ============================================
+# SCHEMA
+# ============================================
+
+def _iso(attr):
+    def resolve(obj, info):
+        value = getattr(obj, attr)
+        return value.isoformat() if value else None
+    return resolve
+
+
+def _float(attr):
+    def resolve(obj, info):
+        value = getattr(obj, attr)
+        return float(value) if value else None
+    return resolve
+
+
+def _image_url(attr, asset_attr):
+    def resolve(obj, info):
+        return obj.get_image_url(getattr(obj, attr), getattr(obj, asset_attr))
+    return resolve
+
+
+def _require_admin(info):
+    if not info.context['is_admin']:
+        raise GraphQLError('Admin authentication required')
+
+
+DogImageType = GraphQLObjectType('DogImage', lambda: {
+    'id': GraphQLField(GraphQLNonNull(GraphQLInt)),
+    'dog_id': GraphQLField(GraphQLInt),
+    'image_path': GraphQLField(GraphQLString, resolve=_image_url('image_path', 'asset')),
+    'caption': GraphQLField(GraphQLString),
+    'display_order': GraphQLField(GraphQLInt),
+    'uploaded_at': GraphQLField(GraphQLString, resolve=_iso('uploaded_at')),
+})
+
+PuppyImageType = GraphQLObjectType('PuppyImage', lambda: {
+    'id': GraphQLField(GraphQLNonNull(GraphQLInt)),
+    'puppy_id': GraphQLField(GraphQLInt),
+    'image_path': GraphQLField(GraphQLString, resolve=_image_url('image_path', 'asset')),
+    'caption': GraphQLField(GraphQLString),
+    'display_order': GraphQLField(GraphQLInt),
+    'uploaded_at': GraphQLField(GraphQLString, resolve=_iso('uploaded_at')),
+})
+
+DogType = GraphQLObjectType('Dog', lambda: {
+    'id': GraphQLField(GraphQLNonNull(GraphQLInt)),
+    'name': GraphQLField(GraphQLString),
+    'gender': GraphQLField(GraphQLString),
+    'role': GraphQLField(GraphQLString),
+    'date_of_birth': GraphQLField(GraphQLString, resolve=_iso('date_of_birth')),
+    'registration_number': GraphQLField(GraphQLString),
+    'pedigree_info': GraphQLField(GraphQLString),
+    'description': GraphQLField(GraphQLString),
+    'health_clearances': GraphQLField(GraphQLString),
+    'achievements': GraphQLField(GraphQLString),
+    'primary_image': GraphQLField(GraphQLString, resolve=_image_url('primary_image', 'primary_image_asset')),
+    'is_active': GraphQLField(GraphQLBoolean),
+    'created_at': GraphQLField(GraphQLString, resolve=_iso('created_at')),
+    'updated_at': GraphQLField(GraphQLString, resolve=_iso('updated_at')),
+    'images': GraphQLField(
+        GraphQLList(DogImageType),
+        resolve=lambda dog, info: info.context['loaders'].dog_images.load(dog.id)
+    ),
+})
+
+PuppyType = GraphQLObjectType('Puppy', lambda: {
+    'id': GraphQLField(GraphQLNonNull(GraphQLInt)),
+    'name': GraphQLField(GraphQLString),
+    'gender': GraphQLField(GraphQLString),
+    'date_of_birth': GraphQLField(GraphQLString, resolve=_iso('date_of_birth')),
+    'color': GraphQLField(GraphQLString),
+    'weight_kg': GraphQLField(GraphQLFloat, resolve=_float('weight_kg')),
+    'microchip_number': GraphQLField(GraphQLString),
+    'price_inr': GraphQLField(GraphQLFloat, resolve=_float('price_inr')),
+    'status': GraphQLField(GraphQLString),
+    'description': GraphQLField(GraphQLString),
+    'personality_traits': GraphQLField(GraphQLString),
+    'health_notes': GraphQLField(GraphQLString),
+    'primary_image': GraphQLField(GraphQLString, resolve=_image_url('primary_image', 'primary_image_asset')),
+    'is_featured': GraphQLField(GraphQLBoolean),
+    'created_at': GraphQLField(GraphQLString, resolve=_iso('created_at')),
+    'updated_at': GraphQLField(GraphQLString, resolve=_iso('updated_at')),
+    'sold_at': GraphQLField(GraphQLString, resolve=_iso('sold_at')),
+    'sire': GraphQLField(
+        DogType,
+        resolve=lambda puppy, info: info.context['loaders'].dog.load(puppy.sire_id)
+    ),
+    'dam': GraphQLField(
+        DogType,
+        resolve=lambda puppy, info: info.context['loaders'].dog.load(puppy.dam_id)
+    ),
+    'images': GraphQLField(
+        GraphQLList(PuppyImageType),
+        resolve=lambda puppy, info: info.context['loaders'].puppy_images.load(puppy.id)
+    ),
+    'bookings': GraphQLField(GraphQLList(BookingType), resolve=_resolve_puppy_bookings),
+})
+
+GalleryItemType = GraphQLObjectType('GalleryItem', lambda: {
+    'id': GraphQLField(GraphQLNonNull(GraphQLInt)),
+    'title': GraphQLField(GraphQLString),
+    'description': GraphQLField(GraphQLString),
+    'media_type': GraphQLField(
+        GraphQLString,
+        resolve=lambda item, info: item.media_type.lower() if item.media_type else 'image'
+    ),
+    'media_url': GraphQLField(
+        GraphQLString,
+        resolve=lambda item, info: item.get_media_url(item.file_path, item.asset)
+    ),
+    'file_path': GraphQLField(GraphQLString),
+    'category': GraphQLField(GraphQLString),
+    'display_order': GraphQLField(GraphQLInt),
+    'uploaded_at': GraphQLField(GraphQLString, resolve=_iso('uploaded_at')),
+})
+
+BookingType = GraphQLObjectType('Booking', lambda: {
+    'id': GraphQLField(GraphQLNonNull(GraphQLInt)),
+    'customer_name': GraphQLField(GraphQLString),
+    'customer_email': GraphQLField(GraphQLString),
+    'customer_phone': GraphQLField(GraphQLString),
+    'puppy_id': GraphQLField(GraphQLInt),
+    'puppy_gender_preference': GraphQLField(GraphQLString),
+    'message': GraphQLField(GraphQLString),
+    'status': GraphQLField(GraphQLString),
+    'admin_notes': GraphQLField(GraphQLString),
+    'created_at': GraphQLField(GraphQLString, resolve=_iso('created_at')),
+    'updated_at': GraphQLField(GraphQLString, resolve=_iso('updated_at')),
+    'puppy': GraphQLField(
+        PuppyType,
+        resolve=lambda booking, info: info.context['loaders'].puppy.load(booking.puppy_id)
+    ),
+})
+
+
+def _resolve_puppy_bookings(puppy, info):
+    _require_admin(info)
+    return info.context['loaders'].puppy_bookings.load(puppy.id)
+
+
+def _resolve_dogs(root, info, role=None, gender=None):
+    query = Dog.query.filter_by(is_active=True)
+    if role in {'Stud', 'Dam', 'Both'}:
+        query = query.filter_by(role=role)
+    if gender and validate_gender(gender):
+        query = query.filter_by(gender=gender)
+    dogs = query.order_by(Dog.name).all()
+    info.context['loaders'].prime_dogs(dogs)
+    return dogs
+
+
+def _resolve_dog(root, info, id):
+    dog = info.context['loaders'].dog.load(id)
+    return dog if dog and dog.is_active else None
+
+
+def _resolve_puppies(root, info, status=None, gender=None, featured=None):
+    query = Puppy.query
+    if status and status.lower() != 'all':
+        query = query.filter_by(status=status)
+    if gender and validate_gender(gender):
+        query = query.filter_by(gender=gender)
+    if featured:
+        query = query.filter_by(is_featured=True)
+    puppies = query.order_by(Puppy.created_at.desc()).all()
+    info.context['loaders'].prime_puppies(puppies)
+    return puppies
+
+
+def _resolve_puppy(root, info, id):
+    return info.context['loaders'].puppy.load(id)
+
+
+def _resolve_gallery(root, info, category=None, media_type=None):
+    query = Gallery.query.filter_by(is_active=True)
+    if category:
+        query = query.filter_by(category=category)
+    if media_type in ['Image', 'Video']:
+        query = query.filter_by(media_type=media_type)
+    return query.order_by(Gallery.display_order, Gallery.uploaded_at.desc()).all()
+
+
+def _resolve_bookings(root, info, status=None):
+    _require_admin(info)
+    query = Booking.query
+    if status and validate_status(status, 'booking'):
+        query = query.filter_by(status=status)
+    bookings = query.order_by(Booking.created_at.desc()).all()
+    info.context['loaders'].prime_bookings(bookings)
+    return bookings
+
+
+def _resolve_booking(root, info, id):
+    _require_admin(info)
+    return Booking.query.get(id)
+
+
+QueryType = GraphQLObjectType('Query', {
+    'dogs': GraphQLField(
+        GraphQLList(DogType),
+        args={'role': GraphQLArgument(GraphQLString), 'gender': GraphQLArgument(GraphQLString)},
+        resolve=_resolve_dogs
+    ),
+    'dog': GraphQLField(
+        DogType,
+        args={'id': GraphQLArgument(GraphQLNonNull(GraphQLInt))},
+        resolve=_resolve_dog
+    ),
+    'puppies': GraphQLField(
+        GraphQLList(PuppyType),
+        args={
+            'status': GraphQLArgument(GraphQLString),
+            'gender': GraphQLArgument(GraphQLString),
+            'featured': GraphQLArgument(GraphQLBoolean),
+        },
+        resolve=_resolve_puppies
+    ),
+    'puppy': GraphQLField(
+        PuppyType,
+        args={'id': GraphQLArgument(GraphQLNonNull(GraphQLInt))},
+        resolve=_resolve_puppy
+    ),
+    'gallery': GraphQLField(
+        GraphQLList(GalleryItemType),
+        args={'category': GraphQLArgument(GraphQLString), 'media_type': GraphQLArgument(GraphQLString)},
+        resolve=_resolve_gallery
+    ),
+    'bookings': GraphQLField(
+        GraphQLList(BookingType),
+        args={'status': GraphQLArgument(GraphQLString)},
+        resolve=_resolve_bookings
+    ),
+    'booking': GraphQLField(
+        BookingType,
+        args={'id': GraphQLArgument(GraphQLNonNull(GraphQLInt))},
+        resolve=_resolve_booking
+    ),
+})
+
+schema = GraphQLSchema(query=QueryType)
+
+
+# ============================================
+# LIMITS
+# ============================================
+
+# Assumed size of a list field when estimating query complexity
+LIST_COST_FACTOR = 10
+
+
+def analyze_query(document):
+    """
+    Compute the selection depth and estimated cost of a document
+
+    Returns:
+        tuple: (max depth, complexity)
+    """
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+
+    def walk(selection_set, parent_type, depth, seen):
+        max_depth, cost = depth, 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field = parent_type.fields.get(selection.name.value) if hasattr(parent_type, 'fields') else None
+                if field is None:
+                    cost += 1
+                    continue
+                field_type = get_nullable_type(field.type)
+                multiplier = LIST_COST_FACTOR if is_list_type(field_type) else 1
+                if selection.selection_set:
+                    child_depth, child_cost = walk(
+                        selection.selection_set, get_named_type(field.type), depth + 1, seen
+                    )
+                    max_depth = max(max_depth, child_depth)
+                    cost += 1 + multiplier * child_cost
+                else:
+                    cost += 1
+            elif isinstance(selection, InlineFragmentNode):
+                child_type = schema.get_type(selection.type_condition.name.value) \
+                    if selection.type_condition else parent_type
+                child_depth, child_cost = walk(selection.selection_set, child_type, depth, seen)
+                max_depth, cost = max(max_depth, child_depth), cost + child_cost
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name in seen or name not in fragments:
+                    continue  # Cycles are reported by standard validation
+                fragment = fragments[name]
+                child_type = schema.get_type(fragment.type_condition.name.value)
+                child_depth, child_cost = walk(fragment.selection_set, child_type, depth, seen | {name})
+                max_depth, cost = max(max_depth, child_depth), cost + child_cost
+        return max_depth, cost
+
+    max_depth, total_cost = 0, 0
+    for definition in document.definitions:
+        if isinstance(definition, OperationDefinitionNode):
+            depth, cost = walk(definition.selection_set, schema.query_type, 1, frozenset())
+            max_depth, total_cost = max(max_depth, depth), total_cost + cost
+    return max_depth, total_cost
+
+
+# ============================================
+# DOCUMENT CACHE / PERSISTED QUERIES
+# ============================================
+
+# Apollo's error for an unknown hash: the client retries with the full query
+PERSISTED_QUERY_NOT_FOUND = 'PersistedQueryNotFound'
+
+
+class DocumentCache:
+    """LRU of parsed, validated and limit-checked documents keyed by SHA-256"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query_hash):
+        with self._lock:
+            document = self._documents.get(query_hash)
+            if document is not None:
+                self._documents.move_to_end(query_hash)
+            return document
+
+    def set(self, query_hash, document):
+        with self._lock:
+            self._documents[query_hash] = document
+            self._documents.move_to_end(query_hash)
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+
+
+def prepare_document(query, query_hash, cache, max_depth, max_complexity):
+    """
+    Parse, validate and limit-check a query, caching the result by hash.
+    query may be None for a persisted query sent by hash only.
+
+    Returns:
+        tuple: (document or None, list of error messages)
+    """
+    document = cache.get(query_hash)
+    if document is not None:
+        return document, []
+    if query is None:
+        # Hash-only request for a document that was never registered or was evicted
+        return None, [PERSISTED_QUERY_NOT_FOUND]
+
+    try:
+        document = parse(query)
+    except GraphQLError as e:
+        return None, [e.message]
+
+    errors = validate(schema, document)
+    if errors:
+        return None, [error.message for error in errors]
+
+    depth, complexity = analyze_query(document)
+    if depth > max_depth:
+        return None, [f'Query depth {depth} exceeds the limit of {max_depth}']
+    if complexity > max_complexity:
+        return None, [f'Query complexity {complexity} exceeds the limit of {max_complexity}']
+
+    cache.set(query_hash, document)
+    return document, []
+
+
+def hash_query(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def execute_query(document, variables=None, operation_name=None, is_admin=False):
+    """
+    Execute a prepared document
+
+    Returns:
+        dict: GraphQL response ({'data': ..., 'errors': [...]})
+    """
+    result = execute(
+        schema,
+        document,
+        context_value={'loaders': RequestLoaders(), 'is_admin': is_admin},
+        variable_values=variables,
+        operation_name=operation_name
+    )
+
+    response = {'data': result.data}
+    if result.errors:
+        response['errors'] = [error.formatted for error in result.errors]
+    return response
@@ -0,0 +1,177 @@
+"""
+HLS Service
+Packages gallery videos into an adaptive bitrate ladder (HLS): H.264/AAC
+renditions cut into segments, one playlist each, plus a master playlist
+
+    uploads/gallery/<id>/hls-<job id>/master.m3u8
+    uploads/gallery/<id>/hls-<job id>/<rung>/index.m3u8, seg_000.ts, ...
+
+Opt-in: GALLERY_HLS_ENABLED queues an 'hls' media job for every new
+video; single items are queued with POST /api/gallery/admin/<id>/hls and
+older videos with `flask enqueue-video-jobs --kind hls`.
+
+Gallery.hls_path only points at a ladder once it is complete, so items
+keep serving the original file while they are transcoded (hls_status
+tracks the job). Each transcode writes a new folder; the previous one is
+deleted after the switch commits.
+"""
+
+import mimetypes
+import os
+import shutil
+from flask import current_app
+from sqlalchemy import select
+from database import db
+from models.gallery import Gallery
+from services.file_ops_service import schedule_file_delete
+from services.media_gc_service import register_reference_source
+from services.media_job_service import register_job_handler, derived_folder, ffprobe, probe_video, run_ffmpeg, MediaJobError
+from services.storage_service import LocalStorage, get_storage, localize_file, publish_tree
+
+MASTER_PLAYLIST = 'master.m3u8'
+
+
+def parse_ladder(value):
+    """
+    Parse GALLERY_HLS_LADDER
+
+    Args:
+        value: Comma-separated "<short side>:<video kbps>" rungs, e.g. "360:800,720:2800"
+
+    Returns:
+        list: [(short side, kbps)] smallest first
+    """
+    rungs = []
+    for rung in value.split(','):
+        size, kbps = rung.strip().split(':')
+        rungs.append((int(size), int(kbps)))
+    return sorted(rungs)
+
+
+def ladder_for(width, height, ladder):
+    """Rungs that don't upscale the source (at least the smallest, capped at the source size)"""
+    short_side = min(width, height) if width and height else None
+    if short_side is None:
+        return ladder
+    rungs = [rung for rung in ladder if rung[0] <= short_side]
+    return rungs or [(short_side - short_side % 2, ladder[0][1])]
+
+
+def hls_files(hls_path, storage=None):
+    """
+    Relative paths of every file of the ladder with this master playlist,
+    as listed by the storage backend (bucket objects this node never
+    fetched included)
+    """
+    if not hls_path:
+        return []
+    return (storage or get_storage()).list_keys(os.path.dirname(hls_path))
+
+
+def package_hls(full_path, out_dir, rungs, has_audio, segment_seconds):
+    """
+    Transcode a video into HLS renditions with a single ffmpeg run
+
+    Args:
+        full_path: Source video
+        out_dir: Empty folder receiving the master playlist and rung folders
+        rungs: [(short side, video kbps)]
+        has_audio: Whether the source has an audio stream to carry over
+        segment_seconds: Target segment length
+    """
+    count = len(rungs)
+    # Scale the short side, so portrait videos get the same quality as landscape ones
+    filters = [f"[0:v]split={count}" + ''.join(f'[s{i}]' for i in range(count))]
+    filters += [
+        f"[s{i}]scale='if(gt(iw,ih),-2,{size})':'if(gt(iw,ih),{size},-2)'[v{i}]"
+        for i, (size, _) in enumerate(rungs)
+    ]
+    args = ['-y', '-v', 'error', '-i', full_path, '-filter_complex', ';'.join(filters)]
+
+    stream_map = []
+    for i, (size, kbps) in enumerate(rungs):
+        args += [
+            '-map', f'[v{i}]',
+            f'-b:v:{i}', f'{kbps}k', f'-maxrate:v:{i}', f'{kbps * 107 // 100}k', f'-bufsize:v:{i}', f'{kbps * 3 // 2}k',
+        ]
+        if has_audio:
+            args += ['-map', '0:a:0']
+        stream_map.append(f'v:{i},a:{i},name:{size}p' if has_audio else f'v:{i},name:{size}p')
+
+    args += [
+        '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main', '-pix_fmt', 'yuv420p',
+        # Keyframes on segment boundaries, aligned across rungs for clean switches
+        '-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})', '-sc_threshold', '0',
+    ]
+    if has_audio:
+        args += ['-c:a', 'aac', '-b:a', '128k', '-ac', '2']
+    args += [
+        '-f', 'hls', '-hls_time', str(segment_seconds), '-hls_playlist_type', 'vod',
+        '-hls_flags', 'independent_segments',
+        '-hls_segment_filename', os.path.join(out_dir, '%v', 'seg_%03d.ts'),
+        '-master_pl_name', MASTER_PLAYLIST,
+        '-var_stream_map', ' '.join(stream_map),
+        os.path.join(out_dir, '%v', 'index.m3u8'),
+    ]
+    run_ffmpeg(args)
+
+    if not os.path.exists(os.path.join(out_dir, MASTER_PLAYLIST)):
+        raise RuntimeError('ffmpeg produced no master playlist')
+
+
+def _hls_job(job, item):
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    full_path = localize_file(item.file_path)
+    if full_path is None:
+        raise MediaJobError('Video file is missing')
+    info = ffprobe(full_path)
+    video = probe_video(full_path, info)
+    has_audio = any(stream.get('codec_type') == 'audio' for stream in info.get('streams', []))
+
+    ladder = parse_ladder(current_app.config.get('GALLERY_HLS_LADDER', '360:800,720:2800,1080:5000'))
+    rungs = ladder_for(video['width'], video['height'], ladder)
+
+    folder = os.path.join(derived_folder(item.id), f'hls-{job.id}')
+    # Dot-prefixed while being written: never served, and left alone by the media GC
+    tmp_dir = os.path.join(upload_folder, derived_folder(item.id), f'.tmp-hls-{job.id}')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        package_hls(full_path, tmp_dir, rungs, has_audio, current_app.config.get('GALLERY_HLS_SEGMENT_SECONDS', 6))
+        shutil.rmtree(os.path.join(upload_folder, folder), ignore_errors=True)
+        os.replace(tmp_dir, os.path.join(upload_folder, folder))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    publish_tree(folder)
+
+    for path in hls_files(item.hls_path):
+        schedule_file_delete(db.session, path)
+    item.hls_path = os.path.join(folder, MASTER_PLAYLIST)
+
+
+register_job_handler('hls', _hls_job, on_video_upload='GALLERY_HLS_ENABLED', status_attr='hls_status')
+
+
+def _hls_paths():
+    # The GC sweeps this node's upload folder: its local copies are enough
+    local = LocalStorage(current_app.config['UPLOAD_FOLDER'])
+    for hls_path in db.session.execute(select(Gallery.hls_path).where(Gallery.hls_path.isnot(None))).scalars():
+        yield from hls_files(hls_path, local)
+
+
+def init_hls(app):
+    """
+    Register the HLS content types and the ladders with the media
+    garbage collector
+
+    Args:
+        app: Flask application
+    """
+    # send_from_directory guesses .ts as a Qt translation file
+    mimetypes.add_type('application/vnd.apple.mpegurl', '.m3u8')
+    mimetypes.add_type('video/mp2t', '.ts')
+
+    register_reference_source(_hls_paths)
+
+    # Fail at startup rather than in every job on a malformed ladder
+    parse_ladder(app.config.get('GALLERY_HLS_LADDER', '360:800,720:2800,1080:5000'))
@@ -0,0 +1,424 @@
+"""
+Image Transform Service
+On-demand resized/re-encoded variants of uploaded images for
+/uploads/<path>?w=&h=&fit=&fmt=
+
+- Sizes and qualities snapped to an allowlist (bounded variants per image)
+- Output format negotiated from the Accept header (AVIF > WebP > source)
+- Rendered variants kept in a size-bounded on-disk LRU cache
+- Concurrent requests for the same variant render it once (single flight)
+- Decompression bombs rejected before decoding (IMAGE_MAX_PIXELS)
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+import tempfile
+import threading
+import warnings
+from flask import current_app, send_file, jsonify
+from PIL import ExifTags, Image, ImageOps
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+FIT_MODES = ('contain', 'cover', 'fill')
+
+# fmt= value -> (Pillow format, file extension, mimetype)
+OUTPUT_FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'png': ('PNG', 'png', 'image/png'),
+}
+
+SOURCE_FORMATS = {'JPEG': 'jpeg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'png'}
+
+TRANSFORM_PARAMS = ('w', 'h', 'fit', 'fmt', 'q')
+
+
+class TransformError(ValueError):
+    """Invalid transform parameters or an image that can't be transformed"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _can_encode(pillow_format):
+    Image.init()
+    return pillow_format in Image.SAVE
+
+
+# ============================================
+# DISK CACHE
+# ============================================
+
+class DiskLRUCache:
+    """
+    Size-bounded directory of rendered variants. Hits refresh the file's
+    mtime; when the total size exceeds max_bytes the least recently used
+    files are removed until it drops to 90% of the limit.
+    """
+
+    def __init__(self, folder, max_bytes):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._size = None  # Lazily measured on first write
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key, ext):
+        return os.path.join(self.folder, key[:2], f'{key}.{ext}')
+
+    def get(self, key, ext, record=True):
+        path = self.path_for(key, ext)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            if record:
+                self.misses += 1
+            return None
+        if record:
+            self.hits += 1
+        return path
+
+    def put(self, key, ext, data):
+        """Atomically store a variant and return its path"""
+        path = self.path_for(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._measure()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.folder):
+            for name in filenames:
+                if name.startswith('.tmp-'):
+                    continue
+                full = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(full)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, full
+
+    def _measure(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Other workers write to the same folder: re-measure from disk
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+        self._size = total
+
+    def stats(self):
+        with self._lock:
+            return {
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class SingleFlight:
+    """Per-key locks so one thread renders a variant while others wait"""
+
+    def __init__(self):
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+        return entry
+
+    def release(self, key, entry):
+        entry[0].release()
+        with self._lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._locks.pop(key, None)
+
+
+# ============================================
+# TRANSFORMS
+# ============================================
+
+def _int_param(args, name):
+    raw = args.get(name)
+    if raw in (None, ''):
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise TransformError(f'{name} must be an integer')
+    if value < 1:
+        raise TransformError(f'{name} must be positive')
+    return value
+
+
+def _snap_size(value, sizes):
+    """Round a requested dimension up to the next allowed size (the largest above them all)"""
+    if value is None:
+        return None
+    return min((size for size in sizes if size >= value), default=max(sizes))
+
+
+def _snap_quality(value, qualities):
+    """Nearest allowed quality (the higher one on a tie)"""
+    return min(sorted(qualities, reverse=True), key=lambda quality: abs(quality - value))
+
+
+def parse_transform(args, accept_mimetypes, source_format):
+    """
+    Validate transform query parameters and negotiate the output format.
+    Sizes and qualities are snapped to IMAGE_TRANSFORM_SIZES and
+    IMAGE_TRANSFORM_QUALITIES, so every image has a bounded set of variants.
+
+    Args:
+        args: request.args
+        accept_mimetypes: request.accept_mimetypes
+        source_format: Format name of the source file ('jpeg', 'png', ...)
+
+    Returns:
+        dict: {'w', 'h', 'fit', 'fmt', 'q', 'negotiated'}
+    """
+    sizes = current_app.config.get('IMAGE_TRANSFORM_SIZES')
+    width = _snap_size(_int_param(args, 'w'), sizes)
+    height = _snap_size(_int_param(args, 'h'), sizes)
+    quality = _int_param(args, 'q') or current_app.config.get('IMAGE_TRANSFORM_QUALITY', 80)
+    quality = _snap_quality(quality, current_app.config.get('IMAGE_TRANSFORM_QUALITIES'))
+
+    fit = args.get('fit', 'contain')
+    if fit not in FIT_MODES:
+        raise TransformError(f"fit must be one of: {', '.join(FIT_MODES)}")
+    if not (width and height):
+        # cover and fill need a box; with one side they render like contain
+        fit = 'contain'
+
+    fmt = args.get('fmt', 'auto')
+    negotiated = fmt == 'auto'
+    if negotiated:
+        fmt = source_format
+        # Only formats the client names explicitly: */* must not yield AVIF
+        accepted = {value for value, quality in accept_mimetypes if quality > 0}
+        for candidate in ('avif', 'webp'):
+            if OUTPUT_FORMATS[candidate][2] in accepted and _can_encode(OUTPUT_FORMATS[candidate][0]):
+                fmt = candidate
+                break
+    elif fmt not in OUTPUT_FORMATS:
+        raise TransformError(f"fmt must be auto or one of: {', '.join(OUTPUT_FORMATS)}")
+    elif not _can_encode(OUTPUT_FORMATS[fmt][0]):
+        raise TransformError(f'{fmt} output is not supported on this server')
+
+    return {'w': width, 'h': height, 'fit': fit, 'fmt': fmt, 'q': quality, 'negotiated': negotiated}
+
+
+def _open_checked(source_path, max_pixels):
+    """Open an image, rejecting anything above max_pixels before decoding"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', Image.DecompressionBombWarning)
+        try:
+            img = Image.open(source_path)
+        except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+            raise TransformError('Image is too large to transform', 413)
+
+    if max_pixels and img.width * img.height > max_pixels:
+        img.close()
+        raise TransformError('Image is too large to transform', 413)
+    return img
+
+
+def _draft_size(img, width, height):
+    """
+    Smallest decode size still covering the requested box: in the stored
+    orientation (before EXIF rotation), the missing side from the aspect
+    ratio. draft() keeps both sides at least this large, so passing the
+    full source height for a width-only request would never scale down.
+    """
+    if img.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        width, height = height, width
+    if width and not height:
+        height = math.ceil(img.height * width / img.width)
+    elif height and not width:
+        width = math.ceil(img.width * height / img.height)
+    return width, height
+
+
+def render_variant(source_path, spec, max_pixels):
+    """
+    Render one variant of an image
+
+    Args:
+        source_path: Absolute path of the source image
+        spec: Parsed transform (from parse_transform)
+        max_pixels: Largest source image (width * height) accepted
+
+    Returns:
+        bytes: Encoded image
+    """
+    pillow_format = OUTPUT_FORMATS[spec['fmt']][0]
+    width, height = spec['w'], spec['h']
+
+    with _open_checked(source_path, max_pixels) as img:
+        if width or height:
+            # JPEG: let the decoder downscale by 1/2..1/8 while reading
+            img.draft('RGB', _draft_size(img, width, height))
+        img = ImageOps.exif_transpose(img)
+
+        if spec['fit'] == 'cover' and width and height:
+            img = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+        elif spec['fit'] == 'fill' and width and height:
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        elif width or height:
+            # contain: fit inside the box, never upscale
+            img.thumbnail((width or img.width, height or img.height), Image.Resampling.LANCZOS)
+
+        if pillow_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        elif img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            img = img.convert('RGBA')
+
+        output = io.BytesIO()
+        options = {'quality': spec['q']}
+        if pillow_format in ('JPEG', 'PNG'):
+            options['optimize'] = True
+        img.save(output, format=pillow_format, **options)
+        return output.getvalue()
+
+
+def _variant_key(filename, stat, spec):
+    parts = (filename, stat.st_mtime_ns, stat.st_size, spec['w'], spec['h'], spec['fit'], spec['fmt'], spec['q'])
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+
+def wants_transform(args):
+    """True when an /uploads request asks for a transformed variant"""
+    return any(name in args for name in TRANSFORM_PARAMS)
+
+
+def transform_response(filename, args, accept_mimetypes):
+    """
+    Serve a transformed variant of an uploaded image
+
+    Args:
+        filename: Path below UPLOAD_FOLDER
+        args: request.args
+        accept_mimetypes: request.accept_mimetypes
+
+    Returns:
+        Flask response
+    """
+    transformer = current_app.extensions['image_transformer']
+    upload_folder = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+    source_path = safe_join(upload_folder, filename)
+
+    if source_path is None or not os.path.isfile(source_path):
+        return jsonify({'error': 'File not found'}), 404
+
+    try:
+        with Image.open(source_path) as probe:
+            source_format = SOURCE_FORMATS.get(probe.format)
+    except Image.DecompressionBombError:
+        return jsonify({'error': 'Image is too large to transform'}), 413
+    except Exception:
+        source_format = None
+    if source_format is None:
+        return jsonify({'error': 'Only images can be transformed'}), 400
+
+    try:
+        spec = parse_transform(args, accept_mimetypes, source_format)
+    except TransformError as e:
+        return jsonify({'error': str(e)}), e.status
+
+    _, ext, mimetype = OUTPUT_FORMATS[spec['fmt']]
+    key = _variant_key(filename, os.stat(source_path), spec)
+    cache = transformer['cache']
+
+    path = cache.get(key, ext)
+    if path is None:
+        flight = transformer['flights']
+        entry = flight.acquire(key)
+        try:
+            # Another request may have rendered it while we waited
+            path = cache.get(key, ext, record=False)
+            if path is None:
+                data = render_variant(source_path, spec, current_app.config.get('IMAGE_MAX_PIXELS'))
+                path = cache.put(key, ext, data)
+        except TransformError as e:
+            return jsonify({'error': str(e)}), e.status
+        except Exception as e:
+            logger.error(f"Image transform failed for {filename}: {str(e)}")
+            return jsonify({'error': 'Could not transform image'}), 500
+        finally:
+            flight.release(key, entry)
+
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        conditional=True,
+        max_age=current_app.config.get('IMAGE_TRANSFORM_MAX_AGE', 86400)
+    )
+    if spec['negotiated']:
+        response.vary.add('Accept')
+    return response
+
+
+def init_image_transforms(app):
+    """
+    Set up the variant cache and decompression-bomb limit
+
+    Args:
+        app: Flask application
+    """
+    # Pillow warns above this many pixels and refuses above twice as many
+    Image.MAX_IMAGE_PIXELS = app.config.get('IMAGE_MAX_PIXELS')
+
+    app.extensions['image_transformer'] = {
+        'cache': DiskLRUCache(
+            app.config['IMAGE_CACHE_FOLDER'],
+            app.config.get('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+        ),
+        'flights': SingleFlight(),
+    }
+
+
+def get_image_cache():
+    """Get the variant cache of the current app"""
+    transformer = current_app.extensions.get('image_transformer')
+    return transformer['cache'] if transformer else None
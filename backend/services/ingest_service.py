@@ -0,0 +1,137 @@
+"""
+Upload Ingest Service
+Streams multipart file parts of upload requests straight into the
+upload folder they're destined for, instead of Werkzeug's temp files.
+
+While a part is being received its SHA-256 is computed and its first
+bytes are sniffed for the real file type; a part whose content doesn't
+match its extension stops being written to disk right there. Saving the
+upload is then a rename within the same folder - no second copy.
+
+    uploads/<folder>/.incoming/<random>.part   while receiving
+    uploads/<folder>/<name>                    after commit()
+
+Parts that are never committed are deleted when the request closes.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from flask import Request, current_app
+from utils.validators import sniff_mime, content_matches_extension, SNIFF_BYTES
+
+INCOMING_FOLDER = '.incoming'
+
+# Blueprint -> upload folder its multipart requests stream into
+INGEST_FOLDERS = {
+    'dogs': 'dogs',
+    'puppies': 'puppies',
+    'gallery': 'gallery',
+}
+
+
+class IngestFile:
+    """
+    Writable/readable file for one multipart part. Behaves like the
+    file object Werkzeug would have used (read, seek, ...) and records
+    sha256, mime and rejected while being written.
+    """
+
+    def __init__(self, folder_path, filename):
+        incoming = os.path.join(folder_path, INCOMING_FOLDER)
+        os.makedirs(incoming, exist_ok=True)
+        self.path = os.path.join(incoming, f'{uuid.uuid4().hex}.part')
+        self.folder_path = folder_path
+        self.filename = filename
+        self.mime = None
+        self.rejected = False
+        self.committed = False
+        self._file = open(self.path, 'w+b')
+        self._hash = hashlib.sha256()
+        self._head = b''
+
+    def write(self, data):
+        if self.rejected:
+            # Keep consuming the request body, but stop writing
+            return len(data)
+
+        if len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_head()
+                if self.rejected:
+                    return len(data)
+
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def _check_head(self):
+        self.mime = sniff_mime(self._head)
+        if not content_matches_extension(self.filename, self.mime):
+            self.rejected = True
+            self._discard()
+
+    def seek(self, *args):
+        # Werkzeug rewinds once the part is complete: sniff short files now
+        if self.mime is None and not self.rejected:
+            self._check_head()
+        if self.rejected:
+            return 0
+        return self._file.seek(*args)
+
+    @property
+    def sha256(self):
+        """Hex SHA-256 of the received bytes (None when rejected)"""
+        return None if self.rejected else self._hash.hexdigest()
+
+    def commit(self, file_path):
+        """Move the received file to its final path"""
+        self._file.close()
+        if os.path.dirname(file_path) == self.folder_path:
+            os.replace(self.path, file_path)
+        else:
+            shutil.move(self.path, file_path)
+        self.committed = True
+
+    def _discard(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if not self.committed:
+            self._discard()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def __getattr__(self, name):
+        # read, readline, tell, flush, ... of the underlying file
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class IngestRequest(Request):
+    """Request class streaming uploads of the INGEST_FOLDERS blueprints to disk"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        folder = INGEST_FOLDERS.get(self.blueprint)
+        if folder is None or not filename:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+        folder_path = os.path.join(current_app.config['UPLOAD_FOLDER'], folder)
+        return IngestFile(folder_path, filename)
+
+
+def init_ingest(app):
+    """
+    Stream upload requests into the upload folders
+
+    Args:
+        app: Flask application
+    """
+    app.request_class = IngestRequest
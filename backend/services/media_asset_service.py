@@ -0,0 +1,365 @@
+"""
+Media Asset Service
+Records a MediaAsset (size, dimensions, type) for every stored upload,
+once, when a row starts referencing the file - responses then read the
+metadata from the row instead of touching the filesystem.
+
+- A before_flush hook attaches assets whenever one of the media columns
+  (Dog/Puppy.primary_image, DogImage/PuppyImage.image_path,
+  Gallery.file_path) is set or changed, so every upload path is covered
+- Gallery uploads probe the file before the insert (the duplicate check
+  needs its perceptual hash anyway) and attach the asset themselves
+- Core inserts bypass that hook and create their assets themselves
+  (see services/bulk_upload_service.py)
+- The backfills cover rows stored before this existed (and assets
+  recorded before blurhashes were), probing files in the process pool:
+
+    flask --app app backfill-media-assets [--batch-size 500]
+    flask --app app backfill-blurhash [--batch-size 500]
+    flask --app app backfill-phash [--batch-size 500]
+"""
+
+import logging
+import os
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, select, update, inspect
+from PIL import Image
+from database import db, RoutingSession
+from models.dog import Dog, DogImage
+from models.puppy import Puppy, PuppyImage
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from services.change_service import record_change, TRACKED_ATTRIBUTES
+from services.sync_service import allocate_change_seqs
+from services.file_service import decode_thumbnail, blurhash_from_image, dhash_from_image, compute_blurhash, compute_dhash, compute_sha256
+from services.process_pool_service import pool_map
+from services.storage_service import localize_file
+from utils.validators import sniff_mime, SNIFF_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Model -> (sync entity, path attribute, asset relationship, asset id column)
+ASSET_OWNERS = {
+    Dog: ('dog', 'primary_image', 'primary_image_asset', 'primary_image_asset_id'),
+    DogImage: ('dog_image', 'image_path', 'asset', 'asset_id'),
+    Puppy: ('puppy', 'primary_image', 'primary_image_asset', 'primary_image_asset_id'),
+    PuppyImage: ('puppy_image', 'image_path', 'asset', 'asset_id'),
+    Gallery: ('gallery', 'file_path', 'asset', 'asset_id'),
+}
+
+
+# ============================================
+# PROBING
+# ============================================
+
+def probe_media(full_path, sha256=None):
+    """
+    Read the metadata of a stored file. Images are decoded once, at
+    thumbnail size, for the blurhash and perceptual hash. No app context
+    is needed (the bulk upload workers call this too).
+
+    Args:
+        full_path: Absolute path of the file
+        sha256: Checksum of the file when already known (computed while
+            it streamed in, and not rewritten since)
+
+    Returns:
+        dict: {'mime_type', 'bytes', 'sha256', 'width', 'height',
+            'blurhash', 'phash'} or None when the file doesn't exist
+    """
+    try:
+        size = os.path.getsize(full_path)
+        with open(full_path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        return None
+
+    meta = {
+        'mime_type': sniff_mime(head), 'bytes': size, 'sha256': sha256 or compute_sha256(full_path),
+        'width': None, 'height': None, 'blurhash': None, 'phash': None,
+    }
+    if meta['mime_type'] and meta['mime_type'].startswith('image/'):
+        try:
+            with Image.open(full_path) as img:
+                width, height = img.size
+                # Displayed size: EXIF orientations 5-8 swap the axes
+                if img.getexif().get(0x0112) in (5, 6, 7, 8):
+                    width, height = height, width
+                meta['width'], meta['height'] = width, height
+            thumbnail = decode_thumbnail(full_path)
+            meta['blurhash'] = blurhash_from_image(thumbnail)
+            meta['phash'] = dhash_from_image(thumbnail)
+        except Exception as e:
+            logger.warning(f"Could not read image {full_path}: {str(e)}")
+    return meta
+
+
+def _full_path(file_path):
+    # Fetched from the storage backend when another node stored it
+    return localize_file(file_path) or os.path.join(current_app.config['UPLOAD_FOLDER'], file_path.lstrip('/'))
+
+
+def probe_path(file_path):
+    """
+    probe_media() of a stored upload, by its path relative to
+    UPLOAD_FOLDER. Probe before adding the row and pass the result to
+    asset_for_path(), so the flush doesn't decode the image again.
+    """
+    return probe_media(_full_path(file_path))
+
+
+def asset_for_path(session, file_path, pending=None, meta=None):
+    """
+    MediaAsset for a stored upload, probed from disk. An existing row for
+    the same path is refreshed rather than duplicated.
+
+    Args:
+        session: SQLAlchemy session (db.session)
+        file_path: Path relative to UPLOAD_FOLDER
+        pending: Optional dict of path -> asset created since the last
+            flush, so two rows referencing one file share its asset
+        meta: probe_media() result when the file was already probed
+
+    Returns:
+        MediaAsset: Added to the session (not flushed), or None for
+            external URLs and missing files
+    """
+    if not file_path or file_path.startswith('http'):
+        return None
+    if pending is not None and file_path in pending:
+        return pending[file_path]
+
+    if meta is None:
+        meta = probe_path(file_path)
+    if meta is None:
+        return None
+
+    with session.no_autoflush:
+        asset = session.execute(
+            select(MediaAsset).where(MediaAsset.file_path == file_path)
+        ).scalar_one_or_none()
+    if asset is None:
+        asset = MediaAsset(file_path=file_path)
+        session.add(asset)
+    for key, value in meta.items():
+        setattr(asset, key, value)
+    if pending is not None:
+        pending[file_path] = asset
+    return asset
+
+
+# ============================================
+# INGEST HOOK
+# ============================================
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _attach_assets(session, flush_context, instances):
+    pending = {}
+    new = [obj for obj in session.new if type(obj) in ASSET_OWNERS]
+    dirty = [obj for obj in session.dirty if type(obj) in ASSET_OWNERS]
+
+    for obj in new:
+        _, path_attr, asset_attr, _ = ASSET_OWNERS[type(obj)]
+        if getattr(obj, asset_attr) is None and getattr(obj, path_attr):
+            setattr(obj, asset_attr, asset_for_path(session, getattr(obj, path_attr), pending))
+
+    for obj in dirty:
+        _, path_attr, asset_attr, _ = ASSET_OWNERS[type(obj)]
+        if inspect(obj).attrs[path_attr].history.has_changes():
+            setattr(obj, asset_attr, asset_for_path(session, getattr(obj, path_attr), pending))
+
+
+# ============================================
+# BACKFILL
+# ============================================
+
+def _stamp_rows(model, updates):
+    """
+    Apply Core UPDATEs to owner rows whose serialized form changed, with
+    fresh sync sequence numbers and change events (caches, sync clients)
+
+    Args:
+        model: Owner model
+        updates: List of (row id, column values) tuples
+    """
+    if not updates:
+        return
+    entity = ASSET_OWNERS[model][0]
+
+    # Metadata isn't an edit: keep updated_at
+    keep = {'updated_at': model.updated_at} if 'updated_at' in model.__table__.c else {}
+    seq = allocate_change_seqs(db.session, len(updates))
+    tracked = [getattr(model, attr) for attr in TRACKED_ATTRIBUTES.get(entity, ())]
+    for row_id, values in updates:
+        stmt = update(model).where(model.id == row_id).values(**keep, **values, change_seq=seq)
+        # The change event carries the row's tracked values (e.g. the parent dog of an image)
+        row = db.session.execute(stmt.returning(*tracked)).first() if tracked else None
+        record_change(db.session, entity, row_id, 'updated', dict(row._mapping) if row else None, list(values))
+        seq += 1
+
+
+def touch_asset_owners(asset_ids, models=None):
+    """
+    Bump the rows embedding the given assets after their metadata changed
+
+    Args:
+        asset_ids: MediaAsset ids
+        models: Owner models to bump (default: all of ASSET_OWNERS)
+    """
+    asset_ids = list(asset_ids)
+    if not asset_ids:
+        return
+    for model in models or ASSET_OWNERS:
+        asset_column = ASSET_OWNERS[model][3]
+        row_ids = db.session.execute(
+            select(model.id).where(getattr(model, asset_column).in_(asset_ids))
+        ).scalars().all()
+        _stamp_rows(model, [(row_id, {}) for row_id in row_ids])
+
+
+def _backfill_model(model, batch_size, report):
+    _, path_attr, _, asset_column = ASSET_OWNERS[model]
+    path_col = getattr(model, path_attr)
+    asset_col = getattr(model, asset_column)
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(model.id, path_col)
+            .where(asset_col.is_(None), path_col.isnot(None), path_col != '', model.id > last_id)
+            .order_by(model.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        local = [(row_id, path) for row_id, path in rows if not path.startswith('http')]
+        metas = pool_map(probe_media, [_full_path(path) for _, path in local])
+
+        linked, pending = [], {}
+        for (row_id, path), meta in zip(local, metas):
+            asset = asset_for_path(db.session, path, pending, meta)
+            if asset is None:
+                report['missing'] += 1
+            else:
+                linked.append((row_id, asset))
+        db.session.flush()
+
+        _stamp_rows(model, [(row_id, {asset_column: asset.id}) for row_id, asset in linked])
+        db.session.commit()
+        report['linked'] += len(linked)
+        report['scanned'] += len(rows)
+
+
+def backfill_media_assets(batch_size=500):
+    """
+    Create assets for rows stored before media_assets existed
+
+    Rows are handled in batches of `batch_size`, each in its own
+    transaction, so the job can be interrupted and re-run. Assets
+    recorded before checksums were get theirs as well.
+
+    Returns:
+        dict: {'scanned', 'linked', 'missing', 'checksums'} where missing
+            counts rows whose file is not on disk
+    """
+    report = {'scanned': 0, 'linked': 0, 'missing': 0}
+    for model in ASSET_OWNERS:
+        _backfill_model(model, batch_size, report)
+    checksums = _backfill_asset_column(MediaAsset.sha256, compute_sha256, batch_size, images_only=False)
+    report['checksums'] = checksums['updated']
+    return report
+
+
+def _backfill_asset_column(column, compute, batch_size, owners=None, images_only=True):
+    """
+    Fill `column` of image assets (of every asset with images_only=False)
+    where it is NULL with compute(full path), run in the process pool,
+    then bump the owner rows
+
+    Returns:
+        dict: {'scanned', 'updated'}
+    """
+    report = {'scanned': 0, 'updated': 0}
+    last_id = 0
+    while True:
+        query = select(MediaAsset.id, MediaAsset.file_path).where(column.is_(None), MediaAsset.id > last_id)
+        if images_only:
+            query = query.where(MediaAsset.mime_type.like('image/%'))
+        assets = db.session.execute(query.order_by(MediaAsset.id).limit(batch_size)).all()
+        if not assets:
+            break
+        last_id = assets[-1].id
+
+        values = pool_map(compute, [_full_path(path) for _, path in assets])
+
+        updated = [(asset.id, value) for asset, value in zip(assets, values) if value is not None]
+        for asset_id, value in updated:
+            db.session.execute(update(MediaAsset).where(MediaAsset.id == asset_id).values({column: value}))
+        touch_asset_owners((asset_id for asset_id, _ in updated), owners)
+        db.session.commit()
+        report['updated'] += len(updated)
+        report['scanned'] += len(assets)
+    return report
+
+
+def backfill_blurhashes(batch_size=500):
+    """
+    Compute the blurhash of image assets recorded without one
+
+    Returns:
+        dict: {'scanned', 'updated'}
+    """
+    return _backfill_asset_column(MediaAsset.blurhash, compute_blurhash, batch_size)
+
+
+def backfill_phashes(batch_size=500):
+    """
+    Compute the perceptual hash of image assets recorded without one.
+    Only gallery rows are bumped: the hash isn't serialized, but the
+    duplicate index follows gallery change_seq.
+
+    Returns:
+        dict: {'scanned', 'updated'}
+    """
+    return _backfill_asset_column(MediaAsset.phash, compute_dhash, batch_size, owners=[Gallery])
+
+
+def init_media_assets(app):
+    """
+    Register the media asset backfill commands
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    @app.cli.command('backfill-media-assets')
+    @click.option('--batch-size', default=500, show_default=True, help='Rows per transaction')
+    def backfill_media_assets_command(batch_size):
+        """Record size, dimensions and checksums of uploads stored before media_assets existed"""
+        started = datetime.utcnow()
+        report = backfill_media_assets(batch_size=batch_size)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        print(f"✅ Linked {report['linked']} of {report['scanned']} rows to media assets in {elapsed:.1f}s"
+              f" ({report['missing']} files missing, {report['checksums']} checksums added)")
+
+    @app.cli.command('backfill-blurhash')
+    @click.option('--batch-size', default=500, show_default=True, help='Assets per transaction')
+    def backfill_blurhash_command(batch_size):
+        """Compute placeholders for image assets recorded without one"""
+        started = datetime.utcnow()
+        report = backfill_blurhashes(batch_size=batch_size)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        print(f"✅ Computed {report['updated']} of {report['scanned']} blurhashes in {elapsed:.1f}s")
+
+    @app.cli.command('backfill-phash')
+    @click.option('--batch-size', default=500, show_default=True, help='Assets per transaction')
+    def backfill_phash_command(batch_size):
+        """Compute perceptual hashes for image assets recorded without one"""
+        started = datetime.utcnow()
+        report = backfill_phashes(batch_size=batch_size)
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        print(f"✅ Computed {report['updated']} of {report['scanned']} perceptual hashes in {elapsed:.1f}s")
@@ -0,0 +1,340 @@
+"""
+Media Garbage Collector
+Mark-and-sweep for files in the upload folders that no row references
+(failed uploads, replaced images, deletes that never reached the disk).
+
+Mark:  every referenced path is streamed from the database into a sorted
+       array of 64-bit hashes (8 bytes per reference, whatever the path
+       length). A hash collision can only keep a file, never delete one.
+Sweep: the upload folders are walked with os.scandir in sorted order.
+       Unreferenced files older than the grace period are moved to
+       UPLOAD_FOLDER/.quarantine; quarantined files are deleted once they
+       have sat there for MEDIA_GC_QUARANTINE_SECONDS, or moved back if a
+       row references them again.
+
+Rows of media_assets whose file no row references any more are deleted
+in the same pass.
+
+The walk saves a checkpoint (the last path it handled) every
+CHECKPOINT_EVERY files, so an interrupted run on a large tree resumes
+where it stopped. Entries starting with '.' (in-flight .incoming parts,
+.tmp- files, the quarantine itself) are never touched.
+
+    flask --app app media-gc [--dry-run] [--restart]
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from array import array
+from bisect import bisect_left
+from flask import current_app
+from sqlalchemy import select, delete
+from database import db
+from models.dog import Dog, DogImage
+from models.puppy import Puppy, PuppyImage
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+
+MEDIA_FOLDERS = ('dogs', 'puppies', 'gallery')
+QUARANTINE_FOLDER = '.quarantine'
+CHECKPOINT_FILE = '.media-gc-checkpoint.json'
+CHECKPOINT_EVERY = 1000
+YIELD_PER = 5000
+SORT_CHUNK = 65536
+
+# Columns holding paths relative to UPLOAD_FOLDER
+REFERENCE_COLUMNS = [
+    Dog.primary_image,
+    DogImage.image_path,
+    Puppy.primary_image,
+    PuppyImage.image_path,
+    Gallery.file_path,
+]
+
+# Extra callables yielding referenced relative paths (derived media, ...)
+_reference_sources = []
+
+
+def register_reference_source(source):
+    """
+    Register a callable yielding relative paths that must not be collected
+
+    Args:
+        source: Callable taking no arguments, called inside an app context
+    """
+    if source not in _reference_sources:
+        _reference_sources.append(source)
+
+
+def _normalize(path):
+    path = path.strip().lstrip('/')
+    if path.startswith('uploads/'):
+        path = path[len('uploads/'):]
+    return os.path.normpath(path)
+
+
+def _path_hash(path):
+    return int.from_bytes(hashlib.blake2b(path.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+# ============================================
+# MARK
+# ============================================
+
+class ReferenceSet:
+    """Sorted array of 64-bit path hashes with binary-search membership"""
+
+    def __init__(self, paths):
+        # Sort in chunks and merge: peak memory stays ~16 bytes per path
+        chunks, chunk = [], array('Q')
+        for path in paths:
+            chunk.append(_path_hash(_normalize(path)))
+            if len(chunk) >= SORT_CHUNK:
+                chunks.append(array('Q', sorted(chunk)))
+                chunk = array('Q')
+        chunks.append(array('Q', sorted(chunk)))
+        self._hashes = array('Q', heapq.merge(*chunks))
+
+    def __contains__(self, path):
+        key = _path_hash(_normalize(path))
+        index = bisect_left(self._hashes, key)
+        return index < len(self._hashes) and self._hashes[index] == key
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+def iter_referenced_paths():
+    """Every upload path referenced by the database, streamed in batches"""
+    for column in REFERENCE_COLUMNS:
+        stmt = select(column).where(column.isnot(None), column != '')
+        for path in db.session.execute(stmt.execution_options(yield_per=YIELD_PER)).scalars():
+            if not path.startswith('http'):
+                yield path
+
+    for source in _reference_sources:
+        yield from source()
+
+
+# ============================================
+# SWEEP
+# ============================================
+
+def _walk(root, relative=(), after=None):
+    """
+    Yield (relative path, full path) of the files below root, sorted by
+    path components, skipping dot entries and everything up to and
+    including the component tuple `after`
+    """
+    with os.scandir(os.path.join(root, *relative)) as entries:
+        children = sorted(
+            (entry.name, entry.is_dir(follow_symlinks=False))
+            for entry in entries if not entry.name.startswith('.')
+        )
+
+    for name, is_dir in children:
+        parts = relative + (name,)
+        if is_dir:
+            # Skip whole directories the checkpoint is already past
+            if after and parts < after[:len(parts)]:
+                continue
+            yield from _walk(root, parts, after)
+        elif after is None or parts > after:
+            yield os.path.join(*parts), os.path.join(root, *parts)
+
+
+def _load_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _new_report():
+    return {
+        'scanned': 0,
+        'referenced': 0,
+        'within_grace': 0,
+        'quarantined': 0,
+        'quarantined_bytes': 0,
+        'restored': 0,
+        'purged': 0,
+        'reclaimed_bytes': 0,
+        'assets_pruned': 0,
+    }
+
+
+def _move(source, destination):
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    shutil.move(source, destination)
+
+
+def _sweep_uploads(upload_folder, references, report, checkpoint, checkpoint_path, grace_seconds, dry_run):
+    quarantine = os.path.join(upload_folder, QUARANTINE_FOLDER)
+    cutoff = checkpoint['started_at'] - grace_seconds
+    since_save = 0
+
+    done = MEDIA_FOLDERS.index(checkpoint['folder']) if checkpoint['folder'] else 0
+    for folder in MEDIA_FOLDERS[done:]:
+        root = os.path.join(upload_folder, folder)
+        if not os.path.isdir(root):
+            continue
+
+        last = checkpoint['last_path'] if checkpoint['folder'] == folder else None
+        after = tuple(last.split(os.sep)) if last else None
+        checkpoint['folder'], checkpoint['last_path'] = folder, last
+
+        for relative, full in _walk(root, after=after):
+            path = os.path.join(folder, relative)
+            report['scanned'] += 1
+
+            if path in references:
+                report['referenced'] += 1
+            else:
+                try:
+                    stat = os.stat(full)
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime > cutoff:
+                    # Probably an upload whose row isn't committed yet
+                    report['within_grace'] += 1
+                else:
+                    report['quarantined'] += 1
+                    report['quarantined_bytes'] += stat.st_size
+                    if not dry_run:
+                        destination = os.path.join(quarantine, path)
+                        _move(full, destination)
+                        # The quarantine period starts now
+                        os.utime(destination)
+
+            checkpoint['last_path'] = relative
+            since_save += 1
+            if since_save >= CHECKPOINT_EVERY and not dry_run:
+                checkpoint['report'] = report
+                _save_checkpoint(checkpoint_path, checkpoint)
+                since_save = 0
+
+
+def _purge_quarantine(upload_folder, references, report, quarantine_seconds, dry_run):
+    quarantine = os.path.join(upload_folder, QUARANTINE_FOLDER)
+    if not os.path.isdir(quarantine):
+        return
+
+    cutoff = time.time() - quarantine_seconds
+    for relative, full in _walk(quarantine):
+        original = os.path.join(upload_folder, relative)
+        if relative in references and not os.path.exists(original):
+            # Referenced again (e.g. a restored backup row): put it back
+            report['restored'] += 1
+            if not dry_run:
+                _move(full, original)
+            continue
+
+        try:
+            stat = os.stat(full)
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime <= cutoff:
+            report['purged'] += 1
+            report['reclaimed_bytes'] += stat.st_size
+            if not dry_run:
+                os.remove(full)
+
+    if not dry_run:
+        # Drop directories the purge emptied
+        for dirpath, _, _ in os.walk(quarantine, topdown=False):
+            if dirpath != quarantine and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+
+def _prune_assets(references, report, cutoff, dry_run):
+    """Delete media_assets rows of files no longer referenced"""
+    # Assets newer than the mark may belong to rows it didn't see
+    stmt = select(MediaAsset.id, MediaAsset.file_path).where(
+        MediaAsset.created_at < datetime.utcfromtimestamp(cutoff)
+    )
+    orphans = [
+        asset_id
+        for asset_id, path in db.session.execute(stmt.execution_options(yield_per=YIELD_PER))
+        if path not in references
+    ]
+    report['assets_pruned'] = report.get('assets_pruned', 0) + len(orphans)
+
+    if not dry_run:
+        for start in range(0, len(orphans), CHECKPOINT_EVERY):
+            db.session.execute(delete(MediaAsset).where(MediaAsset.id.in_(orphans[start:start + CHECKPOINT_EVERY])))
+        db.session.commit()
+
+
+def collect_media(dry_run=False, restart=False):
+    """
+    Run one mark-and-sweep pass over the upload folders
+
+    Args:
+        dry_run: Only report what would be quarantined, purged or restored
+        restart: Ignore a checkpoint left by an interrupted run
+
+    Returns:
+        dict: Report with counts and bytes (reclaimed_bytes = bytes deleted
+            from quarantine in this run)
+    """
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    grace_seconds = current_app.config.get('MEDIA_GC_GRACE_SECONDS', 86400)
+    quarantine_seconds = current_app.config.get('MEDIA_GC_QUARANTINE_SECONDS', 7 * 86400)
+    checkpoint_path = os.path.join(upload_folder, CHECKPOINT_FILE)
+
+    checkpoint = None if (restart or dry_run) else _load_checkpoint(checkpoint_path)
+    resumed = checkpoint is not None
+    if checkpoint is None:
+        checkpoint = {'started_at': time.time(), 'folder': None, 'last_path': None, 'report': _new_report()}
+    report = checkpoint['report']
+
+    references = ReferenceSet(iter_referenced_paths())
+    _prune_assets(references, report, checkpoint['started_at'] - grace_seconds, dry_run)
+    db.session.remove()
+
+    _sweep_uploads(upload_folder, references, report, checkpoint, checkpoint_path, grace_seconds, dry_run)
+    _purge_quarantine(upload_folder, references, report, quarantine_seconds, dry_run)
+
+    if os.path.exists(checkpoint_path) and not dry_run:
+        os.remove(checkpoint_path)
+
+    return dict(report, references=len(references), resumed=resumed, dry_run=dry_run)
+
+
+def init_media_gc(app):
+    """
+    Register the media-gc command
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    @app.cli.command('media-gc')
+    @click.option('--dry-run', is_flag=True, help='Report only, move or delete nothing')
+    @click.option('--restart', is_flag=True, help='Ignore the checkpoint of an interrupted run')
+    def media_gc_command(dry_run, restart):
+        """Quarantine unreferenced uploads and purge old quarantined files"""
+        report = collect_media(dry_run=dry_run, restart=restart)
+        prefix = '🔍 Dry run: ' if dry_run else '✅ '
+        print(f"{prefix}scanned {report['scanned']} files ({report['references']} references"
+              f"{', resumed' if report['resumed'] else ''})")
+        print(f"   quarantined {report['quarantined']} files ({report['quarantined_bytes'] / 1048576:.1f} MB), "
+              f"{report['within_grace']} within the grace period")
+        print(f"   purged {report['purged']} files, reclaimed {report['reclaimed_bytes'] / 1048576:.1f} MB, "
+              f"restored {report['restored']}")
+        print(f"   pruned {report['assets_pruned']} media asset rows")
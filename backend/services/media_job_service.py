@@ -0,0 +1,477 @@
+"""
+Media Job Service
+Background processing of gallery videos, queued in media_jobs:
+
+- poster: ffprobe reads duration, resolution and codec of the video,
+  ffmpeg extracts a representative frame as uploads/gallery/<id>/poster.jpg.
+  The poster becomes a media asset of its own (size, blurhash), so grid
+  pages show videos without ever touching their bytes.
+- hls: adaptive streaming renditions (services/hls_service.py, opt-in).
+
+Jobs are queued in the same transaction as the gallery row (a flush hook
+for ORM inserts, enqueue_jobs() for Core inserts) and picked up by a
+worker thread in each app process (MEDIA_JOBS_INLINE_WORKER) or by a
+dedicated process:
+
+    flask --app app media-worker [--once]
+    flask --app app enqueue-video-jobs [--kind hls]   (videos uploaded before)
+
+A job is claimed with a conditional UPDATE, so any number of workers can
+poll the same table. Failed jobs are retried with backoff up to
+MEDIA_JOB_MAX_ATTEMPTS times.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, select, update, insert
+from database import db, RoutingSession
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from models.media_job import MediaJob
+from services.media_asset_service import asset_for_path
+from services.media_gc_service import register_reference_source
+from services.storage_service import localize_file, publish_file
+
+logger = logging.getLogger(__name__)
+
+GALLERY_FOLDER = 'gallery'
+POSTER_MAX_WIDTH = 1920
+
+# Job kind -> handler(job, gallery_item); raises to fail the attempt
+_handlers = {}
+
+# Job kind -> True or config key: queued for every new gallery video
+_upload_kinds = {}
+
+# Job kind -> Gallery attribute mirroring the job's progress
+_status_attrs = {}
+
+# media_jobs.status -> value of the mirrored Gallery attribute
+ITEM_STATUS = {'queued': 'queued', 'running': 'running', 'done': 'ready', 'failed': 'failed'}
+
+
+class MediaJobError(Exception):
+    """A job failed in a way retrying won't fix (e.g. ffmpeg isn't installed)"""
+    pass
+
+
+def register_job_handler(kind, handler, on_video_upload=False, status_attr=None):
+    """
+    Register the function processing jobs of one kind
+
+    Args:
+        kind: Job kind stored in media_jobs.kind
+        handler: Callable(job, gallery_item) run inside an app context;
+            raise to fail the attempt (MediaJobError: don't retry)
+        on_video_upload: Queue this kind for every new gallery video
+            (True, or the name of a boolean config setting)
+        status_attr: Gallery attribute kept at queued/running/ready/failed
+    """
+    _handlers[kind] = handler
+    if on_video_upload:
+        _upload_kinds[kind] = on_video_upload
+    if status_attr:
+        _status_attrs[kind] = status_attr
+
+
+def video_job_kinds():
+    """Job kinds queued for a new gallery video in the current app"""
+    return [
+        kind for kind, enabled in _upload_kinds.items()
+        if enabled is True or current_app.config.get(enabled)
+    ]
+
+
+def derived_folder(item_id):
+    """Relative folder holding the files derived from a gallery item"""
+    return os.path.join(GALLERY_FOLDER, str(item_id))
+
+
+# ============================================
+# QUEUE
+# ============================================
+
+def _set_item_status(item, kind, status):
+    attr = _status_attrs.get(kind)
+    if attr and item is not None:
+        setattr(item, attr, ITEM_STATUS[status])
+
+
+def enqueue_job(session, item, kind):
+    """
+    Queue one job for a gallery item (committed with the session)
+
+    Returns:
+        MediaJob: The queued job
+    """
+    job = MediaJob(gallery=item, kind=kind)
+    session.add(job)
+    _set_item_status(item, kind, 'queued')
+    session.info['media_jobs_queued'] = True
+    return job
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _queue_video_jobs(session, flush_context, instances):
+    for obj in list(session.new):
+        if isinstance(obj, Gallery) and obj.media_type == 'Video':
+            for kind in video_job_kinds():
+                enqueue_job(session, obj, kind)
+
+
+def enqueue_jobs(session, gallery_ids, kinds=None):
+    """
+    Queue jobs for gallery rows inserted without the ORM
+
+    Args:
+        session: SQLAlchemy session of the inserting transaction
+        gallery_ids: Gallery ids
+        kinds: Job kinds (default: video_job_kinds())
+    """
+    gallery_ids = list(gallery_ids)
+    kinds = kinds or video_job_kinds()
+    if not gallery_ids or not kinds:
+        return
+    session.execute(insert(MediaJob), [
+        {'gallery_id': gallery_id, 'kind': kind, 'status': 'queued'}
+        for gallery_id in gallery_ids
+        for kind in kinds
+    ])
+    for kind in kinds:
+        if kind in _status_attrs:
+            session.execute(
+                update(Gallery).where(Gallery.id.in_(gallery_ids))
+                .values({_status_attrs[kind]: ITEM_STATUS['queued']})
+            )
+    session.info['media_jobs_queued'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _wake_worker(session):
+    if session.info.pop('media_jobs_queued', False):
+        _worker.wake()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_queued(session):
+    session.info.pop('media_jobs_queued', None)
+
+
+def _claim_next_job():
+    """Atomically move the oldest runnable job to 'running'; returns its id or None"""
+    now = datetime.utcnow()
+    timeout = current_app.config.get('MEDIA_JOB_TIMEOUT_SECONDS', 3600)
+
+    # Jobs of a worker that died mid-job go back to the queue
+    db.session.execute(
+        update(MediaJob)
+        .where(MediaJob.status == 'running', MediaJob.started_at < now - timedelta(seconds=timeout * 2))
+        .values(status='queued')
+    )
+    db.session.commit()
+
+    candidates = db.session.execute(
+        select(MediaJob.id)
+        .where(MediaJob.status == 'queued', MediaJob.run_after <= now)
+        .order_by(MediaJob.id)
+        .limit(10)
+    ).scalars().all()
+    for job_id in candidates:
+        claimed = db.session.execute(
+            update(MediaJob)
+            .where(MediaJob.id == job_id, MediaJob.status == 'queued')
+            .values(status='running', started_at=now, attempts=MediaJob.attempts + 1)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def _run_job(job_id):
+    job = db.session.get(MediaJob, job_id)
+    item = db.session.get(Gallery, job.gallery_id)
+    max_attempts = current_app.config.get('MEDIA_JOB_MAX_ATTEMPTS', 3)
+
+    if item is not None and job.kind in _status_attrs:
+        _set_item_status(item, job.kind, 'running')
+        db.session.commit()
+
+    try:
+        if item is None:
+            raise MediaJobError('Gallery item no longer exists')
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            raise MediaJobError(f'No handler for job kind {job.kind}')
+        handler(job, item)
+        job.status, job.error = 'done', None
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(MediaJob, job_id)
+        item = db.session.get(Gallery, job.gallery_id)
+        job.error = str(e)[:2000]
+        if isinstance(e, MediaJobError) or job.attempts >= max_attempts:
+            job.status = 'failed'
+            logger.error(f"Media job {job.id} ({job.kind}) failed: {str(e)}")
+        else:
+            # Retry later: 1, 4, 9 ... minutes
+            job.status = 'queued'
+            job.run_after = datetime.utcnow() + timedelta(minutes=job.attempts ** 2)
+            logger.warning(f"Media job {job.id} ({job.kind}) attempt {job.attempts} failed: {str(e)}")
+    _set_item_status(item, job.kind, job.status)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return job.status
+
+
+def run_pending_jobs(limit=None):
+    """
+    Process runnable jobs until the queue is empty (or `limit` jobs ran)
+
+    Returns:
+        dict: Number of jobs per final status
+    """
+    report = {'done': 0, 'failed': 0, 'queued': 0}
+    while limit is None or sum(report.values()) < limit:
+        job_id = _claim_next_job()
+        if job_id is None:
+            break
+        report[_run_job(job_id)] += 1
+    db.session.remove()
+    return report
+
+
+# ============================================
+# WORKER
+# ============================================
+
+class MediaJobWorker:
+    """Thread running queued media jobs in the app process"""
+
+    def __init__(self):
+        self._app = None
+        self._thread = None
+        self._pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, app):
+        # A forked worker process inherits the object but not the thread
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._app = app
+                self._pid = os.getpid()
+                self._wake = threading.Event()
+                self._thread = threading.Thread(target=self._run, name='media-jobs', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        try:
+            app = current_app._get_current_object()
+        except RuntimeError:
+            return
+        if app.config.get('MEDIA_JOBS_INLINE_WORKER', True):
+            self.start(app)
+            self._wake.set()
+
+    def _run(self):
+        poll_seconds = self._app.config.get('MEDIA_JOB_POLL_SECONDS', 30)
+        while True:
+            try:
+                with self._app.app_context():
+                    run_pending_jobs()
+            except Exception as e:
+                logger.error(f"Media job worker error: {str(e)}")
+            self._wake.wait(poll_seconds)
+            self._wake.clear()
+
+
+_worker = MediaJobWorker()
+
+
+# ============================================
+# POSTER FRAMES (ffprobe / ffmpeg)
+# ============================================
+
+def _run_tool(config_key, default, args):
+    binary = current_app.config.get(config_key) or default
+    try:
+        result = subprocess.run(
+            [binary, *args],
+            capture_output=True,
+            timeout=current_app.config.get('MEDIA_JOB_TIMEOUT_SECONDS', 3600),
+        )
+    except FileNotFoundError:
+        raise MediaJobError(f'{binary} is not installed')
+    if result.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(binary)} failed: {result.stderr.decode('utf-8', 'replace')[-500:]}")
+    return result.stdout
+
+
+def run_ffmpeg(args):
+    """Run FFMPEG_BINARY with args; raises on failure or timeout"""
+    return _run_tool('FFMPEG_BINARY', 'ffmpeg', args)
+
+
+def ffprobe(full_path):
+    """Format and streams of a media file, as reported by ffprobe -print_format json"""
+    return json.loads(_run_tool('FFPROBE_BINARY', 'ffprobe', [
+        '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', full_path
+    ]))
+
+
+def probe_video(full_path, info=None):
+    """
+    Duration, displayed resolution and codec of a video via ffprobe
+
+    Args:
+        full_path: Video file
+        info: ffprobe() output, when already at hand
+
+    Returns:
+        dict: {'duration_seconds', 'width', 'height', 'codec'}
+    """
+    info = info or ffprobe(full_path)
+    stream = next((s for s in info.get('streams', []) if s.get('codec_type') == 'video'), None)
+    if stream is None:
+        raise MediaJobError('File has no video stream')
+
+    width, height = stream.get('width'), stream.get('height')
+    rotation = stream.get('tags', {}).get('rotate')
+    for side_data in stream.get('side_data_list', []):
+        rotation = side_data.get('rotation', rotation)
+    if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+        width, height = height, width
+
+    duration = info.get('format', {}).get('duration') or stream.get('duration')
+    return {
+        'duration_seconds': round(float(duration), 3) if duration else None,
+        'width': width,
+        'height': height,
+        'codec': stream.get('codec_name'),
+    }
+
+
+def extract_poster(full_path, poster_path, duration=None):
+    """
+    Write a representative frame of a video as a JPEG (at most
+    POSTER_MAX_WIDTH wide), atomically
+
+    Args:
+        full_path: Video file
+        poster_path: Destination .jpg
+        duration: Video length in seconds, to skip black lead-in frames
+    """
+    offset = min(1.0, duration / 10) if duration else 0
+    os.makedirs(os.path.dirname(poster_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(poster_path), prefix='.tmp-', suffix='.jpg')
+    os.close(fd)
+    try:
+        run_ffmpeg([
+            '-y', '-v', 'error', '-ss', f'{offset:.3f}', '-i', full_path,
+            # thumbnail: most representative of the next 50 frames
+            '-vf', f"thumbnail=50,scale='min({POSTER_MAX_WIDTH},iw)':-2",
+            '-frames:v', '1', '-q:v', '3', tmp_path
+        ])
+        if os.path.getsize(tmp_path) == 0:
+            raise RuntimeError('ffmpeg produced no frame')
+        os.replace(tmp_path, poster_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _poster_job(job, item):
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    source_path = localize_file(item.file_path)
+    if source_path is None:
+        raise MediaJobError('Video file is missing')
+    video = probe_video(source_path)
+
+    poster_path = os.path.join(derived_folder(item.id), 'poster.jpg')
+    extract_poster(source_path, os.path.join(upload_folder, poster_path), video['duration_seconds'])
+    publish_file(poster_path, 'image/jpeg')
+
+    if item.asset is None:
+        item.asset = asset_for_path(db.session, item.file_path)
+    if item.asset is not None:
+        for key, value in video.items():
+            setattr(item.asset, key, value)
+
+    poster = asset_for_path(db.session, poster_path)
+    item.poster_asset = poster
+    if item.asset is not None and poster is not None:
+        # The poster's placeholder stands in for the video's
+        item.asset.blurhash = poster.blurhash
+    # Item changes: new change_seq for sync clients, cache invalidation
+    db.session.flush()
+
+
+register_job_handler('poster', _poster_job, on_video_upload=True)
+
+
+def _poster_paths():
+    stmt = select(MediaAsset.file_path).join(Gallery, Gallery.poster_asset_id == MediaAsset.id)
+    yield from db.session.execute(stmt).scalars()
+
+
+def enqueue_missing_video_jobs(kind='poster'):
+    """
+    Queue `kind` jobs for gallery videos that never had one
+
+    Returns:
+        int: Number of jobs queued
+    """
+    has_job = select(MediaJob.id).where(MediaJob.gallery_id == Gallery.id, MediaJob.kind == kind).exists()
+    ids = db.session.execute(
+        select(Gallery.id).where(Gallery.media_type == 'Video', ~has_job)
+    ).scalars().all()
+    enqueue_jobs(db.session, ids, [kind])
+    db.session.commit()
+    return len(ids)
+
+
+def init_media_jobs(app):
+    """
+    Register the media worker commands, the poster files with the media
+    garbage collector, and start the in-process worker on first request
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    register_reference_source(_poster_paths)
+
+    if app.config.get('MEDIA_JOBS_INLINE_WORKER', True):
+        @app.before_request
+        def start_media_worker():
+            # Picks up jobs left queued by a previous run
+            _worker.start(app)
+
+    @app.cli.command('media-worker')
+    @click.option('--once', is_flag=True, help='Process the queue once and exit')
+    def media_worker_command(once):
+        """Run queued media jobs (video posters, ...)"""
+        if once:
+            report = run_pending_jobs()
+            print(f"✅ Media jobs: {report['done']} done, {report['failed']} failed, {report['queued']} to retry")
+            return
+        poll_seconds = app.config.get('MEDIA_JOB_POLL_SECONDS', 30)
+        print(f"✅ Media worker polling every {poll_seconds}s")
+        while True:
+            run_pending_jobs()
+            threading.Event().wait(poll_seconds)
+
+    @app.cli.command('enqueue-video-jobs')
+    @click.option('--kind', default='poster', show_default=True, help='Job kind to queue')
+    def enqueue_video_jobs_command(kind):
+        """Queue jobs for gallery videos uploaded before the job existed"""
+        count = enqueue_missing_video_jobs(kind)
+        print(f"✅ Queued {count} {kind} jobs")
@@ -0,0 +1,129 @@
+"""
+Media URL Service
+The public URL of every stored upload, built in one place:
+
+- Host: MEDIA_CDN_HOSTS (comma-separated base URLs) when set. A path always
+  maps to the same host (md5 of the path modulo the host count), so no file
+  is cached twice. Without CDN hosts: the storage bucket's public URL, or
+  MEDIA_BASE_URL (this app's /uploads).
+- Version: with MEDIA_URL_VERSIONING, URLs of files whose media asset has
+  a checksum end in ?v=<first 8 hex digits of its SHA-256>. A replaced
+  file gets a new URL (even at the same path, with the same size), so
+  /uploads can answer versioned requests with immutable caching
+  (MEDIA_IMMUTABLE_MAX_AGE). Assets recorded before checksums were get
+  unversioned URLs until `flask backfill-media-assets` hashes them.
+
+services/sql_json_service.py builds the same URLs in SQL: keep both in sync.
+"""
+
+import hashlib
+from flask import current_app, has_app_context
+
+DEFAULT_BASE_URL = 'http://localhost:5002/uploads/'
+
+VERSION_LENGTH = 8
+
+
+def _base(url):
+    return url.rstrip('/') + '/'
+
+
+def asset_version(asset):
+    """Short content version of a MediaAsset, None until its checksum is known"""
+    return asset.sha256[:VERSION_LENGTH] if asset.sha256 else None
+
+
+def shard_index(path, count):
+    """Host index of a path among `count` hosts"""
+    return int(hashlib.md5(path.encode('utf-8')).hexdigest()[:8], 16) % count
+
+
+class MediaUrlBuilder:
+    """Turns stored relative paths into public URLs"""
+
+    def __init__(self, base_urls, versioning=True):
+        self.base_urls = tuple(_base(url) for url in base_urls)
+        self.versioning = versioning
+
+    def url(self, path, asset=None):
+        """
+        Public URL of a stored file
+
+        Args:
+            path: Path relative to the upload root (full URLs pass through)
+            asset: The file's MediaAsset, for the version parameter
+
+        Returns:
+            str: URL, or None without a path
+        """
+        if not path:
+            return None
+        if path.startswith('http'):
+            return path
+
+        clean_path = path.lstrip('/')
+        if len(self.base_urls) == 1:
+            base = self.base_urls[0]
+        else:
+            base = self.base_urls[shard_index(clean_path, len(self.base_urls))]
+
+        url = base + clean_path
+        version = asset_version(asset) if self.versioning and asset is not None else None
+        if version:
+            url += '?v=' + version
+        return url
+
+
+_default_builder = MediaUrlBuilder([DEFAULT_BASE_URL])
+
+
+def get_media_url_builder():
+    """The current app's builder (the development default outside an app)"""
+    if not has_app_context():
+        return _default_builder
+    return current_app.extensions.get('media_urls', _default_builder)
+
+
+def media_url(path, asset=None):
+    """Public URL of a stored file, see MediaUrlBuilder.url()"""
+    return get_media_url_builder().url(path, asset)
+
+
+class MediaUrlMixin:
+    """
+    Model mixin: media URLs computed once per row and path, however often
+    the row is serialized
+    """
+
+    def media_url(self, path, asset=None):
+        cache = self.__dict__.get('_media_urls')
+        if cache is None:
+            cache = self.__dict__['_media_urls'] = {}
+
+        key = (path, asset.sha256) if asset is not None else (path,)
+        url = cache.get(key)
+        if url is None:
+            url = cache[key] = media_url(path, asset)
+        return url
+
+    # Names the models and GraphQL resolvers have always used
+    get_image_url = media_url
+    get_media_url = media_url
+
+
+def init_media_urls(app):
+    """
+    Create the URL builder of the app from its config (after init_storage)
+
+    Args:
+        app: Flask application
+    """
+    hosts = [host.strip() for host in app.config.get('MEDIA_CDN_HOSTS', '').split(',') if host.strip()]
+    if not hosts:
+        storage = app.extensions.get('storage')
+        public_base = getattr(storage, 'public_base', None)
+        hosts = [public_base or app.config.get('MEDIA_BASE_URL') or DEFAULT_BASE_URL]
+
+    builder = MediaUrlBuilder(hosts, app.config.get('MEDIA_URL_VERSIONING', True))
+    app.extensions['media_urls'] = builder
+    return builder
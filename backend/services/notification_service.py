@@ -0,0 +1,166 @@
+"""
+Notification Service
+Live admin notifications delivered as Server-Sent Events:
+  - booking.created / booking.updated
+  - puppy.status_changed
+Events are published after commit on the event bus, so every worker's
+broker sees them, and kept in a replay buffer for Last-Event-ID resume
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from flask import current_app
+from services.change_service import register_commit_listener
+
+
+class Subscriber:
+    """One connected stream with a bounded buffer of undelivered events"""
+
+    def __init__(self, max_buffer):
+        self.events = queue.Queue(maxsize=max_buffer)
+        self.overflowed = False
+
+    def offer(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            # Slow client: drop the connection, it resumes from the replay buffer
+            self.overflowed = True
+
+    def next_event(self, timeout):
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """Fans events out to subscribers and keeps recent events for resume"""
+
+    def __init__(self, replay_size=500, client_buffer=100):
+        self.client_buffer = client_buffer
+        self._replay = deque(maxlen=replay_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        with self._lock:
+            self._replay.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(event)
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a new stream, pre-filled with events missed since last_event_id
+
+        Args:
+            last_event_id: Value of the Last-Event-ID header, if resuming
+
+        Returns:
+            Subscriber
+        """
+        subscriber = Subscriber(self.client_buffer)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._replay:
+                    if event['id'] > last_event_id:
+                        subscriber.offer(event)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def connection_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+# Event ids are publish-time nanoseconds plus a per-process counter, so they
+# order consistently across workers and resumes work on any worker
+_id_lock = threading.Lock()
+_last_id = 0
+
+
+def _next_event_id():
+    global _last_id
+    with _id_lock:
+        _last_id = max(_last_id + 1, time.time_ns())
+        return _last_id
+
+
+def notifications_for_changes(changes):
+    """
+    Translate committed changes into admin notification events
+
+    Args:
+        changes: Change dicts from change_service
+
+    Returns:
+        list: Event dicts {'id', 'type', 'data'}
+    """
+    events = []
+
+    for change in changes:
+        entity, op = change['entity'], change['op']
+        data = dict(change.get('values', {}), id=change['id'])
+
+        if entity == 'booking' and op in ('created', 'updated'):
+            if op == 'updated':
+                data['changed'] = change.get('changed', [])
+            events.append({'type': f'booking.{op}', 'data': data})
+
+        elif entity == 'puppy' and op == 'updated' and 'status' in change.get('changed', []):
+            events.append({'type': 'puppy.status_changed', 'data': data})
+
+    for event in events:
+        event['id'] = _next_event_id()
+
+    return events
+
+
+def format_sse(event):
+    """Serialize an event in text/event-stream format"""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event['data'], default=str)}\n\n"
+    )
+
+
+def init_notifications(app, bus):
+    """
+    Create the notification broker for the app
+
+    Args:
+        app: Flask application
+        bus: Event bus carrying notifications between workers
+    """
+    broker = EventBroker(
+        replay_size=app.config.get('SSE_REPLAY_BUFFER', 500),
+        client_buffer=app.config.get('SSE_CLIENT_BUFFER', 100)
+    )
+
+    def receive(event):
+        for notification in event.get('notifications', []):
+            broker.publish(notification)
+
+    def publish_notifications(changes):
+        notifications = notifications_for_changes(changes)
+        if notifications:
+            bus.publish({'notifications': notifications})
+
+    bus.subscribe(receive)
+    register_commit_listener(app, publish_notifications)
+
+    app.extensions['notification_broker'] = broker
+
+
+def get_broker():
+    """Get the notification broker of the current app"""
+    return current_app.extensions.get('notification_broker')
@@ -0,0 +1,142 @@
+"""
+Connection Pool Service
+Instruments SQLAlchemy connection pools and reports live statistics
+"""
+
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+
+
+# Number of recent checkout wait samples kept per engine for percentiles
+WAIT_SAMPLE_SIZE = 500
+
+
+class PoolMetrics:
+    """Checkout wait times and connection ages for one engine's pool"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.connected_at = {}  # id(connection record) -> monotonic connect time
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self.recent_waits.append(seconds)
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            waits = sorted(self.recent_waits)
+            ages = [now - connected for connected in self.connected_at.values()]
+            checkouts = self.checkouts
+            total_wait = self.total_wait
+            max_wait = self.max_wait
+            connects = self.connects
+            invalidations = self.invalidations
+
+        return {
+            'checkouts': checkouts,
+            'connects': connects,
+            'invalidations': invalidations,
+            'wait_ms': {
+                'avg': round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                'p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else 0.0,
+                'max': round(max_wait * 1000, 3),
+            },
+            'connection_age_seconds': {
+                'open': len(ages),
+                'avg': round(sum(ages) / len(ages), 1) if ages else 0.0,
+                'oldest': round(max(ages), 1) if ages else 0.0,
+            },
+        }
+
+
+# Engine name -> (engine, PoolMetrics)
+_instrumented = {}
+
+
+def instrument_engine(name, engine):
+    """
+    Attach pool event listeners and checkout timing to an engine
+
+    Args:
+        name: Label used in reports ('primary', 'replica_0', ...)
+        engine: SQLAlchemy Engine
+    """
+    if name in _instrumented and _instrumented[name][0] is engine:
+        return
+
+    metrics = PoolMetrics()
+    pool = engine.pool
+
+    @event.listens_for(pool, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        with metrics.lock:
+            metrics.connects += 1
+            metrics.connected_at[id(connection_record)] = time.monotonic()
+
+    @event.listens_for(pool, 'close')
+    def on_close(dbapi_connection, connection_record):
+        with metrics.lock:
+            metrics.connected_at.pop(id(connection_record), None)
+
+    @event.listens_for(pool, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with metrics.lock:
+            metrics.invalidations += 1
+            metrics.connected_at.pop(id(connection_record), None)
+
+    # Time Pool.connect() so waits for a free connection (and new connects) show up
+    pool_connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return pool_connect()
+        finally:
+            metrics.record_wait(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+    _instrumented[name] = (engine, metrics)
+
+
+def init_pool_instrumentation(app, db):
+    """Instrument the primary and every bind engine of the app"""
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            instrument_engine(bind_key or 'primary', engine)
+
+
+def get_pool_stats():
+    """
+    Get live statistics for every instrumented pool
+
+    Returns:
+        dict: Engine name -> pool statistics
+    """
+    stats = {}
+
+    for name, (engine, metrics) in _instrumented.items():
+        pool = engine.pool
+        data = {
+            'pool_class': type(pool).__name__,
+            'size': pool.size() if hasattr(pool, 'size') else None,
+            'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+            'checked_in': pool.checkedin() if hasattr(pool, 'checkedin') else None,
+            'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+        }
+        data.update(metrics.snapshot())
+        stats[name] = data
+
+    return stats
@@ -0,0 +1,69 @@
+"""
+Process Pool Service
+The app's pool of worker processes for CPU-bound media work (bulk
+upload processing, media backfills). BULK_UPLOAD_WORKERS sets its size,
+0 means one worker per CPU.
+
+Workers are started with forkserver (or spawn), never plain fork:
+forking a threaded server process can copy locks held by other threads.
+Functions submitted to the pool must be importable and must not need an
+application context.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from PIL import Image
+
+_pool_lock = threading.Lock()
+
+
+def _init_worker(max_pixels):
+    # Pillow's own bomb check, as set by init_image_transforms() in the app
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+def get_process_pool():
+    """Process pool of the current app, created on first use"""
+    app = current_app._get_current_object()
+    with _pool_lock:
+        pool = app.extensions.get('process_pool')
+        if pool is None:
+            workers = app.config.get('BULK_UPLOAD_WORKERS') or os.cpu_count() or 1
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(app.config.get('IMAGE_MAX_PIXELS'),)
+            )
+            app.extensions['process_pool'] = pool
+        return pool
+
+
+def reset_process_pool():
+    """Drop a broken pool (e.g. a worker was OOM-killed); the next call starts a fresh one"""
+    app = current_app._get_current_object()
+    with _pool_lock:
+        pool = app.extensions.pop('process_pool', None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_map(fn, items):
+    """
+    Run fn over items in the process pool, in chunks big enough to keep
+    the per-task overhead low
+
+    Returns:
+        list: Results in the order of items
+    """
+    items = list(items)
+    if not items:
+        return []
+    pool = get_process_pool()
+    workers = current_app.config.get('BULK_UPLOAD_WORKERS') or os.cpu_count() or 1
+    return list(pool.map(fn, items, chunksize=max(1, len(items) // (workers * 4))))
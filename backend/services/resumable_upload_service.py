@@ -0,0 +1,404 @@
+"""
+Resumable Upload Service
+Server side of the tus 1.0 protocol (core + creation, expiration,
+checksum and termination extensions) for large gallery videos.
+See docs/resumable-uploads.md for the client side.
+
+Each upload lives in RESUMABLE_UPLOAD_FOLDER (outside the public
+/uploads tree) as three files:
+    <id>.json   state: length, offset, metadata, expiry, result
+    <id>.part   bytes received so far
+    <id>.lock   flock()ed by the request working on the upload
+Chunks are streamed straight to the .part file, so a PATCH never holds
+more than one read buffer in memory. When the last byte arrives the file
+is handed to the normal gallery creation path.
+"""
+
+import base64
+import binascii
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from flask import current_app
+from services.file_service import store_local_file
+from services.gallery_service import media_type_for, add_gallery_item
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = ('creation', 'expiration', 'checksum', 'termination')
+CHECKSUM_ALGORITHMS = ('sha1', 'sha256', 'md5')
+
+# Upload-Metadata keys passed on to the gallery item
+GALLERY_METADATA = ('title', 'description', 'category', 'display_order', 'is_active')
+
+READ_BUFFER = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Protocol error carrying the HTTP status to respond with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================
+# STATE
+# ============================================
+
+def _folder():
+    return current_app.config['RESUMABLE_UPLOAD_FOLDER']
+
+
+def _paths(upload_id):
+    # ids are generated by us: anything else can't name a file in the folder
+    try:
+        upload_id = uuid.UUID(hex=upload_id).hex
+    except ValueError:
+        raise UploadError('Upload not found', 404)
+    base = os.path.join(_folder(), upload_id)
+    return base + '.json', base + '.part'
+
+
+def _lock_path(upload_id):
+    # Never replaced, unlike the state file: a lock on it holds for the whole request
+    return os.path.splitext(_paths(upload_id)[0])[0] + '.lock'
+
+
+def _write_state(state_path, state):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(state_path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _remove(upload_id):
+    for path in (*_paths(upload_id), _lock_path(upload_id)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _expiry():
+    return time.time() + current_app.config.get('RESUMABLE_UPLOAD_EXPIRY_SECONDS', 86400)
+
+
+def _remove_expired(upload_id):
+    """
+    Remove an upload past its expiry unless a request holds its lock; a
+    PATCH still streaming refreshes the expiry when it's done
+
+    Returns:
+        bool: Whether the upload was removed
+    """
+    state_path, _ = _paths(upload_id)
+    lock_path = _lock_path(upload_id)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        try:
+            with open(state_path) as f:
+                expires_at = json.load(f)['expires_at']
+        except FileNotFoundError:
+            # Removed by the request that held the lock before us
+            if os.path.exists(lock_path):
+                os.remove(lock_path)
+            return False
+        if expires_at >= time.time():
+            return False
+        _remove(upload_id)
+        return True
+    finally:
+        os.close(fd)
+
+
+def get_upload(upload_id):
+    """
+    Load an upload's state
+
+    Raises:
+        UploadError: 404 for unknown ids, 410 for expired uploads
+    """
+    state_path, _ = _paths(upload_id)
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        raise UploadError('Upload not found', 404)
+
+    if state['gallery_id'] is None and state['expires_at'] < time.time():
+        # Left to the cleanup when the caller holds the lock itself
+        _remove_expired(upload_id)
+        raise UploadError('Upload expired', 410)
+    return state
+
+
+@contextmanager
+def _locked(upload_id):
+    """
+    Exclusive lock on an upload across worker processes; a second PATCH
+    while one is still streaming or finalizing gets 409 instead of
+    interleaving bytes or creating a second gallery item
+    """
+    state_path, _ = _paths(upload_id)
+    lock_path = _lock_path(upload_id)
+    if not os.path.exists(state_path):
+        raise UploadError('Upload not found', 404)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('Upload is locked by another request', 409)
+        if not os.path.exists(state_path):
+            # Removed by the request that held the lock before us
+            if os.path.exists(lock_path):
+                os.remove(lock_path)
+            raise UploadError('Upload not found', 404)
+        yield
+    finally:
+        os.close(fd)
+
+
+# ============================================
+# PROTOCOL
+# ============================================
+
+def parse_metadata(header):
+    """
+    Decode an Upload-Metadata header ("key base64value,key2 base64value2")
+
+    Returns:
+        dict: Decoded values (keys without a value map to '')
+    """
+    metadata = {}
+    for pair in (header or '').split(','):
+        pair = pair.strip()
+        if not pair:
+            continue
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode('utf-8') if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise UploadError(f'Invalid Upload-Metadata value for {key}')
+    return metadata
+
+
+def parse_checksum(header):
+    """
+    Parse an Upload-Checksum header ("sha1 base64digest")
+
+    Returns:
+        tuple: (hashlib object, expected digest bytes) or None without a header
+    """
+    if not header:
+        return None
+    algorithm, _, value = header.strip().partition(' ')
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise UploadError(f'Unsupported checksum algorithm: {algorithm}')
+    try:
+        expected = base64.b64decode(value, validate=True)
+    except binascii.Error:
+        raise UploadError('Invalid Upload-Checksum value')
+    return hashlib.new(algorithm), expected
+
+
+def create_upload(length, metadata):
+    """
+    Start a resumable gallery upload
+
+    Args:
+        length: Total size in bytes (Upload-Length)
+        metadata: Decoded Upload-Metadata; 'filename' is required
+
+    Returns:
+        dict: Upload state
+    """
+    max_size = current_app.config.get('RESUMABLE_UPLOAD_MAX_SIZE')
+    if length <= 0:
+        raise UploadError('Upload-Length must be positive')
+    if max_size and length > max_size:
+        raise UploadError(f'Upload exceeds the maximum size of {max_size} bytes', 413)
+
+    filename = metadata.get('filename')
+    if not filename:
+        raise UploadError('Upload-Metadata must include a filename')
+    if media_type_for(filename) is None:
+        raise UploadError('Invalid file type. Must be image or video')
+
+    os.makedirs(_folder(), exist_ok=True)
+    cleanup_expired_uploads()
+
+    upload_id = uuid.uuid4().hex
+    state_path, part_path = _paths(upload_id)
+    state = {
+        'id': upload_id,
+        'length': length,
+        'offset': 0,
+        'metadata': metadata,
+        'created_at': time.time(),
+        'expires_at': _expiry(),
+        'gallery_id': None,
+    }
+    open(part_path, 'wb').close()
+    open(_lock_path(upload_id), 'wb').close()
+    _write_state(state_path, state)
+    return state
+
+
+def append_chunk(upload_id, offset, stream, checksum=None):
+    """
+    Append one PATCH body to an upload, then finalize it when complete
+
+    Bytes of an interrupted chunk are kept (the client resumes from the
+    new offset) unless the chunk carried a checksum, which can only be
+    verified on the whole chunk - then it's discarded. Every PATCH moves
+    the upload's expiry out again.
+
+    Args:
+        upload_id: Upload id
+        offset: Upload-Offset sent by the client
+        stream: Request body stream
+        checksum: Result of parse_checksum() or None
+
+    Returns:
+        dict: Upload state after the chunk
+    """
+    state_path, part_path = _paths(upload_id)
+
+    with _locked(upload_id):
+        state = get_upload(upload_id)
+        if offset != state['offset']:
+            raise UploadError(f"Upload-Offset mismatch: server is at {state['offset']}", 409)
+        if state['gallery_id'] is not None:
+            # Retried final chunk: the upload is already finished
+            return state
+
+        remaining = state['length'] - offset
+        received = 0
+        digest, expected = checksum if checksum else (None, None)
+        error = None
+
+        with open(part_path, 'r+b') as f:
+            f.seek(offset)
+            try:
+                while True:
+                    data = stream.read(min(READ_BUFFER, remaining - received + 1))
+                    if not data:
+                        break
+                    if received + len(data) > remaining:
+                        error = UploadError('Chunk exceeds Upload-Length', 413)
+                        break
+                    f.write(data)
+                    received += len(data)
+                    if digest:
+                        digest.update(data)
+            except Exception as e:
+                # Client went away mid-chunk
+                logger.info(f"Upload {upload_id} interrupted after {received} bytes: {str(e)}")
+                error = UploadError('Chunk was interrupted', 400)
+
+            if error is None and digest is not None and digest.digest() != expected:
+                error = UploadError('Checksum mismatch', 460)
+
+            if error is not None and (digest is not None or error.status == 413):
+                received = 0
+            f.truncate(offset + received)
+
+        # An upload still receiving chunks isn't abandoned
+        state['offset'] = offset + received
+        state['expires_at'] = _expiry()
+        _write_state(state_path, state)
+        if error is not None:
+            raise error
+
+        if state['offset'] == state['length'] and state['gallery_id'] is None:
+            state = _finalize(state)
+    return state
+
+
+def _finalize(state):
+    """Move the assembled file into uploads/gallery and create its gallery item"""
+    state_path, part_path = _paths(state['id'])
+    metadata = state['metadata']
+
+    success, result = store_local_file(part_path, metadata['filename'], 'gallery')
+    if not success:
+        _remove(state['id'])
+        raise UploadError(f'File upload failed: {result}', 400)
+
+    data = {key: metadata[key] for key in GALLERY_METADATA if key in metadata}
+    try:
+        item = add_gallery_item(result, media_type_for(metadata['filename']), data)
+    except Exception as e:
+        _remove(state['id'])
+        raise UploadError(f'Error creating gallery item: {str(e)}', 500)
+
+    # Keep the state (without bytes) so a client retrying the last PATCH
+    # or asking for the result still gets an answer until it expires
+    state['gallery_id'] = item.id
+    state['expires_at'] = _expiry()
+    _write_state(state_path, state)
+    return state
+
+
+def terminate_upload(upload_id):
+    """Abort an upload and delete what was received"""
+    with _locked(upload_id):
+        get_upload(upload_id)
+        _remove(upload_id)
+
+
+def cleanup_expired_uploads():
+    """
+    Delete abandoned uploads and finished upload records past their
+    expiry; uploads locked by a request in progress are skipped
+
+    Returns:
+        int: Number of uploads removed
+    """
+    folder = _folder()
+    if not os.path.isdir(folder):
+        return 0
+
+    removed = 0
+    now = time.time()
+    for name in os.listdir(folder):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(folder, name)) as f:
+                expires_at = json.load(f)['expires_at']
+        except (OSError, ValueError, KeyError):
+            continue
+        if expires_at < now and _remove_expired(name[:-len('.json')]):
+            removed += 1
+    return removed
+
+
+def init_resumable_uploads(app):
+    """
+    Register the upload cleanup command
+
+    Args:
+        app: Flask application
+    """
+    @app.cli.command('cleanup-uploads')
+    def cleanup_uploads_command():
+        """Delete expired resumable uploads"""
+        removed = cleanup_expired_uploads()
+        print(f"✅ Removed {removed} expired uploads from {app.config['RESUMABLE_UPLOAD_FOLDER']}")
@@ -0,0 +1,233 @@
+"""
+Serializer Service
+Compact v2 serialization: sparse fieldsets that become column-level
+load_only() in SQL, related parents returned once in an 'included' map,
+and media as relative keys resolved against a single base URL
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy.orm import Load
+from models.dog import Dog, DogImage
+from models.puppy import Puppy, PuppyImage
+from models.gallery import Gallery
+
+
+# Resource type -> model, public fields, media fields and default fields
+RESOURCES = {
+    'dogs': {
+        'model': Dog,
+        'fields': (
+            'name', 'gender', 'role', 'date_of_birth', 'registration_number',
+            'pedigree_info', 'description', 'health_clearances', 'achievements',
+            'primary_image', 'is_active', 'created_at', 'updated_at',
+        ),
+        'media': ('primary_image',),
+    },
+    'puppies': {
+        'model': Puppy,
+        'fields': (
+            'name', 'gender', 'date_of_birth', 'color', 'weight_kg',
+            'microchip_number', 'price_inr', 'status', 'description',
+            'personality_traits', 'health_notes', 'primary_image', 'is_featured',
+            'created_at', 'updated_at', 'sold_at', 'sire_id', 'dam_id',
+        ),
+        'media': ('primary_image',),
+    },
+    'gallery': {
+        'model': Gallery,
+        'fields': (
+            'title', 'description', 'media_type', 'file_path', 'category',
+            'display_order', 'uploaded_at',
+        ),
+        'media': ('file_path',),
+    },
+    'images': {
+        'fields': ('image_path', 'caption', 'display_order', 'uploaded_at'),
+        'media': ('image_path',),
+    },
+}
+
+# Relations each resource type may include: name -> (kind, target type)
+RELATIONS = {
+    'puppies': {'sire': 'dogs', 'dam': 'dogs', 'images': 'images'},
+    'dogs': {'images': 'images'},
+    'gallery': {},
+}
+
+# Numeric columns the v1 to_dict() renders as floats (None when zero)
+FLOAT_FIELDS = {'weight_kg', 'price_inr'}
+
+
+class ProjectionError(ValueError):
+    """Raised for unknown fields or includes in a v2 request"""
+    pass
+
+
+def media_base_url():
+    """Base URL every relative media key in a v2 response is resolved against"""
+    return current_app.config['MEDIA_BASE_URL'].rstrip('/') + '/'
+
+
+def parse_projection(resource, args):
+    """
+    Parse fields=, fields[<type>]= and include= query parameters
+
+    Args:
+        resource: Primary resource type ('dogs', 'puppies', 'gallery')
+        args: request.args
+
+    Returns:
+        tuple: (fields by resource type, set of includes)
+    """
+    includes = {name for name in args.get('include', '').split(',') if name}
+    unknown = includes - set(RELATIONS[resource])
+    if unknown:
+        raise ProjectionError(f"Unknown include: {', '.join(sorted(unknown))}")
+
+    fields = {}
+    for type_name, spec in RESOURCES.items():
+        raw = args.get(f'fields[{type_name}]')
+        if type_name == resource and raw is None:
+            raw = args.get('fields')
+        if raw is None:
+            fields[type_name] = spec['fields']
+            continue
+
+        requested = tuple(name for name in raw.split(',') if name)
+        bad = set(requested) - set(spec['fields'])
+        if bad:
+            raise ProjectionError(f"Unknown {type_name} fields: {', '.join(sorted(bad))}")
+        fields[type_name] = requested
+
+    return fields, includes
+
+
+def load_only_for(model, fields, extra=()):
+    """
+    Query option loading only the requested columns (plus id and extras).
+    Relationships are left to lazy loading: v2 fields never read them, and
+    the models' lazy='joined' media assets would otherwise be joined (with
+    every asset column) into each sparse query.
+    """
+    columns = [getattr(model, name) for name in ('id', *fields, *extra) if hasattr(model, name)]
+    return Load(model).load_only(*dict.fromkeys(columns)).lazyload('*')
+
+
+def _value(name, value, media_fields):
+    if value is None:
+        return None
+    if name in media_fields:
+        # Relative media key; external URLs pass through unchanged
+        return value if value.startswith('http') else value.lstrip('/')
+    if name in FLOAT_FIELDS:
+        return float(value) if value else None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def serialize(obj, resource, fields):
+    """
+    Serialize one row with only the requested fields
+
+    Args:
+        obj: Model instance
+        resource: Resource type of the row
+        fields: Field names to include
+
+    Returns:
+        dict
+    """
+    media_fields = RESOURCES[resource]['media']
+    data = {'id': obj.id}
+    for name in fields:
+        data[name] = _value(name, getattr(obj, name), media_fields)
+    if resource == 'gallery' and 'media_type' in data:
+        data['media_type'] = data['media_type'].lower() if data['media_type'] else 'image'
+    return data
+
+
+def _images_by_owner(image_model, owner_column, owner_ids, fields):
+    """Load images for many owners with one IN query"""
+    grouped = {owner_id: [] for owner_id in owner_ids}
+    if not owner_ids:
+        return grouped
+
+    images = (
+        image_model.query
+        .options(load_only_for(image_model, fields, extra=(owner_column,)))
+        .filter(getattr(image_model, owner_column).in_(owner_ids))
+        .order_by(image_model.display_order, image_model.id)
+        .all()
+    )
+    for image in images:
+        grouped[getattr(image, owner_column)].append(serialize(image, 'images', fields))
+    return grouped
+
+
+def build_document(resource, rows, fields, includes):
+    """
+    Build a v2 response document
+
+    Args:
+        resource: Primary resource type
+        rows: Model instances loaded with load_only_for()
+        fields: Fields by resource type (from parse_projection)
+        includes: Relations to include
+
+    Returns:
+        dict: {'data': [...], 'included': {...}, 'meta': {...}}
+    """
+    primary_fields = fields[resource]
+    data = [serialize(row, resource, primary_fields) for row in rows]
+    ids = [row.id for row in rows]
+    included = {}
+
+    if 'images' in includes:
+        if resource == 'puppies':
+            images = _images_by_owner(PuppyImage, 'puppy_id', ids, fields['images'])
+        else:
+            images = _images_by_owner(DogImage, 'dog_id', ids, fields['images'])
+        for item in data:
+            item['images'] = images[item['id']]
+
+    parent_refs = [name for name in ('sire', 'dam') if name in includes]
+    if parent_refs:
+        parent_ids = set()
+        for row, item in zip(rows, data):
+            for name in parent_refs:
+                parent_id = getattr(row, f'{name}_id')
+                item[f'{name}_id'] = parent_id
+                if parent_id is not None:
+                    parent_ids.add(parent_id)
+
+        parents = []
+        if parent_ids:
+            parents = (
+                Dog.query
+                .options(load_only_for(Dog, fields['dogs']))
+                .filter(Dog.id.in_(parent_ids))
+                .all()
+            )
+        included['dogs'] = {
+            str(dog.id): serialize(dog, 'dogs', fields['dogs']) for dog in parents
+        }
+
+    return {
+        'data': data,
+        'included': included,
+        'meta': {
+            'count': len(data),
+            'media_base_url': media_base_url(),
+        },
+    }
+
+
+def primary_query_options(resource, fields, includes):
+    """load_only() option for the primary query, keeping FKs needed for includes"""
+    extra = tuple(f'{name}_id' for name in ('sire', 'dam') if name in includes)
+    return load_only_for(RESOURCES[resource]['model'], fields[resource], extra=extra)
@@ -0,0 +1,243 @@
+"""
+Snapshot Service
+Publishes the public catalog responses as static, pre-compressed JSON
+files after catalog writes, so a front proxy can serve them without
+touching Python. See docs/static-snapshots.md for the nginx setup.
+
+Layout under SNAPSHOT_FOLDER (one file per path + query string):
+    api/dogs/_.json                        GET /api/dogs
+    api/dogs/_role=Stud&gender=Male.json   GET /api/dogs?role=Stud&gender=Male
+    api/dogs/7/_.json                      GET /api/dogs/7
+    api/gallery/categories/_.json          GET /api/gallery/categories
+each with .json.gz (and .json.br when brotli is installed) siblings.
+Query parameters are written in the order the frontend sends them;
+any other order simply misses and falls through to Flask.
+"""
+
+import gzip
+import inspect
+import itertools
+import logging
+import os
+import tempfile
+import threading
+from urllib.parse import urlencode
+from flask import current_app, make_response
+from database import db
+from models.dog import Dog
+from models.gallery import Gallery
+from services.cache_service import tags_for_changes
+from services.change_service import register_commit_listener
+
+try:
+    import brotli
+except ImportError:  # Optional: only .gz siblings are written without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PUPPY_STATUSES = ('Available', 'Reserved', 'Sold')
+GENDERS = ('Male', 'Female')
+DOG_ROLES = ('Stud', 'Dam', 'Both')
+MEDIA_TYPES = ('Image', 'Video')
+
+
+def _combinations(*params):
+    """
+    Every query string for a list of (name, values) filters, each filter
+    optionally omitted, in the given parameter order
+    """
+    names = [name for name, _ in params]
+    choices = [(None, *values) for _, values in params]
+    for combo in itertools.product(*choices):
+        yield [(name, value) for name, value in zip(names, combo) if value is not None]
+
+
+def _dog_targets():
+    for query in _combinations(('role', DOG_ROLES), ('gender', GENDERS)):
+        yield '/api/dogs', 'dogs.get_dogs', {}, query
+    for (dog_id,) in db.session.query(Dog.id).filter_by(is_active=True):
+        yield f'/api/dogs/{dog_id}', 'dogs.get_dog', {'dog_id': dog_id}, []
+
+
+def _puppy_targets():
+    filters = (('status', PUPPY_STATUSES), ('gender', GENDERS), ('featured', ('true',)))
+    for query in _combinations(*filters):
+        yield '/api/puppies', 'puppies.get_puppies', {}, query
+
+
+def _gallery_targets():
+    categories = sorted(
+        category for (category,) in
+        db.session.query(Gallery.category).filter_by(is_active=True).distinct()
+        if category
+    )
+    for query in _combinations(('category', categories), ('media_type', MEDIA_TYPES)):
+        yield '/api/gallery', 'gallery.get_gallery_items', {}, query
+    yield '/api/gallery/categories', 'gallery.get_categories', {}, []
+
+
+# Cache tag -> (snapshot directory, target generator)
+SNAPSHOT_GROUPS = {
+    'dogs': ('api/dogs', _dog_targets),
+    'puppies': ('api/puppies', _puppy_targets),
+    'gallery': ('api/gallery', _gallery_targets),
+}
+
+
+def snapshot_filename(path, query):
+    """Relative snapshot file for a request path and ordered query pairs"""
+    return os.path.join(path.strip('/'), f'_{urlencode(query)}.json')
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_snapshot(folder, filename, body):
+    """
+    Write one snapshot and its compressed siblings. Each file is renamed
+    into place, so the proxy never serves a partial file.
+    """
+    path = os.path.join(folder, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Compressed siblings first: a fresh .json never pairs with a stale .gz
+    _write_atomic(path + '.gz', gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(path + '.br', brotli.compress(body))
+    _write_atomic(path, body)
+
+
+def _render(path, endpoint, view_args, query):
+    """
+    Render a public view straight from the primary database.
+    The view is unwrapped past cached_response and read_replica so a
+    lagging replica or an older cache entry never ends up in a snapshot.
+    """
+    view = inspect.unwrap(current_app.view_functions[endpoint])
+    with current_app.test_request_context(path, query_string=query):
+        response = make_response(view(**view_args))
+        return response.status_code, response.get_data()
+
+
+def _remove_stale(folder, directory, written):
+    root = os.path.join(folder, directory)
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            full = os.path.join(dirpath, name)
+            base = full[:-3] if name.endswith(('.gz', '.br')) else full
+            if name.startswith('_') and base not in written:
+                os.remove(full)
+
+
+def publish_snapshots(tags=None):
+    """
+    Render and write snapshots for the given cache tags (all when None)
+
+    Args:
+        tags: Iterable of 'dogs', 'puppies', 'gallery'
+
+    Returns:
+        int: Number of snapshot files written
+    """
+    folder = current_app.config['SNAPSHOT_FOLDER']
+    count = 0
+
+    for tag in (tags or SNAPSHOT_GROUPS):
+        directory, targets = SNAPSHOT_GROUPS[tag]
+        written = set()
+        for path, endpoint, view_args, query in list(targets()):
+            status, body = _render(path, endpoint, view_args, query)
+            if status != 200:
+                continue
+            filename = snapshot_filename(path, query)
+            write_snapshot(folder, filename, body)
+            written.add(os.path.join(folder, filename))
+            count += 1
+        # Drop snapshots of deleted dogs, renamed categories, ...
+        _remove_stale(folder, directory, written)
+
+    db.session.remove()
+    return count
+
+
+class SnapshotPublisher:
+    """
+    Debounces catalog writes: a burst of admin edits triggers one publish,
+    run on a background thread once the writes settle
+    """
+
+    def __init__(self, app, delay):
+        self.app = app
+        self.delay = delay
+        self._pending = set()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def schedule(self, tags):
+        with self._lock:
+            self._pending.update(tags)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            tags, self._pending = self._pending, set()
+            self._timer = None
+        if not tags:
+            return
+
+        with self.app.app_context():
+            try:
+                count = publish_snapshots(tags)
+                logger.info(f"Published {count} catalog snapshots ({', '.join(sorted(tags))})")
+            except Exception as e:
+                # Stale snapshots would be served: remove them so the proxy falls back to Flask
+                logger.error(f"Snapshot publish failed: {str(e)}")
+                self._discard(tags)
+
+    def _discard(self, tags):
+        folder = self.app.config['SNAPSHOT_FOLDER']
+        for tag in tags:
+            _remove_stale(folder, SNAPSHOT_GROUPS[tag][0], set())
+
+
+def init_snapshots(app):
+    """
+    Publish catalog snapshots after commits that change the public catalog
+
+    Args:
+        app: Flask application
+    """
+    @app.cli.command('publish-snapshots')
+    def publish_snapshots_command():
+        """Render every catalog snapshot now"""
+        count = publish_snapshots()
+        print(f"✅ Published {count} catalog snapshots to {app.config['SNAPSHOT_FOLDER']}")
+
+    if not app.config.get('SNAPSHOT_ENABLED', False):
+        return
+
+    publisher = SnapshotPublisher(app, app.config.get('SNAPSHOT_DEBOUNCE_SECONDS', 2))
+
+    def on_commit(changes):
+        tags = tags_for_changes(changes) & set(SNAPSHOT_GROUPS)
+        if tags:
+            publisher.schedule(tags)
+
+    register_commit_listener(app, on_commit)
+    app.extensions['snapshot_publisher'] = publisher
@@ -0,0 +1,282 @@
+"""
+SQL JSON Rendering Service
+Builds whole public response documents inside PostgreSQL with
+json_build_object()/json_agg(), so hot list endpoints skip ORM hydration
+and to_dict() entirely. The output is value-for-value identical to the
+ORM path (including media URLs, ISO timestamps and float conversions),
+with the same key order (sorted, as jsonify() writes it) and the same
+number types (1000.0 for whole floats). Only whitespace differs:
+PostgreSQL writes '"key" : value' and breaks json_agg() arrays across
+lines, where jsonify() is compact. tests/test_sql_json_parity.py checks
+this against a real database.
+
+Only used on PostgreSQL; other databases (SQLite in development and
+tests) keep the ORM path.
+"""
+
+from flask import current_app
+from sqlalchemy import select, func, case, literal, literal_column, null, or_, and_, cast, Text, BigInteger, Numeric, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by, BIT
+from sqlalchemy.orm import aliased
+from database import db
+from models.dog import Dog
+from models.puppy import Puppy
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from services.media_url_service import get_media_url_builder, VERSION_LENGTH
+
+
+def sql_json_enabled():
+    """True when the SQL rendering path can be used for this app"""
+    if not current_app.config.get('SQL_JSON_RENDERING', True):
+        return False
+    return db.engine.dialect.name == 'postgresql'
+
+
+# ============================================
+# COLUMN EXPRESSIONS (mirror to_dict())
+# ============================================
+
+def _media_url(column, asset=None):
+    """MediaUrlBuilder.url(column, asset) of the current app"""
+    builder = get_media_url_builder()
+    clean_path = func.ltrim(column, '/')
+
+    if len(builder.base_urls) == 1:
+        base = literal(builder.base_urls[0])
+    else:
+        # shard_index(): first 32 bits of the md5 of the path, modulo the host count
+        shard = cast(cast(literal('x') + func.substr(func.md5(clean_path), 1, 8), BIT(32)), BigInteger) % len(builder.base_urls)
+        base = case(
+            *((shard == i, literal(url)) for i, url in enumerate(builder.base_urls[:-1])),
+            else_=literal(builder.base_urls[-1]),
+        )
+    url = base + clean_path
+
+    if builder.versioning and asset is not None:
+        # asset_version()
+        url = case(
+            (or_(asset.sha256.is_(None), asset.sha256 == ''), url),
+            else_=url + '?v=' + func.substr(asset.sha256, 1, VERSION_LENGTH),
+        )
+
+    return case(
+        (or_(column.is_(None), column == ''), null()),
+        (column.like('http%'), column),
+        else_=url,
+    )
+
+
+def _iso_datetime(column):
+    # datetime.isoformat() omits the fraction when microseconds are zero
+    return case(
+        (column.is_(None), null()),
+        (func.date_trunc('second', column) == column,
+         func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS')),
+        else_=func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+    )
+
+
+def _iso_date(column):
+    return func.to_char(column, 'YYYY-MM-DD')
+
+
+def _json_float(value):
+    # Python's json writes whole floats as 1000.0 where PostgreSQL writes 1000
+    return case(
+        (value.is_(None), null()),
+        (and_(value == func.trunc(value), func.abs(value) < 1e15),
+         cast(cast(cast(value, Numeric), Text) + '.0', JSON)),
+        else_=func.to_json(value),
+    )
+
+
+def _float_or_none(column):
+    # to_dict() returns None for zero as well as NULL
+    return _json_float(cast(func.nullif(column, 0), db.Float))
+
+
+def _json_object(**fields):
+    """
+    json_build_object() with the keys inlined as SQL literals: untyped bind
+    parameters can't be passed to its variadic "any" arguments. Keys are
+    sorted, like jsonify() sorts them.
+    """
+    args = []
+    for key, value in sorted(fields.items()):
+        args.extend((literal_column(f"'{key}'"), value))
+    return func.json_build_object(*args)
+
+
+def _asset_object(asset):
+    """MediaAsset.to_dict() of an outer-joined asset, null when there is none"""
+    return case(
+        (asset.id.is_(None), null()),
+        else_=_json_object(
+            width=asset.width,
+            height=asset.height,
+            bytes=asset.bytes,
+            blurhash=asset.blurhash,
+        ),
+    )
+
+
+def _dog_object(dog, asset):
+    """Dog.to_dict() (without images) as a json_build_object() expression"""
+    return case(
+        (dog.id.is_(None), null()),
+        else_=_json_object(
+            id=dog.id,
+            name=dog.name,
+            gender=dog.gender,
+            role=dog.role,
+            date_of_birth=_iso_date(dog.date_of_birth),
+            registration_number=dog.registration_number,
+            pedigree_info=dog.pedigree_info,
+            description=dog.description,
+            health_clearances=dog.health_clearances,
+            achievements=dog.achievements,
+            primary_image=_media_url(dog.primary_image, asset),
+            primary_image_meta=_asset_object(asset),
+            is_active=dog.is_active,
+            created_at=_iso_datetime(dog.created_at),
+            updated_at=_iso_datetime(dog.updated_at),
+        ),
+    )
+
+
+def _puppy_object(asset, sire, sire_asset, dam, dam_asset):
+    """Puppy.to_dict(include_parents=True) as a json_build_object() expression"""
+    return _json_object(
+        id=Puppy.id,
+        name=Puppy.name,
+        gender=Puppy.gender,
+        date_of_birth=_iso_date(Puppy.date_of_birth),
+        color=Puppy.color,
+        weight_kg=_float_or_none(Puppy.weight_kg),
+        microchip_number=Puppy.microchip_number,
+        price_inr=_float_or_none(Puppy.price_inr),
+        status=Puppy.status,
+        description=Puppy.description,
+        personality_traits=Puppy.personality_traits,
+        health_notes=Puppy.health_notes,
+        primary_image=_media_url(Puppy.primary_image, asset),
+        primary_image_meta=_asset_object(asset),
+        is_featured=Puppy.is_featured,
+        created_at=_iso_datetime(Puppy.created_at),
+        updated_at=_iso_datetime(Puppy.updated_at),
+        sold_at=_iso_datetime(Puppy.sold_at),
+        sire=_dog_object(sire, sire_asset),
+        dam=_dog_object(dam, dam_asset),
+    )
+
+
+def _video_object(asset, poster):
+    """Gallery.video_dict() of a video item, null for images"""
+    return case(
+        (Gallery.media_type == 'Video', _json_object(
+            duration_seconds=_json_float(asset.duration_seconds),
+            codec=asset.codec,
+            poster_url=_media_url(poster.file_path, poster),
+            poster_meta=_asset_object(poster),
+            hls_url=_media_url(Gallery.hls_path),
+            hls_status=Gallery.hls_status,
+        )),
+        else_=null(),
+    )
+
+
+def _gallery_object(asset, poster):
+    """Gallery.to_dict() as a json_build_object() expression"""
+    return _json_object(
+        id=Gallery.id,
+        title=Gallery.title,
+        description=Gallery.description,
+        media_type=func.coalesce(func.nullif(func.lower(Gallery.media_type), ''), 'image'),
+        media_url=_media_url(Gallery.file_path, asset),
+        file_path=Gallery.file_path,
+        media_meta=_asset_object(asset),
+        video=_video_object(asset, poster),
+        category=Gallery.category,
+        display_order=Gallery.display_order,
+        is_active=Gallery.is_active,
+        uploaded_at=_iso_datetime(Gallery.uploaded_at),
+    )
+
+
+# ============================================
+# DOCUMENTS
+# ============================================
+
+def _render_document(rows, list_key, order_by):
+    """
+    Wrap a (doc, sort columns...) subquery into {list_key: [...], 'count': n}
+    and return the serialized document
+    """
+    rows = rows.subquery()
+    document = _json_object(**{
+        list_key: func.coalesce(
+            func.json_agg(aggregate_order_by(rows.c.doc, *order_by(rows))),
+            func.json_build_array()
+        ),
+        'count': func.count(),
+    })
+    body = db.session.execute(select(cast(document, Text)).select_from(rows)).scalar()
+    return body.encode('utf-8')
+
+
+def render_puppies(query):
+    """
+    Render the /api/puppies document for a filtered Puppy query
+
+    Args:
+        query: Puppy.query with the public filters applied
+
+    Returns:
+        bytes: {"puppies": [...], "count": n} as JSON
+    """
+    sire, dam = aliased(Dog), aliased(Dog)
+    asset, sire_asset, dam_asset = aliased(MediaAsset), aliased(MediaAsset), aliased(MediaAsset)
+    rows = (
+        select(_puppy_object(asset, sire, sire_asset, dam, dam_asset).label('doc'), Puppy.created_at)
+        .select_from(Puppy)
+        .outerjoin(asset, asset.id == Puppy.primary_image_asset_id)
+        .outerjoin(sire, sire.id == Puppy.sire_id)
+        .outerjoin(sire_asset, sire_asset.id == sire.primary_image_asset_id)
+        .outerjoin(dam, dam.id == Puppy.dam_id)
+        .outerjoin(dam_asset, dam_asset.id == dam.primary_image_asset_id)
+    )
+    if query.whereclause is not None:
+        rows = rows.where(query.whereclause)
+
+    return _render_document(rows, 'puppies', lambda r: (r.c.created_at.desc(),))
+
+
+def render_gallery(query):
+    """
+    Render the /api/gallery document for a filtered Gallery query
+
+    Args:
+        query: Gallery.query with the public filters applied
+
+    Returns:
+        bytes: {"items": [...], "count": n} as JSON
+    """
+    asset, poster = aliased(MediaAsset), aliased(MediaAsset)
+    rows = (
+        select(_gallery_object(asset, poster).label('doc'), Gallery.display_order, Gallery.uploaded_at)
+        .select_from(Gallery)
+        .outerjoin(asset, asset.id == Gallery.asset_id)
+        .outerjoin(poster, poster.id == Gallery.poster_asset_id)
+    )
+    if query.whereclause is not None:
+        rows = rows.where(query.whereclause)
+
+    return _render_document(
+        rows, 'items', lambda r: (r.c.display_order, r.c.uploaded_at.desc())
+    )
+
+
+def json_body_response(body):
+    """Response carrying a pre-serialized JSON document"""
+    return current_app.response_class(body, status=200, mimetype='application/json')
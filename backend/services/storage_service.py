@@ -0,0 +1,291 @@
+"""
+Storage Service
+Where uploaded media lives, behind one interface (STORAGE_BACKEND):
+
+  - LocalStorage: files in UPLOAD_FOLDER, served by /uploads/<path>
+  - S3Storage: objects in an S3-compatible bucket (AWS, MinIO, R2, ...).
+    UPLOAD_FOLDER stays the node's working copy: uploads are processed
+    there (optimization, probing, posters) and then published to the
+    bucket; files another node published are fetched on demand.
+
+Keys are the relative paths stored in the database ('gallery/x.jpg').
+Both backends hand out presigned PUT URLs, so browsers can upload
+straight to storage (services/direct_upload_service.py).
+"""
+
+import mimetypes
+import os
+import tempfile
+from flask import current_app, url_for
+from werkzeug.security import safe_join
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # Optional: only needed for STORAGE_BACKEND=s3
+    boto3 = None
+
+COPY_BUFFER = 1024 * 1024
+
+
+class LocalStorage:
+    """Uploads on the local filesystem, below root"""
+
+    name = 'local'
+    remote = False
+    public_base = None  # Served by /uploads
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        """Local file for a key (for remote backends: this node's working copy)"""
+        full_path = safe_join(self.root, key.lstrip('/'))
+        if full_path is None:
+            raise ValueError(f'Invalid storage key: {key}')
+        return full_path
+
+    def publish(self, key, content_type=None):
+        """Make the file at path(key) available to every node"""
+        pass  # Already in place
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def size(self, key):
+        """Stored size in bytes, None when the key doesn't exist"""
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def list_keys(self, prefix):
+        """Keys of every file below a folder key (e.g. an HLS ladder)"""
+        keys = []
+        for dirpath, _, files in os.walk(self.path(prefix)):
+            keys.extend(os.path.relpath(os.path.join(dirpath, name), self.root) for name in files)
+        return keys
+
+    def localize(self, key):
+        """Full path of a local copy of the key, or None when it doesn't exist"""
+        path = self.path(key)
+        return path if os.path.isfile(path) else None
+
+    def url(self, key):
+        """Public URL of a key; None means serve it from /uploads/<key>"""
+        return None
+
+    def presign_put(self, key, content_type, size, expires_in, token):
+        """
+        URL a client may PUT exactly `size` bytes of `content_type` to
+
+        Args:
+            key: Destination key
+            content_type: Content-Type the client must send
+            size: Content-Length the client must send
+            expires_in: Seconds the URL stays valid
+            token: Signed direct upload token (see direct_upload_service)
+        """
+        # The signed token is the credential, as in an S3 presigned URL
+        return url_for('uploads.direct_put', token=token, _external=True)
+
+    def write(self, key, stream, max_bytes):
+        """
+        Store a request body under key, atomically. Local storage only:
+        remote backends take uploads at their presigned URL, and
+        receive_direct_upload() turns requests for them away.
+
+        Returns:
+            int: Bytes written (at most max_bytes + 1, to detect overlong bodies)
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while written <= max_bytes:
+                    chunk = stream.read(COPY_BUFFER)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    written += len(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return written
+
+
+class S3Storage(LocalStorage):
+    """Uploads in an S3-compatible bucket; root is this node's working copy"""
+
+    name = 's3'
+    remote = True
+
+    def __init__(self, root, bucket, client, prefix='', public_url=None, url_expiry=3600):
+        super().__init__(root)
+        self.bucket = bucket
+        self.client = client
+        self.prefix = prefix
+        self.public_url = public_url.rstrip('/') + '/' if public_url else None
+        self.url_expiry = url_expiry
+
+    @property
+    def public_base(self):
+        """Base URL stored paths are public under, None with presigned URLs"""
+        return self.public_url + self.prefix if self.public_url else None
+
+    def _key(self, key):
+        return self.prefix + key.lstrip('/')
+
+    def publish(self, key, content_type=None):
+        content_type = content_type or mimetypes.guess_type(key)[0] or 'application/octet-stream'
+        self.client.upload_file(self.path(key), self.bucket, self._key(key), ExtraArgs={'ContentType': content_type})
+
+    def _head(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def exists(self, key):
+        return self._head(key) is not None
+
+    def size(self, key):
+        head = self._head(key)
+        return head['ContentLength'] if head else None
+
+    def delete(self, key):
+        super().delete(key)
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list_keys(self, prefix):
+        # Objects other nodes published plus whatever this node hasn't published yet
+        keys = set(super().list_keys(prefix))
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix).rstrip('/') + '/'):
+            keys.update(item['Key'][len(self.prefix):] for item in page.get('Contents', []))
+        return sorted(keys)
+
+    def localize(self, key):
+        path = self.path(key)
+        if os.path.isfile(path):
+            return path
+        if not self.exists(key):
+            return None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._key(key), tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def url(self, key):
+        if self.public_url:
+            return self.public_url + self._key(key)
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': self._key(key)},
+            ExpiresIn=self.url_expiry
+        )
+
+    def presign_put(self, key, content_type, size, expires_in, token):
+        # Both headers are signed: the client can't send anything else
+        return self.client.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': self.bucket, 'Key': self._key(key), 'ContentType': content_type, 'ContentLength': size},
+            ExpiresIn=expires_in
+        )
+
+
+def _s3_storage(app):
+    if boto3 is None:
+        raise RuntimeError('STORAGE_BACKEND=s3 requires boto3 (pip install boto3)')
+    client = boto3.client(
+        's3',
+        endpoint_url=app.config.get('S3_ENDPOINT_URL') or None,
+        region_name=app.config.get('S3_REGION') or None,
+        aws_access_key_id=app.config.get('S3_ACCESS_KEY_ID') or None,
+        aws_secret_access_key=app.config.get('S3_SECRET_ACCESS_KEY') or None,
+        # MinIO and most self-hosted stand-ins need path-style addressing
+        config=BotoConfig(s3={'addressing_style': app.config.get('S3_ADDRESSING_STYLE', 'auto')}),
+    )
+    return S3Storage(
+        app.config['UPLOAD_FOLDER'],
+        app.config['S3_BUCKET'],
+        client,
+        prefix=app.config.get('S3_KEY_PREFIX', ''),
+        public_url=app.config.get('S3_PUBLIC_URL'),
+        url_expiry=app.config.get('S3_URL_EXPIRY_SECONDS', 3600),
+    )
+
+
+def init_storage(app):
+    """
+    Create the storage backend of the app
+
+    Args:
+        app: Flask application
+    """
+    backend = app.config.get('STORAGE_BACKEND', 'local')
+    if backend == 's3':
+        storage = _s3_storage(app)
+    elif backend == 'local':
+        storage = LocalStorage(app.config['UPLOAD_FOLDER'])
+    else:
+        raise ValueError(f'Unknown STORAGE_BACKEND: {backend}')
+
+    app.extensions['storage'] = storage
+    return storage
+
+
+def get_storage():
+    """Get the storage backend of the current app"""
+    return current_app.extensions['storage']
+
+
+def publish_file(file_path, content_type=None):
+    """
+    Publish a file written below UPLOAD_FOLDER to the storage backend
+
+    Args:
+        file_path: Relative path (the storage key)
+        content_type: Optional Content-Type, guessed from the name otherwise
+    """
+    get_storage().publish(file_path, content_type)
+
+
+def publish_tree(folder):
+    """Publish every file below a folder of UPLOAD_FOLDER (e.g. an HLS ladder)"""
+    storage = get_storage()
+    if not storage.remote:
+        return
+    root = storage.path(folder)
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            storage.publish(os.path.relpath(os.path.join(dirpath, name), storage.root))
+
+
+def localize_file(file_path):
+    """
+    Full path of a local copy of a stored file, fetched from the storage
+    backend when this node doesn't have it
+
+    Returns:
+        str: Full path, or None when the file doesn't exist
+    """
+    return get_storage().localize(file_path)
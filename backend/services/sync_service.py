@@ -0,0 +1,157 @@
+"""
+Sync Service
+Stamps catalog rows with a monotonic change sequence and builds the
+incremental sync feed served at /api/sync
+
+Sequence numbers come from a counter row updated inside the writing
+transaction. The row lock serializes catalog writers, so a reader can
+never see sequence N+1 committed while N is still in flight - which
+would make clients skip N forever.
+"""
+
+from sqlalchemy import event, update, insert, inspect
+from database import RoutingSession
+from models.dog import Dog, DogImage
+from models.puppy import Puppy, PuppyImage
+from models.gallery import Gallery
+from models.sync import SyncCounter, SyncTombstone
+
+CATALOG_SEQUENCE = 'catalog'
+
+# Entity name -> (model, key in the feed's 'changes' object)
+SYNC_ENTITIES = {
+    'dog': (Dog, 'dogs'),
+    'dog_image': (DogImage, 'dog_images'),
+    'puppy': (Puppy, 'puppies'),
+    'puppy_image': (PuppyImage, 'puppy_images'),
+    'gallery': (Gallery, 'gallery'),
+}
+
+_MODEL_ENTITIES = {model: entity for entity, (model, _) in SYNC_ENTITIES.items()}
+
+
+def allocate_change_seqs(session, count):
+    """
+    Reserve `count` consecutive change sequence numbers
+
+    Args:
+        session: SQLAlchemy session of the writing transaction
+        count: Number of sequence numbers needed
+
+    Returns:
+        int: First reserved sequence number
+    """
+    stmt = (
+        update(SyncCounter)
+        .where(SyncCounter.name == CATALOG_SEQUENCE)
+        .values(value=SyncCounter.value + count)
+        .returning(SyncCounter.value)
+    )
+    last = session.execute(stmt).scalar()
+
+    if last is None:
+        session.execute(insert(SyncCounter).values(name=CATALOG_SEQUENCE, value=count))
+        last = count
+
+    return last - count + 1
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _stamp_change_seqs(session, flush_context, instances):
+    stamped = []
+    for obj in session.new:
+        if type(obj) in _MODEL_ENTITIES:
+            stamped.append(obj)
+
+    for obj in session.dirty:
+        if type(obj) in _MODEL_ENTITIES and session.is_modified(obj, include_collections=False):
+            stamped.append(obj)
+
+    deleted = [obj for obj in session.deleted if type(obj) in _MODEL_ENTITIES]
+
+    if not stamped and not deleted:
+        return
+
+    seq = allocate_change_seqs(session, len(stamped) + len(deleted))
+
+    for obj in stamped:
+        obj.change_seq = seq
+        seq += 1
+
+    for obj in deleted:
+        session.add(SyncTombstone(
+            entity=_MODEL_ENTITIES[type(obj)],
+            entity_id=inspect(obj).identity[0],
+            change_seq=seq
+        ))
+        seq += 1
+
+
+def _serialize(entity, obj):
+    data = obj.to_dict()
+    if entity == 'puppy':
+        # Parents are synced as dogs; reference them by id
+        data['sire_id'] = obj.sire_id
+        data['dam_id'] = obj.dam_id
+    data['change_seq'] = obj.change_seq
+    return data
+
+
+def _is_hidden(entity, obj):
+    """Inactive dogs and gallery items are not public: sync them as deletes"""
+    return entity in ('dog', 'gallery') and not obj.is_active
+
+
+def build_sync_feed(since=0, limit=500):
+    """
+    Collect catalog rows and tombstones changed after a sync token
+
+    Args:
+        since: Last change sequence the client has seen (0 = full sync)
+        limit: Maximum number of changes to return
+
+    Returns:
+        dict: {'changes': {...}, 'deleted': [...], 'next_token', 'has_more'}
+    """
+    candidates = []  # (change_seq, kind, entity, row)
+
+    for entity, (model, _) in SYNC_ENTITIES.items():
+        rows = (
+            model.query
+            .filter(model.change_seq > since)
+            .order_by(model.change_seq)
+            .limit(limit + 1)
+            .all()
+        )
+        candidates.extend((row.change_seq, 'row', entity, row) for row in rows)
+
+    tombstones = (
+        SyncTombstone.query
+        .filter(SyncTombstone.change_seq > since)
+        .order_by(SyncTombstone.change_seq)
+        .limit(limit + 1)
+        .all()
+    )
+    candidates.extend((t.change_seq, 'tombstone', t.entity, t) for t in tombstones)
+
+    candidates.sort(key=lambda candidate: candidate[0])
+    has_more = len(candidates) > limit
+    page = candidates[:limit]
+
+    changes = {key: [] for _, key in SYNC_ENTITIES.values()}
+    deleted = []
+
+    for change_seq, kind, entity, obj in page:
+        if kind == 'tombstone':
+            deleted.append(obj.to_dict())
+        elif _is_hidden(entity, obj):
+            deleted.append({'entity': entity, 'id': obj.id, 'change_seq': change_seq, 'deleted_at': None})
+        else:
+            changes[SYNC_ENTITIES[entity][1]].append(_serialize(entity, obj))
+
+    return {
+        'changes': changes,
+        'deleted': deleted,
+        'next_token': str(page[-1][0] if page else since),
+        'has_more': has_more,
+    }
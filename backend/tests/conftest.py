@@ -0,0 +1,66 @@
+"""
+Shared fixtures: an app on a throwaway SQLite database and upload folder,
+a test client and admin credentials
+"""
+
+import pytest
+from sqlalchemy import CheckConstraint
+from app import create_app
+from config import TestingConfig
+from database import db
+
+
+@pytest.fixture
+def config_overrides():
+    """Extra config values for the app fixture (override in a test module)"""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, config_overrides):
+    class Config(TestingConfig):
+        # A file database: tests with threads need connections of their own
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        RESUMABLE_UPLOAD_FOLDER = str(tmp_path / 'resumable')
+        IMAGE_CACHE_FOLDER = str(tmp_path / 'image_cache')
+
+    for name, value in config_overrides.items():
+        setattr(Config, name, value)
+
+    app = create_app(Config)
+    with app.app_context():
+        # PostgreSQL regex checks (~*) don't exist on SQLite
+        for table in db.metadata.tables.values():
+            for constraint in list(table.constraints):
+                if isinstance(constraint, CheckConstraint) and '~*' in str(constraint.sqltext):
+                    table.constraints.discard(constraint)
+        # Only the primary: other tests' apps may have registered replica binds
+        db.create_all(bind_key=None)
+        # Replica binds get the schema too (and none of the rows)
+        for key in app.extensions['replica_router'].bind_keys:
+            db.metadata.create_all(db.engines[key])
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(app):
+    from models.admin import Admin
+    from utils.jwt_helper import generate_token
+
+    with app.app_context():
+        admin = Admin(username='admin', email='admin@example.com')
+        admin.set_password('secret')
+        db.session.add(admin)
+        db.session.commit()
+        with app.test_request_context():
+            token = generate_token(admin.id, admin.username)
+    return {'Authorization': f'Bearer {token}'}
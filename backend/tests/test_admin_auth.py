@@ -0,0 +1,63 @@
+"""
+admin_required, admin_stream_required and get_request_admin share one
+token check
+"""
+
+import pytest
+from database import db
+from models.admin import Admin
+from utils.jwt_helper import admin_required, admin_stream_required, get_request_admin
+
+
+@admin_required
+def admin_view(current_user):
+    return current_user['username']
+
+
+@admin_stream_required
+def stream_view(current_user):
+    return current_user['username']
+
+
+def _call(app, view, path='/', headers=None):
+    with app.test_request_context(path, headers=headers or {}):
+        result = view()
+    return (result, 200) if isinstance(result, str) else (result[0].get_json()['error'], result[1])
+
+
+@pytest.mark.parametrize('view', [admin_view, stream_view])
+def test_valid_bearer_token(app, admin_headers, view):
+    assert _call(app, view, headers=admin_headers) == ('admin', 200)
+
+
+@pytest.mark.parametrize('view', [admin_view, stream_view])
+@pytest.mark.parametrize('headers, expected', [
+    ({}, ('Authentication token is missing', 401)),
+    ({'Authorization': 'Bearer nonsense'}, ('Invalid or expired token', 401)),
+])
+def test_rejected_tokens(app, view, headers, expected):
+    assert _call(app, view, headers=headers) == expected
+
+
+def test_query_token_only_for_streams(app, admin_headers):
+    token = admin_headers['Authorization'].split(' ')[1]
+    assert _call(app, stream_view, f'/?token={token}') == ('admin', 200)
+    assert _call(app, admin_view, f'/?token={token}') == ('Authentication token is missing', 401)
+
+
+def test_disabled_admin(app, admin_headers):
+    with app.app_context():
+        db.session.query(Admin).update({'is_active': False})
+        db.session.commit()
+
+    for view in (admin_view, stream_view):
+        assert _call(app, view, headers=admin_headers) == ('Admin account is disabled', 403)
+    with app.test_request_context(headers=admin_headers):
+        assert get_request_admin() is None
+
+
+def test_get_request_admin(app, admin_headers):
+    with app.test_request_context(headers=admin_headers):
+        assert get_request_admin()['username'] == 'admin'
+    with app.test_request_context():
+        assert get_request_admin() is None
@@ -0,0 +1,35 @@
+"""
+Batch requests: invalid sub-requests fail on their own, and streaming
+endpoints are refused before their view runs
+"""
+
+from services.notification_service import get_broker
+
+
+def _batch(client, requests, headers=None):
+    response = client.post('/api/batch', json={'requests': requests}, headers=headers or {})
+    assert response.status_code == 200
+    return response.get_json()['responses']
+
+
+def test_non_string_path_or_method(client):
+    responses = _batch(client, [
+        {'path': 5},
+        {'method': ['GET'], 'path': '/api/dogs/'},
+        {'path': '/api/dogs/'},
+    ])
+    assert [response['status'] for response in responses] == [400, 400, 200]
+    assert responses[0]['body'] == {'error': 'method and path must be strings'}
+
+
+def test_event_stream_is_refused_before_subscribing(app, client, admin_headers):
+    responses = _batch(client, [
+        {'path': '/api/bookings/admin/stream'},
+        {'path': '/api/bookings/admin/stream?token=x'},
+        {'path': '/api/bookings/admin/stats'},
+    ], admin_headers)
+
+    assert [response['status'] for response in responses] == [400, 400, 200]
+    assert responses[0]['body'] == {'error': 'Streaming endpoints cannot be batched'}
+    with app.app_context():
+        assert get_broker().connection_count() == 0
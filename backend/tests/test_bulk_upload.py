@@ -0,0 +1,51 @@
+"""
+Files saved by a bulk upload are removed again when the batch doesn't
+commit, including when the client drops the ndjson stream mid-batch
+"""
+
+import io
+import json
+import os
+from PIL import Image
+from models.gallery import Gallery
+
+
+def _jpeg(color):
+    data = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(data, format='JPEG')
+    data.seek(0)
+    return data
+
+
+def _gallery_files(app):
+    folder = os.path.join(app.config['UPLOAD_FOLDER'], 'gallery')
+    return sorted(name for name in os.listdir(folder) if not name.startswith('.'))
+
+
+def test_dropped_stream_removes_saved_files(app, client, admin_headers):
+    response = client.post('/api/gallery/admin/bulk-upload?stream=ndjson', headers=admin_headers, data={
+        # The invalid file is reported once both images are on disk
+        'files': [(_jpeg((200, 10, 10)), 'red.jpg'), (_jpeg((10, 200, 10)), 'green.jpg'),
+                  (io.BytesIO(b'not an upload'), 'notes.txt')],
+    })
+    first = json.loads(next(iter(response.response)))
+    assert first['filename'] == 'notes.txt' and first['status'] == 'failed'
+    assert len(_gallery_files(app)) == 2
+
+    response.close()
+
+    assert _gallery_files(app) == []
+    with app.app_context():
+        assert Gallery.query.count() == 0
+
+
+def test_completed_stream_keeps_files(app, client, admin_headers):
+    response = client.post('/api/gallery/admin/bulk-upload?stream=ndjson', headers=admin_headers, data={
+        'files': [(_jpeg((200, 10, 10)), 'red.jpg'), (_jpeg((10, 200, 10)), 'green.jpg')],
+    })
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert events[-1]['uploaded'] == 2
+
+    assert len(_gallery_files(app)) == 2
+    with app.app_context():
+        assert Gallery.query.count() == 2
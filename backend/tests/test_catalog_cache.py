@@ -0,0 +1,38 @@
+import pytest
+from database import db
+from models.dog import Dog
+
+
+@pytest.fixture
+def config_overrides(tmp_path):
+    # A "replica" that never receives the primary's writes: maximal lag
+    return {'SQLALCHEMY_REPLICA_URIS': [f"sqlite:///{tmp_path / 'replica.db'}"]}
+
+
+def _add_dog(app, name):
+    with app.app_context():
+        db.session.add(Dog(name=name, gender='Male', role='Stud'))
+        db.session.commit()
+
+
+def _names(response):
+    assert response.status_code == 200
+    return [dog['name'] for dog in response.get_json()['dogs']]
+
+
+def test_cache_is_filled_from_the_primary(app, client):
+    _add_dog(app, 'Rex')
+    assert _names(client.get('/api/dogs/')) == ['Rex']
+
+    # The commit bumps the tag version; the next miss must not see the replica
+    _add_dog(app, 'Ace')
+    response = client.get('/api/dogs/')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert _names(response) == ['Ace', 'Rex']
+    assert client.get('/api/dogs/').headers['X-Cache'] == 'HIT'
+
+
+def test_uncached_reads_use_the_replica(app, client):
+    app.extensions.pop('catalog_cache')
+    _add_dog(app, 'Rex')
+    assert _names(client.get('/api/dogs/')) == []
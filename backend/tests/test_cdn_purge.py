@@ -0,0 +1,72 @@
+import threading
+import time
+import pytest
+from database import db
+from models.gallery import Gallery
+from services.cdn_purge_service import PurgeDispatcher, register_purge_backend
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.purges = []
+        self.purged = threading.Event()
+
+    def purge(self, keys):
+        self.purges.append(list(keys))
+        self.purged.set()
+
+
+@pytest.fixture
+def backend():
+    recorder = RecordingBackend()
+    register_purge_backend('recording', lambda app: recorder)
+    return recorder
+
+
+@pytest.fixture
+def config_overrides(request, backend):
+    return getattr(request, 'param', {'CDN_PURGE_BACKEND': 'recording'})
+
+
+def test_responses_carry_surrogate_keys(app, client, backend):
+    response = client.get('/api/gallery/?category=Show Dogs')
+    assert response.headers['Surrogate-Key'] == 'gallery:category:Show%20Dogs'
+    assert response.headers['Surrogate-Control'] == 'max-age=86400'
+
+
+@pytest.mark.parametrize('config_overrides', [{'CDN_PURGE_BACKEND': 'none'}], indirect=True)
+def test_no_cdn_lifetime_without_a_purge_backend(client):
+    response = client.get('/api/dogs/')
+    assert response.headers['Surrogate-Key'] == 'collection:dogs'
+    assert 'Surrogate-Control' not in response.headers
+
+
+def test_moving_a_gallery_item_purges_both_categories(app, backend):
+    with app.app_context():
+        item = Gallery(title='Pup', media_type='Image', file_path='gallery/pup.jpg', category='Litters')
+        db.session.add(item)
+        db.session.commit()
+        backend.purges.clear()
+
+        item_id = item.id
+        item.category = 'Show Dogs'
+        db.session.commit()
+
+    assert backend.purges == [[
+        'collection:gallery', f'gallery:{item_id}', 'gallery:category:Litters', 'gallery:category:Show%20Dogs',
+    ]]
+
+
+def test_dispatcher_coalesces_and_purges_again():
+    backend = RecordingBackend()
+    dispatcher = PurgeDispatcher(backend, delay=0.05, repeat_seconds=0.2)
+
+    dispatcher.submit({'dog:1', 'collection:dogs'})
+    dispatcher.submit({'dog:2', 'collection:dogs'})
+    assert backend.purged.wait(2)
+    assert backend.purges == [['collection:dogs', 'dog:1', 'dog:2']]
+
+    deadline = time.monotonic() + 2
+    while len(backend.purges) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert backend.purges[1] == ['collection:dogs', 'dog:1', 'dog:2']
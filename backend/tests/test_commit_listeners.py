@@ -0,0 +1,36 @@
+"""
+Commit listeners belong to the app that registered them: a second
+create_app() adds none to the first, and a commit only reaches the
+listeners of the app it happened in
+"""
+
+from config import TestingConfig
+from app import create_app
+from database import db
+from models.dog import Dog
+from services.change_service import register_commit_listener
+
+
+def test_listeners_are_per_app(app, tmp_path):
+    listeners = list(app.extensions['commit_listeners'])
+
+    class OtherConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'other.db'}"
+        UPLOAD_FOLDER = str(tmp_path / 'other-uploads')
+        RESUMABLE_UPLOAD_FOLDER = str(tmp_path / 'other-resumable')
+        IMAGE_CACHE_FOLDER = str(tmp_path / 'other-image-cache')
+
+    other = create_app(OtherConfig)
+    assert app.extensions['commit_listeners'] == listeners
+    assert not set(other.extensions['commit_listeners']) & set(listeners)
+
+    received = {'app': [], 'other': []}
+    register_commit_listener(app, received['app'].extend)
+    register_commit_listener(other, received['other'].extend)
+
+    with app.app_context():
+        db.session.add(Dog(name='Rex', gender='Male', role='Stud'))
+        db.session.commit()
+
+    assert [change['entity'] for change in received['app']] == ['dog']
+    assert received['other'] == []
@@ -0,0 +1,44 @@
+"""
+Single gallery uploads decode the image once: the duplicate check and the
+media asset share one probe
+"""
+
+import io
+from PIL import Image
+from database import db
+from models.gallery import Gallery
+import services.file_service as file_service
+import services.media_asset_service as media_asset_service
+
+
+def _jpeg():
+    data = io.BytesIO()
+    Image.new('RGB', (640, 480), (30, 90, 160)).save(data, format='JPEG')
+    data.seek(0)
+    return data
+
+
+def test_upload_decodes_the_image_once(app, client, admin_headers, monkeypatch):
+    decodes = []
+    original = file_service.decode_thumbnail
+
+    def decode_thumbnail(path, *args, **kwargs):
+        decodes.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(file_service, 'decode_thumbnail', decode_thumbnail)
+    monkeypatch.setattr(media_asset_service, 'decode_thumbnail', decode_thumbnail)
+
+    response = client.post('/api/gallery/admin', headers=admin_headers, data={
+        'file': (_jpeg(), 'pup.jpg'),
+        'title': 'Pup',
+        'duplicates': 'flag',
+    })
+    assert response.status_code == 201, response.get_json()
+    item = response.get_json()['item']
+
+    assert len(decodes) == 1
+    assert item['media_meta']['width'] == 640
+    assert item['media_meta']['blurhash']
+    with app.app_context():
+        assert db.session.get(Gallery, item['id']).asset.phash is not None
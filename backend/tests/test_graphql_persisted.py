@@ -0,0 +1,59 @@
+"""
+Persisted queries: a hash the document cache doesn't hold (never
+registered, or evicted) gets Apollo's PersistedQueryNotFound error
+"""
+
+import pytest
+from services.graphql_service import DocumentCache, hash_query
+
+DOGS = '{ dogs { id name } }'
+PUPPIES = '{ puppies { id name } }'
+
+
+@pytest.fixture
+def config_overrides():
+    return {'GRAPHQL_DOCUMENT_CACHE_SIZE': 1}
+
+
+def _persisted(client, query_hash, query=None):
+    body = {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': query_hash}}}
+    if query:
+        body['query'] = query
+    return client.post('/api/graphql', json=body)
+
+
+def _assert_not_found(response):
+    assert response.status_code == 200
+    assert response.get_json() == {'errors': [{
+        'message': 'PersistedQueryNotFound',
+        'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'},
+    }]}
+
+
+def test_register_then_hash_only(client):
+    _assert_not_found(_persisted(client, hash_query(DOGS)))
+
+    assert _persisted(client, hash_query(DOGS), DOGS).get_json() == {'data': {'dogs': []}}
+    assert _persisted(client, hash_query(DOGS)).get_json() == {'data': {'dogs': []}}
+
+
+def test_evicted_hash(client):
+    _persisted(client, hash_query(DOGS), DOGS)
+    _persisted(client, hash_query(PUPPIES), PUPPIES)  # Evicts DOGS (cache size 1)
+
+    _assert_not_found(_persisted(client, hash_query(DOGS)))
+
+
+def test_eviction_during_the_request(app, client):
+    class EvictingCache(DocumentCache):
+        """Entries disappear right after they are read, as under concurrent eviction"""
+
+        def get(self, query_hash):
+            with self._lock:
+                return self._documents.pop(query_hash, None)
+
+    app.extensions['graphql_documents'] = EvictingCache()
+    _persisted(client, hash_query(DOGS), DOGS)
+
+    assert _persisted(client, hash_query(DOGS)).get_json() == {'data': {'dogs': []}}
+    _assert_not_found(_persisted(client, hash_query(DOGS)))
@@ -0,0 +1,65 @@
+"""
+HLS ladders are deleted through the storage backend, including the bucket
+objects a node never had a local copy of
+"""
+
+import os
+from database import db
+from models.gallery import Gallery
+from services.storage_service import S3Storage
+
+
+class FakeS3:
+    """The calls S3Storage makes, on an in-memory bucket"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, filename, bucket, key, ExtraArgs=None):
+        with open(filename, 'rb') as f:
+            self.objects[key] = f.read()
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def get_paginator(self, operation):
+        assert operation == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        # Two pages, as S3 returns for long listings
+        yield {'Contents': [{'Key': key} for key in keys[:2]]}
+        yield {'Contents': [{'Key': key} for key in keys[2:]]} if keys[2:] else {}
+
+
+def test_deleting_an_item_deletes_its_ladder_from_the_bucket(app, client, admin_headers):
+    bucket = FakeS3()
+    ladder = 'gallery/1/hls-7'
+    bucket.objects.update({
+        f'media/{ladder}/master.m3u8': b'#EXTM3U',
+        f'media/{ladder}/360p/index.m3u8': b'#EXTM3U',
+        f'media/{ladder}/360p/seg_000.ts': b'ts',
+        f'media/{ladder}/720p/seg_000.ts': b'ts',
+        'media/gallery/1/poster.jpg': b'jpg',
+        'media/gallery/10/hls-8/master.m3u8': b'#EXTM3U',
+    })
+    # This node only has the master playlist
+    local_master = os.path.join(app.config['UPLOAD_FOLDER'], ladder, 'master.m3u8')
+    os.makedirs(os.path.dirname(local_master))
+    with open(local_master, 'w') as f:
+        f.write('#EXTM3U')
+
+    with app.app_context():
+        item = Gallery(title='Run', media_type='Video', file_path='gallery/run.mp4',
+                       hls_path=f'{ladder}/master.m3u8', hls_status='ready')
+        db.session.add(item)
+        db.session.commit()
+        item_id = item.id
+    app.extensions['storage'] = S3Storage(app.config['UPLOAD_FOLDER'], 'bucket', bucket, prefix='media/')
+
+    response = client.delete(f'/api/gallery/admin/{item_id}', headers=admin_headers)
+    assert response.status_code == 200
+
+    assert sorted(bucket.objects) == ['media/gallery/1/poster.jpg', 'media/gallery/10/hls-8/master.m3u8']
+    assert not os.path.exists(local_master)
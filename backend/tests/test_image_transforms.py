@@ -0,0 +1,63 @@
+"""
+/uploads/<path>?w=&h=&q= variants: requested sizes and qualities snap to
+the allowlist, and JPEG sources are decoded scaled down
+"""
+
+import io
+import os
+import pytest
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
+
+
+@pytest.fixture
+def photo(app):
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    Image.new('RGB', (2400, 1200), (200, 120, 40)).save(os.path.join(app.config['UPLOAD_FOLDER'], 'photo.jpg'))
+    return 'photo.jpg'
+
+
+def _cached_files(app):
+    return [name for _, _, names in os.walk(app.config['IMAGE_CACHE_FOLDER']) for name in names]
+
+
+def test_sizes_and_qualities_snap_to_one_variant(app, client, photo):
+    sizes = []
+    for query in ('w=300', 'w=301&q=79', 'w=320&q=82', 'w=250&fit=cover'):
+        response = client.get(f'/uploads/{photo}?{query}&fmt=jpeg')
+        assert response.status_code == 200
+        with Image.open(io.BytesIO(response.data)) as img:
+            sizes.append(img.size)
+
+    assert sizes == [(320, 160)] * 4
+    assert len(_cached_files(app)) == 1
+
+
+def test_oversized_requests_get_the_largest_size(client, photo):
+    response = client.get(f'/uploads/{photo}?w=100000&h=3000&fit=fill&fmt=jpeg')
+    assert response.status_code == 200
+    with Image.open(io.BytesIO(response.data)) as img:
+        assert img.size == (2560, 2560)
+
+
+def test_invalid_values_are_rejected(client, photo):
+    assert client.get(f'/uploads/{photo}?w=0').status_code == 400
+    assert client.get(f'/uploads/{photo}?q=high').status_code == 400
+
+
+def test_width_only_request_decodes_scaled_down(client, photo, monkeypatch):
+    drafts = []
+    original = JpegImageFile.draft
+
+    def draft(self, mode, size):
+        result = original(self, mode, size)
+        drafts.append(self.size)
+        return result
+
+    monkeypatch.setattr(JpegImageFile, 'draft', draft)
+    response = client.get(f'/uploads/{photo}?w=320&fmt=jpeg')
+    assert response.status_code == 200
+    response.close()
+
+    # 2400x1200 read at 1/4 instead of full size
+    assert drafts[0] == (600, 300)
@@ -0,0 +1,61 @@
+"""
+Media assets record the SHA-256 of the stored bytes, at ingest and in
+the backfill
+"""
+
+import hashlib
+import io
+import os
+from PIL import Image
+from database import db
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from services.media_asset_service import backfill_media_assets
+
+
+def _jpeg(color):
+    data = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(data, format='JPEG')
+    data.seek(0)
+    return data
+
+
+def _stored_sha256(app, file_path):
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], file_path), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_single_upload(app, client, admin_headers):
+    response = client.post('/api/gallery/admin', headers=admin_headers, data={'file': (_jpeg((200, 10, 10)), 'red.jpg')})
+    assert response.status_code == 201
+
+    with app.app_context():
+        item = db.session.get(Gallery, response.get_json()['item']['id'])
+        assert item.asset.sha256 == _stored_sha256(app, item.file_path)
+
+
+def test_bulk_upload(app, client, admin_headers):
+    response = client.post('/api/gallery/admin/bulk-upload', headers=admin_headers, data={
+        'files': [(_jpeg((10, 200, 10)), 'green.jpg'), (_jpeg((10, 10, 200)), 'blue.jpg')],
+    })
+    assert response.status_code in (200, 201), response.get_json()
+
+    with app.app_context():
+        items = Gallery.query.all()
+        assert len(items) == 2
+        for item in items:
+            assert item.asset.sha256 == _stored_sha256(app, item.file_path)
+
+
+def test_backfill(app, client, admin_headers):
+    response = client.post('/api/gallery/admin', headers=admin_headers, data={'file': (_jpeg((90, 90, 90)), 'grey.jpg')})
+    assert response.status_code == 201
+
+    with app.app_context():
+        db.session.query(MediaAsset).update({'sha256': None})
+        db.session.commit()
+
+        report = backfill_media_assets()
+        assert report['checksums'] == 1
+        asset = MediaAsset.query.one()
+        assert asset.sha256 == _stored_sha256(app, asset.file_path)
@@ -0,0 +1,45 @@
+"""
+?v= of media URLs comes from the stored content's checksum
+"""
+
+import os
+from database import db
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from services.media_asset_service import asset_for_path
+
+
+def _write(app, path, data):
+    full_path = os.path.join(app.config['UPLOAD_FOLDER'], path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'wb') as f:
+        f.write(data)
+
+
+def test_rewritten_file_gets_a_new_version(app):
+    with app.app_context():
+        _write(app, 'gallery/clip.mp4', b'a' * 4096)
+        item = Gallery(title='Clip', media_type='Video', file_path='gallery/clip.mp4')
+        db.session.add(item)
+        db.session.commit()
+        first = item.to_dict()['media_url']
+        assert first.endswith('?v=' + item.asset.sha256[:8])
+
+        # Same path, same size, no blurhash: only the content differs
+        _write(app, 'gallery/clip.mp4', b'b' * 4096)
+        asset_for_path(db.session, 'gallery/clip.mp4')
+        db.session.commit()
+        second = db.session.get(Gallery, item.id).to_dict()['media_url']
+
+        assert second.split('?')[0] == first.split('?')[0]
+        assert second != first
+
+
+def test_no_version_without_a_checksum(app):
+    with app.app_context():
+        asset = MediaAsset(file_path='gallery/old.jpg', bytes=10, blurhash='LKO2?U%2Tw=w]~RBVZRi};RPxuwH')
+        item = Gallery(title='Old', media_type='Image', file_path='gallery/old.jpg', asset=asset)
+        db.session.add(item)
+        db.session.commit()
+
+        assert item.to_dict()['media_url'].endswith('/gallery/old.jpg')
@@ -0,0 +1,118 @@
+import base64
+import io
+import threading
+import pytest
+from PIL import Image
+from database import db
+from models.gallery import Gallery
+import services.resumable_upload_service as resumable
+
+TUS = {'Tus-Resumable': '1.0.0'}
+
+
+def _jpeg():
+    buf = io.BytesIO()
+    Image.new('RGB', (64, 48), 'red').save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+def _create(client, admin_headers, length):
+    metadata = 'filename ' + base64.b64encode(b'litter.jpg').decode()
+    response = client.post('/api/uploads/', headers={
+        **admin_headers, **TUS, 'Upload-Length': str(length), 'Upload-Metadata': metadata,
+    })
+    assert response.status_code == 201
+    return response.headers['Location'].rsplit('/', 1)[1]
+
+
+def _patch(client, admin_headers, upload_id, offset, body):
+    return client.patch(f'/api/uploads/{upload_id}', data=body, headers={
+        **admin_headers, **TUS,
+        'Upload-Offset': str(offset),
+        'Content-Type': 'application/offset+octet-stream',
+    })
+
+
+def test_concurrent_final_patch_is_rejected_while_finalizing(app, client, admin_headers, monkeypatch):
+    data = _jpeg()
+    upload_id = _create(client, admin_headers, len(data))
+
+    finalizing = threading.Event()
+    release = threading.Event()
+    store_local_file = resumable.store_local_file
+
+    def slow_store(*args, **kwargs):
+        finalizing.set()
+        assert release.wait(10)
+        return store_local_file(*args, **kwargs)
+
+    monkeypatch.setattr(resumable, 'store_local_file', slow_store)
+
+    first = {}
+
+    def finish():
+        first['response'] = _patch(app.test_client(), admin_headers, upload_id, 0, data)
+
+    thread = threading.Thread(target=finish)
+    thread.start()
+    try:
+        assert finalizing.wait(10)
+        # The state file was already rewritten with offset == length
+        retry = _patch(client, admin_headers, upload_id, len(data), b'')
+        assert retry.status_code == 409
+    finally:
+        release.set()
+        thread.join(10)
+
+    assert first['response'].status_code == 204
+    gallery_id = int(first['response'].headers['Upload-Gallery-Item'])
+
+    # Once finished, a retried final PATCH gets the same result
+    retry = _patch(client, admin_headers, upload_id, len(data), b'')
+    assert retry.status_code == 204
+    assert int(retry.headers['Upload-Gallery-Item']) == gallery_id
+
+    with app.app_context():
+        assert db.session.query(Gallery).count() == 1
+
+
+def test_terminated_upload_is_not_found(client, admin_headers):
+    upload_id = _create(client, admin_headers, 10)
+    response = client.delete(f'/api/uploads/{upload_id}', headers={**admin_headers, **TUS})
+    assert response.status_code == 204
+
+    response = _patch(client, admin_headers, upload_id, 0, b'0123456789')
+    assert response.status_code == 404
+
+
+def _set_expiry(app, upload_id, expires_at):
+    with app.app_context():
+        state_path, _ = resumable._paths(upload_id)
+        state = resumable.get_upload(upload_id)
+        state['expires_at'] = expires_at
+        resumable._write_state(state_path, state)
+
+
+def test_patch_refreshes_expiry(app, client, admin_headers):
+    upload_id = _create(client, admin_headers, 10)
+    _set_expiry(app, upload_id, resumable.time.time() + 60)
+
+    response = _patch(client, admin_headers, upload_id, 0, b'01234')
+    assert response.status_code == 204
+
+    with app.app_context():
+        assert resumable.get_upload(upload_id)['expires_at'] > resumable.time.time() + 3600
+
+
+def test_cleanup_skips_locked_upload(app, client, admin_headers):
+    upload_id = _create(client, admin_headers, 10)
+    _set_expiry(app, upload_id, 1)
+
+    with app.app_context():
+        # A PATCH still streaming holds the lock
+        with resumable._locked(upload_id):
+            assert resumable.cleanup_expired_uploads() == 0
+        assert resumable.cleanup_expired_uploads() == 1
+
+    response = _patch(client, admin_headers, upload_id, 0, b'01234')
+    assert response.status_code == 404
@@ -0,0 +1,101 @@
+"""
+The SQL JSON rendering path must return the same documents as the ORM
+path: same values, key order and number types. Whitespace differs
+(PostgreSQL's json text isn't compact), so documents are compared parsed.
+
+Needs PostgreSQL: set TEST_DATABASE_URL to an empty scratch database.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from database import db
+from models.dog import Dog
+from models.puppy import Puppy
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL', '')
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith('postgresql'),
+    reason='SQL JSON rendering needs PostgreSQL (set TEST_DATABASE_URL)'
+)
+
+SINGLE_HOST = {'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URL}
+CDN_HOSTS = dict(SINGLE_HOST, MEDIA_CDN_HOSTS='https://a.cdn.test,https://b.cdn.test,https://c.cdn.test')
+
+
+@pytest.fixture(params=[SINGLE_HOST, CDN_HOSTS], ids=['single-host', 'cdn-hosts'])
+def config_overrides(request):
+    return request.param
+
+
+@pytest.fixture
+def catalog(app):
+    with app.app_context():
+        def asset(path, **meta):
+            meta.setdefault('sha256', hashlib.sha256(path.encode('utf-8')).hexdigest())
+            return MediaAsset(file_path=path, mime_type='image/jpeg', bytes=1234, width=800, height=600,
+                              blurhash='LKO2?U%2Tw=w]~RBVZRi};RPxuwH', **meta)
+
+        sire = Dog(name='Rex', gender='Male', role='Stud', date_of_birth=date(2020, 1, 2),
+                   primary_image='dogs/rex.jpg', primary_image_asset=asset('dogs/rex.jpg'))
+        dam = Dog(name='Zara', gender='Female', role='Dam', primary_image='http://elsewhere.test/zara.jpg')
+        db.session.add_all([
+            Puppy(name='Bolt', gender='Male', date_of_birth=date(2026, 8, 1), sire=sire, dam=dam,
+                  price_inr=Decimal('25000.00'), weight_kg=Decimal('12.35'),
+                  primary_image='puppies/bolt.jpg', primary_image_asset=asset('puppies/bolt.jpg'),
+                  created_at=datetime(2026, 9, 1, 10, 0, 0)),
+            Puppy(name='Nova', gender='Female', date_of_birth=date(2026, 8, 1), price_inr=0,
+                  created_at=datetime(2026, 9, 1, 10, 0, 0, 123456)),
+            Gallery(title='Litter', media_type='Image', file_path='gallery/litter.jpg', category='Litters',
+                    asset=asset('gallery/litter.jpg')),
+            Gallery(title='Run', media_type='Video', file_path='gallery/run.mp4', category='Litters',
+                    asset=asset('gallery/run.mp4', duration_seconds=12.0, codec='h264'),
+                    poster_asset=asset('gallery/1/poster.jpg'),
+                    hls_path='gallery/2/hls-1/master.m3u8', hls_status='ready', display_order=1),
+            Gallery(title='Show', media_type='Video', file_path='gallery/show.mp4', category='Shows',
+                    asset=asset('gallery/show.mp4', duration_seconds=7.25, sha256=None)),  # Not hashed yet
+        ])
+        db.session.commit()
+    # Parity is about rendering: keep the catalog cache out of the way
+    app.extensions.pop('catalog_cache', None)
+    yield
+    with app.app_context():
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+
+def _typed(body):
+    # Key order and int/float distinctions survive, whitespace doesn't
+    return json.loads(
+        body,
+        object_pairs_hook=list,
+        parse_int=lambda value: ('int', int(value)),
+        parse_float=lambda value: ('float', float(value)),
+    )
+
+
+def _both_paths(app, client, url):
+    app.config['SQL_JSON_RENDERING'] = True
+    sql = client.get(url)
+    app.config['SQL_JSON_RENDERING'] = False
+    orm = client.get(url)
+    assert sql.status_code == orm.status_code == 200
+    return _typed(sql.get_data()), _typed(orm.get_data())
+
+
+@pytest.mark.parametrize('url', ['/api/puppies/', '/api/puppies/?status=Available&gender=Male'])
+def test_puppies_match_the_orm_path(app, client, catalog, url):
+    sql, orm = _both_paths(app, client, url)
+    assert sql == orm
+
+
+@pytest.mark.parametrize('url', ['/api/gallery/', '/api/gallery/?category=Litters&media_type=Video'])
+def test_gallery_matches_the_orm_path(app, client, catalog, url):
+    sql, orm = _both_paths(app, client, url)
+    assert sql == orm
@@ -0,0 +1,27 @@
+"""
+413 responses report the request size limit that applied
+"""
+
+import io
+import pytest
+
+
+@pytest.fixture
+def config_overrides():
+    return {'MAX_CONTENT_LENGTH': 1024 * 1024, 'BULK_UPLOAD_MAX_CONTENT_LENGTH': 2 * 1024 * 1024}
+
+
+def _body(size, field='file'):
+    return {field: (io.BytesIO(b'\0' * size), 'big.jpg')}
+
+
+def test_app_limit(client, admin_headers):
+    response = client.post('/api/gallery/admin', headers=admin_headers, data=_body(1024 * 1024 + 1))
+    assert response.status_code == 413
+    assert response.get_json() == {'error': 'File too large. Maximum size is 1MB'}
+
+
+def test_route_limit(client, admin_headers):
+    response = client.post('/api/gallery/admin/bulk-upload', headers=admin_headers, data=_body(2 * 1024 * 1024 + 1, 'files'))
+    assert response.status_code == 413
+    assert response.get_json() == {'error': 'File too large. Maximum size is 2MB'}
@@ -0,0 +1,65 @@
+"""
+v2 sparse fieldsets select only the requested columns: the models'
+lazy='joined' media assets must not be joined into them
+"""
+
+import pytest
+from datetime import date
+from sqlalchemy import event
+from database import db
+from models.dog import Dog, DogImage
+from models.gallery import Gallery
+from models.media_asset import MediaAsset
+from models.puppy import Puppy
+
+
+@pytest.fixture
+def statements(app):
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield seen
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def catalog(app):
+    with app.app_context():
+        asset = MediaAsset(file_path='dogs/rex.jpg', mime_type='image/jpeg', bytes=10, width=80, height=60)
+        sire = Dog(name='Rex', gender='Male', role='Stud', primary_image='dogs/rex.jpg', primary_image_asset=asset)
+        db.session.add(sire)
+        db.session.flush()
+        db.session.add_all([
+            DogImage(dog_id=sire.id, image_path='dogs/rex.jpg', asset=asset),
+            Puppy(name='Bolt', gender='Male', date_of_birth=date(2026, 8, 1), sire_id=sire.id,
+                  primary_image='dogs/rex.jpg', primary_image_asset=asset),
+            Gallery(title='Rex', media_type='Image', file_path='dogs/rex.jpg', asset=asset),
+        ])
+        db.session.commit()
+
+
+@pytest.mark.parametrize('url', [
+    '/api/v2/gallery?fields=title',
+    '/api/v2/dogs?fields=name&include=images',
+    '/api/v2/puppies?fields=name&fields[dogs]=name&include=sire,images',
+])
+def test_no_asset_joins(client, catalog, statements, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.get_json()['data']
+
+    queries = [statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]
+    assert queries
+    assert not [statement for statement in queries if 'media_assets' in statement]
+
+
+def test_sparse_columns_only(client, catalog, statements):
+    response = client.get('/api/v2/gallery?fields=title')
+    assert response.get_json()['data'] == [{'id': 1, 'title': 'Rex'}]
+    gallery_query = next(statement for statement in statements if 'FROM gallery' in statement)
+    assert 'asset_id' not in gallery_query
@@ -2,7 +2,7 @@
 Utilities package initialization
 """
 
-from utils.jwt_helper import generate_token, decode_token, token_required, admin_required
+from utils.jwt_helper import generate_token, decode_token, token_required, admin_required, admin_stream_required, get_request_admin
 from utils.validators import validate_email, validate_phone, allowed_file, sanitize_filename
 
 __all__ = [
@@ -10,6 +10,8 @@ __all__ = [
     'decode_token',
     'token_required',
     'admin_required',
+    'admin_stream_required',
+    'get_request_admin',
     'validate_email',
     'validate_phone',
     'allowed_file',
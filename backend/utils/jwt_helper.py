@@ -96,25 +96,93 @@ def token_required(f):
     return decorated
 
 
-def admin_required(f):
+def _authenticate_admin(allow_query_token=False):
     """
-    Decorator combining token_required with admin verification
-    Also checks if admin account is active
+    Extract and validate the request's token and verify its admin is
+    active. Shared by admin_required, admin_stream_required and
+    get_request_admin.
+    
+    Args:
+        allow_query_token: Fall back to the ?token= query parameter when
+            there is no Bearer header (EventSource can't send headers)
+        
+    Returns:
+        tuple: (decoded payload, None) for an active admin, otherwise
+            (None, (error message, HTTP status))
     """
+    from models.admin import Admin
+    
+    token = None
+    auth_header = request.headers.get('Authorization', '')
+    if allow_query_token and not auth_header.startswith('Bearer '):
+        token = request.args.get('token')
+    elif auth_header:
+        try:
+            # Expected format: "Bearer <token>"
+            token = auth_header.split(' ')[1]
+        except IndexError:
+            return None, ('Invalid authorization header format', 401)
+    
+    if not token:
+        return None, ('Authentication token is missing', 401)
+    
+    payload = decode_token(token)
+    
+    if not payload:
+        return None, ('Invalid or expired token', 401)
+    
+    admin = Admin.query.get(payload['user_id'])
+    
+    if not admin:
+        return None, ('Admin user not found', 404)
+    
+    if not admin.is_active:
+        return None, ('Admin account is disabled', 403)
+    
+    return payload, None
+
+
+def _admin_view(f, allow_query_token):
     @wraps(f)
-    @token_required
-    def decorated(current_user, *args, **kwargs):
-        from models.admin import Admin
-        
-        # Verify admin exists and is active
-        admin = Admin.query.get(current_user['user_id'])
-        
-        if not admin:
-            return jsonify({'error': 'Admin user not found'}), 404
-        
-        if not admin.is_active:
-            return jsonify({'error': 'Admin account is disabled'}), 403
+    def decorated(*args, **kwargs):
+        payload, error = _authenticate_admin(allow_query_token)
+        if error:
+            message, status = error
+            return jsonify({'error': message}), status
         
-        return f(current_user=current_user, *args, **kwargs)
+        # Pass user info to the route
+        return f(current_user=payload, *args, **kwargs)
     
-    return decorated
\ No newline at end of file
+    return decorated
+
+
+def admin_required(f):
+    """
+    Decorator combining token_required with admin verification
+    Also checks if admin account is active
+    """
+    return _admin_view(f, allow_query_token=False)
+
+
+def admin_stream_required(f):
+    """
+    Variant of admin_required for Server-Sent Event streams.
+    Browsers' EventSource cannot send an Authorization header, so the
+    token may also be passed as the ?token= query parameter. Marks the
+    view as an event stream (batch requests refuse to dispatch it).
+    """
+    view = _admin_view(f, allow_query_token=True)
+    view.event_stream = True
+    return view
+
+
+def get_request_admin():
+    """
+    Resolve the active admin behind an optional Bearer token, for endpoints
+    that are public but reveal more to admins
+
+    Returns:
+        dict: Decoded token payload, or None for anonymous/invalid callers
+    """
+    payload, _ = _authenticate_admin()
+    return payload
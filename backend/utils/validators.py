@@ -149,4 +149,75 @@ def validate_status(status, entity_type='puppy'):
     else:
         return False
     
-    return status in valid_statuses
\ No newline at end of file
+    return status in valid_statuses
+
+# Magic bytes -> MIME type for the upload formats we accept
+# (offset, signature, mime); RIFF and ISO BMFF containers are checked by sniff_mime()
+_SIGNATURES = (
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (0, b'\x1a\x45\xdf\xa3', 'video/webm'),
+)
+
+# MIME type -> extensions whose content it is
+MIME_EXTENSIONS = {
+    'image/jpeg': {'jpg', 'jpeg'},
+    'image/png': {'png'},
+    'image/gif': {'gif'},
+    'image/webp': {'webp'},
+    'video/mp4': {'mp4', 'mov'},
+    'video/quicktime': {'mov', 'mp4'},
+    'video/x-msvideo': {'avi'},
+    'video/webm': {'webm'},
+}
+
+SNIFF_BYTES = 16
+
+
+def sniff_mime(head):
+    """
+    Detect the real type of an upload from its first bytes
+    
+    Args:
+        head: At least the first SNIFF_BYTES bytes of the file
+        
+    Returns:
+        str: MIME type, or None if it isn't a supported image/video format
+    """
+    for offset, signature, mime in _SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return mime
+    
+    if head[:4] == b'RIFF':
+        if head[8:12] == b'WEBP':
+            return 'image/webp'
+        if head[8:12] == b'AVI ':
+            return 'video/x-msvideo'
+    
+    # ISO base media (MP4/MOV): box size, then 'ftyp' and the major brand
+    if head[4:8] == b'ftyp':
+        return 'video/quicktime' if head[8:12] == b'qt  ' else 'video/mp4'
+    
+    # Older QuickTime files may start with other top-level atoms
+    if head[4:8] in (b'moov', b'mdat', b'wide', b'free', b'skip'):
+        return 'video/quicktime'
+    
+    return None
+
+
+def content_matches_extension(filename, mime):
+    """
+    Check that sniffed content agrees with the file's extension
+    
+    Args:
+        filename: Original filename
+        mime: Result of sniff_mime()
+        
+    Returns:
+        bool: True if the extension is one the content type uses
+    """
+    if not mime or not filename or '.' not in filename:
+        return False
+    return filename.rsplit('.', 1)[1].lower() in MIME_EXTENSIONS.get(mime, ())